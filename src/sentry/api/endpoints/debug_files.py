@@ -15,7 +15,7 @@ from sentry import ratelimits
 
 from sentry.api.base import DocSection
 from sentry.api.bases.project import ProjectEndpoint, ProjectReleasePermission
-from sentry.api.paginator import OffsetPaginator
+from sentry.api.paginator import KeysetPaginator
 from sentry.api.serializers import serialize
 from sentry.constants import KNOWN_DIF_FORMATS
 from sentry.models import FileBlobOwner, ProjectDebugFile, create_files_from_dif_zip
@@ -137,7 +137,7 @@ class DebugFilesEndpoint(ProjectEndpoint):
             request=request,
             queryset=queryset,
             order_by="-id",
-            paginator_cls=OffsetPaginator,
+            paginator_cls=KeysetPaginator,
             default_per_page=20,
             on_results=lambda x: serialize(x, request.user),
         )
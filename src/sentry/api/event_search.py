@@ -25,7 +25,9 @@ from sentry.search.utils import (
     InvalidQuery,
 )
 from sentry.snuba.dataset import Dataset
+from sentry.utils import metrics
 from sentry.utils.dates import to_timestamp
+from sentry.utils.lru import LRUCache
 from sentry.utils.snuba import DATASETS, get_json_type
 from sentry.utils.compat import map
 from sentry.utils.compat import zip
@@ -279,6 +281,10 @@ class SearchVisitor(NodeVisitor):
 
     unwrapped_exceptions = (InvalidSearchQuery,)
 
+    # Set when a filter was resolved relative to the current time, which
+    # means that the result of the visitor must not be cached.
+    is_time_dependent = False
+
     @cached_property
     def key_mappings_lookup(self):
         lookup = {}
@@ -435,6 +441,7 @@ class SearchVisitor(NodeVisitor):
         operator = operator[0] if not isinstance(operator, Node) else "="
         is_date_aggregate = any(key in search_key.name for key in self.date_keys)
         if is_date_aggregate:
+            self.is_time_dependent = True
             try:
                 from_val, to_val = parse_datetime_range(search_value.text)
             except InvalidQuery as exc:
@@ -482,6 +489,7 @@ class SearchVisitor(NodeVisitor):
     def visit_rel_time_filter(self, node, children):
         (search_key, _, value) = children
         if search_key.name in self.date_keys:
+            self.is_time_dependent = True
             try:
                 from_val, to_val = parse_datetime_range(value.text)
             except InvalidQuery as exc:
@@ -657,9 +665,43 @@ class SearchVisitor(NodeVisitor):
         return children or node
 
 
-def parse_search_query(query):
+# Search filters by visitor class and query, see ``visit_search_query``.
+parsed_query_cache = LRUCache(max_size=1000, sizeof=lambda value: 1)
+
+# Converted conditions of queries that do not depend on the request, see
+# ``get_filter``.
+filter_conditions_cache = LRUCache(max_size=1000, sizeof=lambda value: 1)
+
+
+def visit_search_query(query, visitor_cls, parse_tree):
+    """
+    Converts ``query`` into a list of search filters with ``visitor_cls``,
+    where ``parse_tree`` parses the query with the search grammar.
+
+    Issue streams and dashboards repeatedly send the same queries, so the
+    filters are cached per visitor and query unless they contain dates that
+    are relative to the current time. Returns a 2-tuple of the filters and
+    whether they were cacheable.
+    """
+    key = (visitor_cls, query)
+    search_filters = parsed_query_cache.get(key)
+    if search_filters is not None:
+        metrics.incr("event_search.parse.cache", tags={"result": "hit"}, skip_internal=True)
+        return list(search_filters), True
+
+    visitor = visitor_cls()
+    search_filters = visitor.visit(parse_tree(query))
+    if visitor.is_time_dependent:
+        return search_filters, False
+
+    metrics.incr("event_search.parse.cache", tags={"result": "miss"}, skip_internal=True)
+    parsed_query_cache.set(key, tuple(search_filters))
+    return search_filters, True
+
+
+def parse_search_query_tree(query):
     try:
-        tree = event_search_grammar.parse(query)
+        return event_search_grammar.parse(query)
     except IncompleteParseError as e:
         idx = e.column()
         prefix = query[max(0, idx - 5) : idx]
@@ -670,7 +712,10 @@ def parse_search_query(query):
                 "This is commonly caused by unmatched parentheses. Enclose any text in double quotes.",
             )
         )
-    return SearchVisitor().visit(tree)
+
+
+def parse_search_query(query):
+    return visit_search_query(query, SearchVisitor, parse_search_query_tree)[0]
 
 
 def convert_aggregate_filter_to_snuba_query(aggregate_filter, params):
@@ -797,6 +842,22 @@ def convert_search_filter_to_snuba_query(search_filter, key=None):
             return condition
 
 
+def is_static_search_term(term):
+    """
+    Whether the conditions of a parsed search term only depend on the term
+    itself and not on the URL params or the database.
+    """
+    if isinstance(term, AggregateFilter):
+        return False
+    if isinstance(term, SearchFilter):
+        name = term.key.name
+        if name in (PROJECT_ALIAS, PROJECT_NAME_ALIAS, ISSUE_ALIAS):
+            return False
+        if name == RELEASE_ALIAS and term.value.value == "latest":
+            return False
+    return True
+
+
 def get_filter(query=None, params=None):
     """
     Returns an eventstore filter given the search text provided by the user and
@@ -804,9 +865,12 @@ def get_filter(query=None, params=None):
     """
     # NOTE: this function assumes project permissions check already happened
     parsed_terms = []
+    is_cacheable = False
     if query is not None:
         try:
-            parsed_terms = parse_search_query(query)
+            parsed_terms, is_cacheable = visit_search_query(
+                query, SearchVisitor, parse_search_query_tree
+            )
         except ParseError as e:
             raise InvalidSearchQuery(
                 u"Parse error: {} (column {:d})".format(e.expr.name, e.column())
@@ -821,10 +885,57 @@ def get_filter(query=None, params=None):
         "group_ids": [],
     }
 
-    def to_list(value):
-        if isinstance(value, list):
-            return value
-        return [value]
+    if is_cacheable and all(is_static_search_term(term) for term in parsed_terms):
+        converted = filter_conditions_cache.get(query)
+        if converted is None:
+            converted = convert_search_terms(parsed_terms, params)
+            filter_conditions_cache.set(query, converted)
+        # Callers are free to modify the conditions of the filter
+        converted = deepcopy(converted)
+    else:
+        converted = convert_search_terms(parsed_terms, params)
+
+    project_to_filter = converted.pop("project_to_filter")
+    kwargs.update(converted)
+
+    # Keys included as url params take precedent if same key is included in search
+    # They are also considered safe and to have had access rules applied unlike conditions
+    # from the query string.
+    if params:
+        for key in ("start", "end"):
+            kwargs[key] = params.get(key, None)
+        # OrganizationEndpoint.get_filter() uses project_id, but eventstore.Filter uses project_ids
+        if "project_id" in params:
+            if project_to_filter:
+                kwargs["project_ids"] = [project_to_filter]
+            else:
+                kwargs["project_ids"] = params["project_id"]
+        if "environment" in params:
+            term = SearchFilter(SearchKey("environment"), "=", SearchValue(params["environment"]))
+            kwargs["conditions"].append(convert_search_filter_to_snuba_query(term))
+        if "group_ids" in params:
+            kwargs["group_ids"] = to_list(params["group_ids"])
+        # Deprecated alias, use `group_ids` instead
+        if ISSUE_ID_ALIAS in params:
+            kwargs["group_ids"] = to_list(params["issue.id"])
+
+    return eventstore.Filter(**kwargs)
+
+
+def to_list(value):
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def convert_search_terms(parsed_terms, params):
+    """
+    Converts parsed search terms into the conditions, having clauses and
+    group ids of an eventstore filter.
+    """
+    conditions = []
+    having = []
+    group_ids = []
 
     # Used to avoid doing multiple conditions on project ID
     project_to_filter = None
@@ -850,17 +961,17 @@ def get_filter(query=None, params=None):
                     if term.operator == "=":
                         project_to_filter = project.id
 
-                    kwargs["conditions"].append(converted_filter)
+                    conditions.append(converted_filter)
             elif name == ISSUE_ID_ALIAS and value != "":
                 # A blank term value means that this is a has filter
-                kwargs["group_ids"].extend(to_list(value))
+                group_ids.extend(to_list(value))
             elif name == ISSUE_ALIAS and value != "":
                 if params and "organization_id" in params:
                     try:
                         group = Group.objects.by_qualified_short_id(
                             params["organization_id"], value
                         )
-                        kwargs["group_ids"].extend(to_list(group.id))
+                        group_ids.extend(to_list(group.id))
                     except Exception:
                         raise InvalidSearchQuery(
                             u"Invalid value '{}' for 'issue:' filter".format(value)
@@ -872,9 +983,9 @@ def get_filter(query=None, params=None):
                     for field in FIELD_ALIASES[USER_ALIAS]["fields"]
                 ]
                 if term.operator == "!=" and value != "":
-                    kwargs["conditions"].extend(user_conditions)
+                    conditions.extend(user_conditions)
                 else:
-                    kwargs["conditions"].append(user_conditions)
+                    conditions.append(user_conditions)
             elif name == RELEASE_ALIAS and params and value == "latest":
                 converted_filter = convert_search_filter_to_snuba_query(
                     SearchFilter(
@@ -891,7 +1002,7 @@ def get_filter(query=None, params=None):
                     )
                 )
                 if converted_filter:
-                    kwargs["conditions"].append(converted_filter)
+                    conditions.append(converted_filter)
             elif name in FIELD_ALIASES and name != PROJECT_ALIAS:
                 if "column_alias" in FIELD_ALIASES[name]:
                     term = SearchFilter(
@@ -899,38 +1010,22 @@ def get_filter(query=None, params=None):
                     )
                 converted_filter = convert_aggregate_filter_to_snuba_query(term, params)
                 if converted_filter:
-                    kwargs["conditions"].append(converted_filter)
+                    conditions.append(converted_filter)
             else:
                 converted_filter = convert_search_filter_to_snuba_query(term)
                 if converted_filter:
-                    kwargs["conditions"].append(converted_filter)
+                    conditions.append(converted_filter)
         elif isinstance(term, AggregateFilter):
             converted_filter = convert_aggregate_filter_to_snuba_query(term, params)
             if converted_filter:
-                kwargs["having"].append(converted_filter)
-
-    # Keys included as url params take precedent if same key is included in search
-    # They are also considered safe and to have had access rules applied unlike conditions
-    # from the query string.
-    if params:
-        for key in ("start", "end"):
-            kwargs[key] = params.get(key, None)
-        # OrganizationEndpoint.get_filter() uses project_id, but eventstore.Filter uses project_ids
-        if "project_id" in params:
-            if project_to_filter:
-                kwargs["project_ids"] = [project_to_filter]
-            else:
-                kwargs["project_ids"] = params["project_id"]
-        if "environment" in params:
-            term = SearchFilter(SearchKey("environment"), "=", SearchValue(params["environment"]))
-            kwargs["conditions"].append(convert_search_filter_to_snuba_query(term))
-        if "group_ids" in params:
-            kwargs["group_ids"] = to_list(params["group_ids"])
-        # Deprecated alias, use `group_ids` instead
-        if ISSUE_ID_ALIAS in params:
-            kwargs["group_ids"] = to_list(params["issue.id"])
+                having.append(converted_filter)
 
-    return eventstore.Filter(**kwargs)
+    return {
+        "conditions": conditions,
+        "having": having,
+        "group_ids": group_ids,
+        "project_to_filter": project_to_filter,
+    }
 
 
 # When adding aliases to this list please also update
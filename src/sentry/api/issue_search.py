@@ -11,6 +11,7 @@ from sentry.api.event_search import (
     SearchKey,
     SearchValue,
     SearchVisitor,
+    visit_search_query,
 )
 from sentry.constants import STATUS_CHOICES
 from sentry.search.utils import (
@@ -73,9 +74,9 @@ class IssueSearchVisitor(SearchVisitor):
         )
 
 
-def parse_search_query(query):
+def parse_search_query_tree(query):
     try:
-        tree = event_search_grammar.parse(query)
+        return event_search_grammar.parse(query)
     except IncompleteParseError as e:
         raise InvalidSearchQuery(
             "%s %s"
@@ -84,7 +85,10 @@ def parse_search_query(query):
                 "This is commonly caused by unmatched-parentheses. Enclose any text in double quotes.",
             )
         )
-    return IssueSearchVisitor().visit(tree)
+
+
+def parse_search_query(query):
+    return visit_search_query(query, IssueSearchVisitor, parse_search_query_tree)[0]
 
 
 def convert_actor_value(value, projects, user, environments):
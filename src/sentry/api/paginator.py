@@ -2,13 +2,17 @@ from __future__ import absolute_import
 
 import bisect
 import functools
+import heapq
 import math
+import six
 
 from datetime import datetime
+from itertools import islice
 from django.db import connections
 from django.db.models.sql.datastructures import EmptyResultSet
 from django.utils import timezone
 
+from sentry.utils import json
 from sentry.utils.cursors import build_cursor, Cursor, CursorResult
 from sentry.utils.compat import map
 from sentry.utils.compat import zip
@@ -19,13 +23,48 @@ quote_name = connections["default"].ops.quote_name
 MAX_LIMIT = 100
 MAX_HITS_LIMIT = 1000
 
+# Hits are only estimated when the planner expects this many times more rows
+# than would be counted, at which point an exact count would hit the cap.
+ESTIMATE_HITS_FACTOR = 10
+
 
 class BadPaginationError(Exception):
     pass
 
 
+def _get_hits_sql(queryset, max_hits=None):
+    hits_query = queryset.values()
+    if max_hits is not None:
+        hits_query = hits_query[:max_hits]
+    hits_query = hits_query.query
+    # clear out any select fields (include select_related) and pull just the id
+    hits_query.clear_select_clause()
+    hits_query.add_fields(["id"])
+    hits_query.clear_ordering(force_empty=True)
+    return hits_query.sql_with_params()
+
+
+def estimate_hits(queryset):
+    """
+    Returns the number of rows the query planner expects ``queryset`` to
+    return, based on table statistics instead of running the query.
+    """
+    try:
+        h_sql, h_params = _get_hits_sql(queryset)
+    except EmptyResultSet:
+        return 0
+    cursor = connections[queryset.db].cursor()
+    cursor.execute(u"EXPLAIN (FORMAT JSON) {}".format(h_sql), h_params)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, six.string_types):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
 class BasePaginator(object):
-    def __init__(self, queryset, order_by=None, max_limit=MAX_LIMIT, on_results=None):
+    def __init__(
+        self, queryset, order_by=None, max_limit=MAX_LIMIT, on_results=None, estimate_hits=False
+    ):
         if order_by:
             if order_by.startswith("-"):
                 self.key, self.desc = order_by[1:], True
@@ -37,6 +76,7 @@ class BasePaginator(object):
         self.queryset = queryset
         self.max_limit = max_limit
         self.on_results = on_results
+        self.estimate_hits = estimate_hits
 
     def _is_asc(self, is_prev):
         return (self.desc and is_prev) or not (self.desc or is_prev)
@@ -164,15 +204,17 @@ class BasePaginator(object):
         )
 
     def count_hits(self, max_hits):
+        """
+        Counts the results of the queryset up to ``max_hits``. With
+        ``estimate_hits`` enabled, large result sets are not counted but
+        assumed to exceed ``max_hits`` if the planner estimates so.
+        """
         if not max_hits:
             return 0
-        hits_query = self.queryset.values()[:max_hits].query
-        # clear out any select fields (include select_related) and pull just the id
-        hits_query.clear_select_clause()
-        hits_query.add_fields(["id"])
-        hits_query.clear_ordering(force_empty=True)
+        if self.estimate_hits and estimate_hits(self.queryset) >= max_hits * ESTIMATE_HITS_FACTOR:
+            return max_hits
         try:
-            h_sql, h_params = hits_query.sql_with_params()
+            h_sql, h_params = _get_hits_sql(self.queryset, max_hits)
         except EmptyResultSet:
             return 0
         cursor = connections[self.queryset.db].cursor()
@@ -203,6 +245,79 @@ class DateTimePaginator(BasePaginator):
         )
 
 
+class KeysetPaginator(BasePaginator):
+    """
+    A paginator that continues after the last row of the previous page
+    instead of skipping over it with an offset, so that every page is as
+    cheap to fetch as the first one.
+
+    The sort key must be a unique integer column such as ``id``. Cursor
+    values are the key of the row a page continues after, offsets are
+    always zero.
+    """
+
+    def get_item_key(self, item, for_prev=False):
+        return getattr(item, self.key)
+
+    def value_from_cursor(self, cursor):
+        return cursor.value
+
+    def get_result(self, limit=100, cursor=None, count_hits=False, known_hits=None):
+        if cursor is None:
+            cursor = Cursor(0, 0, 0)
+
+        limit = min(limit, self.max_limit)
+
+        asc = self._is_asc(cursor.is_prev)
+        queryset = self.queryset.order_by(self.key if asc else "-%s" % self.key)
+        if cursor.value:
+            lookup = "%s__%s" % (self.key, "gt" if asc else "lt")
+            queryset = queryset.filter(**{lookup: self.value_from_cursor(cursor)})
+
+        if count_hits:
+            hits = self.count_hits(MAX_HITS_LIMIT)
+        elif known_hits is not None:
+            hits = known_hits
+        else:
+            hits = None
+
+        # Fetch one more row to know whether there is another page
+        results = list(queryset[: limit + 1])
+        has_more = len(results) > limit
+        results = results[:limit]
+
+        if cursor.is_prev:
+            results.reverse()
+            has_prev, has_next = has_more, bool(cursor.value)
+        else:
+            has_prev, has_next = bool(cursor.value), has_more
+
+        if results:
+            prev_value = self.get_item_key(results[0])
+            next_value = self.get_item_key(results[-1])
+        elif cursor.value:
+            # Paginating back the other way has to include the row this cursor
+            # continues after.
+            prev_value = next_value = cursor.value + (1 if asc else -1)
+            if cursor.is_prev:
+                prev_value = cursor.value
+            else:
+                next_value = cursor.value
+        else:
+            prev_value = next_value = 0
+
+        if self.on_results:
+            results = self.on_results(results)
+
+        return CursorResult(
+            results=results,
+            next=Cursor(next_value, 0, False, has_next),
+            prev=Cursor(prev_value, 0, True, has_prev),
+            hits=hits,
+            max_hits=MAX_HITS_LIMIT if count_hits else None,
+        )
+
+
 # TODO(dcramer): previous cursors are too complex at the moment for many things
 # and are only useful for polling situations. The OffsetPaginator ignores them
 # entirely and uses standard paging
@@ -472,6 +587,26 @@ class GenericOffsetPaginator(object):
         # date for queries, this should stop drift from new incoming events.
 
 
+class _SortKey(object):
+    """
+    Wraps a sort key so that ``heapq`` can pop the largest key first.
+    """
+
+    __slots__ = ("value", "reverse")
+
+    def __init__(self, value, reverse=False):
+        self.value = value
+        self.reverse = reverse
+
+    def __lt__(self, other):
+        if self.reverse:
+            return other.value < self.value
+        return self.value < other.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
 class CombinedQuerysetPaginator(object):
     multiplier = 1000000  # Use microseconds for date keys.
 
@@ -510,14 +645,21 @@ class CombinedQuerysetPaginator(object):
     def _is_asc(self, is_prev):
         return (self.desc and is_prev) or not (self.desc or is_prev)
 
-    def _build_combined_querysets(self, value, is_prev, limit, extra):
+    def _iter_combined_querysets(self, value, is_prev, chunk_size):
+        """
+        Merges the sorted querysets into a single sorted stream. Every
+        queryset is fetched in chunks of ``chunk_size`` rows, and only as far
+        as the merged stream is consumed.
+        """
         asc = self._is_asc(is_prev)
 
+        # The primary key breaks ties, so that rows with the same key keep
+        # their order across the chunks of a queryset and across pages.
         if asc:
-            order_by = self.key
+            order_by = (self.key, "pk")
             filter_condition = "%s__gte" % self.key
         else:
-            order_by = "-%s" % self.key
+            order_by = ("-%s" % self.key, "-pk")
             filter_condition = "%s__lte" % self.key
 
         filters = {}
@@ -525,15 +667,38 @@ class CombinedQuerysetPaginator(object):
             assert self.key
             filters[filter_condition] = value
 
-        combined_querysets = list()
-        for queryset in self.querysets:
-            queryset = queryset.filter(**filters).order_by(order_by)[: (limit + extra)]
-            combined_querysets += list(queryset)
-
-        combined_querysets.sort(
-            key=lambda item: (getattr(item, self.key), type(item).__name__), reverse=not asc
-        )
-        return combined_querysets
+        def iter_queryset(queryset):
+            queryset = queryset.filter(**filters).order_by(*order_by)
+            offset = 0
+            while True:
+                chunk = list(queryset[offset : offset + chunk_size])
+                for item in chunk:
+                    yield item
+                if len(chunk) < chunk_size:
+                    return
+                offset += chunk_size
+
+        def sort_key(item):
+            return _SortKey((getattr(item, self.key), type(item).__name__), reverse=not asc)
+
+        # (sort key, queryset index, item, iterator) per queryset with rows left.
+        # The index keeps rows with equal keys in the order of the querysets.
+        heap = []
+        for idx, queryset in enumerate(self.querysets):
+            iterator = iter_queryset(queryset)
+            for item in iterator:
+                heap.append((sort_key(item), idx, item, iterator))
+                break
+        heapq.heapify(heap)
+
+        while heap:
+            _, idx, item, iterator = heap[0]
+            yield item
+            for item in iterator:
+                heapq.heapreplace(heap, (sort_key(item), idx, item, iterator))
+                break
+            else:
+                heapq.heappop(heap)
 
     def get_result(self, cursor=None, limit=100):
         if cursor is None:
@@ -550,12 +715,12 @@ class CombinedQuerysetPaginator(object):
         extra = 1
         if cursor.is_prev and cursor.value:
             extra += 1
-        combined_querysets = self._build_combined_querysets(
-            cursor_value, cursor.is_prev, limit, extra
+        combined_querysets = self._iter_combined_querysets(
+            cursor_value, cursor.is_prev, limit + extra
         )
 
         stop = offset + limit + extra
-        results = list(combined_querysets[offset:stop])
+        results = list(islice(combined_querysets, offset, stop))
 
         if cursor.is_prev and cursor.value:
             # If the first result is equal to the cursor_value then it's safe to filter
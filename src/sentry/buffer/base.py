@@ -5,6 +5,7 @@ import six
 
 from django.db.models import F
 
+from sentry.db.models import bulk_update_from_values
 from sentry.signals import buffer_incr_complete
 from sentry.tasks.process_buffer import process_incr
 from sentry.utils.services import Service
@@ -32,7 +33,7 @@ class Buffer(Service):
     keep up with the updates.
     """
 
-    __all__ = ("incr", "process", "process_pending", "validate")
+    __all__ = ("incr", "process", "process_batch", "process_pending", "validate")
 
     def incr(self, model, columns, filters, extra=None, signal_only=None):
         """
@@ -86,3 +87,96 @@ class Buffer(Service):
             created=created,
             sender=model,
         )
+
+    def process_batch(self, incrs):
+        """
+        Processes many increments at once. ``incrs`` is a sequence of
+        ``(model, columns, filters, extra, signal_only)`` tuples as they would
+        be passed to ``process``.
+
+        Increments of the same model that touch the same columns are applied
+        with a single multi-row UPDATE. Increments that cannot be expressed
+        that way, or whose rows do not exist yet, are passed on to
+        ``process`` one by one.
+        """
+        batches = {}
+        for incr in incrs:
+            batch_key = self._get_batch_key(*incr)
+            if batch_key is None:
+                Buffer.process(self, *incr)
+            else:
+                batches.setdefault(batch_key, []).append(incr)
+
+        for batch_key, batch in six.iteritems(batches):
+            if len(batch) == 1:
+                Buffer.process(self, *batch[0])
+            else:
+                self._process_update_batch(batch_key, batch)
+
+    def _get_batch_key(self, model, columns, filters, extra=None, signal_only=None):
+        if signal_only or not columns or not filters:
+            return None
+
+        extra = dict(extra or {})
+        expressions = self._get_batch_expressions(model, columns, extra)
+        for name in expressions:
+            extra.pop(name, None)
+
+        # Expressions need to be resolved against the row by ``process``.
+        if any(hasattr(value, "resolve_expression") for value in six.itervalues(extra)):
+            return None
+
+        return (model, tuple(sorted(filters)), tuple(sorted(columns)), tuple(sorted(extra)))
+
+    def _get_batch_expressions(self, model, columns, extra):
+        from sentry.models import Group
+
+        # Mirrors the score hack in ``process``, see ``ScoreClause``.
+        if model is Group and extra and "last_seen" in extra and "times_seen" in columns:
+            return {
+                "score": "log(t.times_seen + v.times_seen) * 600 + floor(extract(epoch from v.last_seen))"
+            }
+        return {}
+
+    def _process_update_batch(self, batch_key, batch):
+        model, lookups, increments, values = batch_key
+
+        rows = []
+        for _, columns, filters, extra, _ in batch:
+            row = [filters[name] for name in lookups]
+            row.extend(columns[name] for name in increments)
+            row.extend(extra[name] for name in values)
+            rows.append(row)
+
+        _, columns, _, extra, _ = batch[0]
+        updated = bulk_update_from_values(
+            model,
+            lookups,
+            increments,
+            values,
+            rows,
+            expressions=self._get_batch_expressions(model, columns, extra),
+        )
+
+        opts = model._meta
+        lookup_fields = [opts.pk if name == "pk" else opts.get_field(name) for name in lookups]
+
+        for incr in batch:
+            model, columns, filters, extra, signal_only = incr
+            lookup = tuple(
+                field.to_python(getattr(filters[name], "pk", filters[name]))
+                for field, name in zip(lookup_fields, lookups)
+            )
+            if lookup not in updated:
+                # The row does not exist yet and needs to be created.
+                Buffer.process(self, *incr)
+                continue
+
+            buffer_incr_complete.send_robust(
+                model=model,
+                columns=columns,
+                filters=filters,
+                extra=extra,
+                created=False,
+                sender=model,
+            )
@@ -1,5 +1,6 @@
 from __future__ import absolute_import
 
+import atexit
 import six
 
 import threading
@@ -10,7 +11,10 @@ from datetime import datetime
 from django.db import models
 from django.utils import timezone
 from django.utils.encoding import force_bytes
+from pkg_resources import resource_string
+from redis.client import Script
 
+from sentry import options
 from sentry.buffer import Buffer
 from sentry.exceptions import InvalidConfiguration
 from sentry.tasks.process_buffer import process_incr, process_pending
@@ -23,6 +27,8 @@ from sentry.utils.redis import get_cluster_from_options
 _local_buffers = None
 _local_buffers_lock = threading.Lock()
 
+IncrScript = Script(None, resource_string("sentry", "scripts/buffer/incr.lua"))
+
 
 class PendingBuffer(object):
     def __init__(self, size):
@@ -55,13 +61,31 @@ class RedisBuffer(Buffer):
     key_expire = 60 * 60  # 1 hour
     pending_key = "b:p"
 
-    def __init__(self, pending_partitions=1, incr_batch_size=2, **options):
+    def __init__(
+        self,
+        pending_partitions=1,
+        incr_batch_size=2,
+        incr_coalesce_window=0,
+        incr_coalesce_max_keys=1000,
+        **options
+    ):
         self.cluster, options = get_cluster_from_options("SENTRY_BUFFER_OPTIONS", options)
         self.pending_partitions = pending_partitions
         self.incr_batch_size = incr_batch_size
         assert self.pending_partitions > 0
         assert self.incr_batch_size > 0
 
+        # When a coalesce window (in seconds) is configured, increments are
+        # merged in memory per key and only written to Redis once the window
+        # has passed or too many keys are pending.
+        self.incr_coalesce_window = incr_coalesce_window
+        self.incr_coalesce_max_keys = incr_coalesce_max_keys
+        self._coalesced_incrs = {}
+        self._coalesce_lock = threading.Lock()
+        self._coalesce_timer = None
+        if self.incr_coalesce_window:
+            atexit.register(self.flush_coalesced_incrs)
+
     def validate(self):
         try:
             with self.cluster.all() as client:
@@ -123,10 +147,34 @@ class RedisBuffer(Buffer):
         elif isinstance(value, datetime):
             type_ = "d"
             value = value.strftime("%s.%f")
-        elif isinstance(value, int):
+        elif isinstance(value, bool) or value is None:
+            # Booleans are integers, but must not be written as "i"
+            return self._dump_extended_value(value)
+        elif isinstance(value, six.integer_types):
             type_ = "i"
         elif isinstance(value, float):
             type_ = "f"
+            value = repr(value)
+        else:
+            return self._dump_extended_value(value)
+        return (type_, six.text_type(value))
+
+    def _dump_extended_value(self, value):
+        # Flushers running older versions only read the types above and fail
+        # on these, so they are only written once the option is enabled after
+        # every flusher has been upgraded. Until then, values go through pickle.
+        if not options.get("buffer.write-extended-json-types"):
+            raise TypeError(type(value))
+
+        if value is None:
+            type_ = "n"
+            value = ""
+        elif isinstance(value, bool):
+            type_ = "b"
+            value = int(value)
+        elif isinstance(value, (dict, list, tuple)):
+            type_ = "j"
+            value = json.dumps(value)
         else:
             raise TypeError(type(value))
         return (type_, six.text_type(value))
@@ -147,9 +195,29 @@ class RedisBuffer(Buffer):
             return int(value)
         elif type_ == "f":
             return float(value)
+        elif type_ == "n":
+            return None
+        elif type_ == "b":
+            return bool(int(value))
+        elif type_ == "j":
+            return json.loads(value)
         else:
             raise TypeError("invalid type: {}".format(type_))
 
+    def _encode_filters(self, filters):
+        try:
+            return json.dumps(self._dump_values(filters))
+        except TypeError:
+            return pickle.dumps(filters)
+
+    def _encode_extra_value(self, value):
+        # Values that cannot be represented as JSON (such as expressions
+        # passed by the event manager) still need to go through pickle.
+        try:
+            return json.dumps(self._dump_value(value))
+        except TypeError:
+            return pickle.dumps(value)
+
     def incr(self, model, columns, filters, extra=None, signal_only=None):
         """
         Increment the key by doing the following:
@@ -159,41 +227,17 @@ class RedisBuffer(Buffer):
             - Perform a set (last write wins) on extra
             - Perform a set on signal_only (only if True)
         - Add hashmap key to pending flushes
-        """
 
-        # TODO(dcramer): longer term we'd rather not have to serialize values
-        # here (unless it's to JSON)
+        All of this happens in a single Lua script call. If a coalesce window
+        is configured, increments for the same key are merged in memory
+        first and written out in bulk.
+        """
         key = self._make_key(model, filters)
-        pending_key = self._make_pending_key_from_key(key)
-        # We can't use conn.map() due to wanting to support multiple pending
-        # keys (one per Redis partition)
-        conn = self.cluster.get_local_client_for_key(key)
-
-        pipe = conn.pipeline()
-        pipe.hsetnx(key, "m", "%s.%s" % (model.__module__, model.__name__))
-        # TODO(dcramer): once this goes live in production, we can kill the pickle path
-        # (this is to ensure a zero downtime deploy where we can transition event processing)
-        pipe.hsetnx(key, "f", pickle.dumps(filters))
-        # pipe.hsetnx(key, 'f', json.dumps(self._dump_values(filters)))
-        for column, amount in six.iteritems(columns):
-            pipe.hincrby(key, "i+" + column, amount)
-
-        if extra:
-            # Group tries to serialize 'score', so we'd need some kind of processing
-            # hook here
-            # e.g. "update score if last_seen or times_seen is changed"
-            for column, value in six.iteritems(extra):
-                # TODO(dcramer): once this goes live in production, we can kill the pickle path
-                # (this is to ensure a zero downtime deploy where we can transition event processing)
-                pipe.hset(key, "e+" + column, pickle.dumps(value))
-                # pipe.hset(key, 'e+' + column, json.dumps(self._dump_value(value)))
-
-        if signal_only is True:
-            pipe.hset(key, "s", "1")
-
-        pipe.expire(key, self.key_expire)
-        pipe.zadd(pending_key, time(), key)
-        pipe.execute()
+
+        if self.incr_coalesce_window:
+            self._coalesce_incr(key, model, columns, filters, extra, signal_only)
+        else:
+            self._write_incrs({key: (model, columns, filters, extra, signal_only)})
 
         metrics.incr(
             "buffer.incr",
@@ -201,6 +245,82 @@ class RedisBuffer(Buffer):
             tags={"module": model.__module__, "model": model.__name__},
         )
 
+    def _coalesce_incr(self, key, model, columns, filters, extra, signal_only):
+        with self._coalesce_lock:
+            pending = self._coalesced_incrs.get(key)
+            if pending is None:
+                pending = self._coalesced_incrs[key] = (model, {}, filters, {}, [None])
+                metrics.incr("buffer.coalesce.miss", skip_internal=True)
+            else:
+                metrics.incr("buffer.coalesce.hit", skip_internal=True)
+
+            _, pending_columns, _, pending_extra, pending_signal_only = pending
+            for column, amount in six.iteritems(columns):
+                pending_columns[column] = pending_columns.get(column, 0) + amount
+            if extra:
+                pending_extra.update(extra)
+            if signal_only is True:
+                pending_signal_only[0] = True
+
+            flush_now = len(self._coalesced_incrs) >= self.incr_coalesce_max_keys
+            if not flush_now and self._coalesce_timer is None:
+                self._coalesce_timer = threading.Timer(
+                    self.incr_coalesce_window, self.flush_coalesced_incrs
+                )
+                self._coalesce_timer.daemon = True
+                self._coalesce_timer.start()
+
+        if flush_now:
+            self.flush_coalesced_incrs()
+
+    def flush_coalesced_incrs(self):
+        """
+        Writes all increments that are currently held back by the coalesce
+        window to Redis.
+        """
+        with self._coalesce_lock:
+            pending, self._coalesced_incrs = self._coalesced_incrs, {}
+            if self._coalesce_timer is not None:
+                self._coalesce_timer.cancel()
+                self._coalesce_timer = None
+
+        if pending:
+            self._write_incrs(
+                {
+                    key: (model, columns, filters, extra, signal_only[0])
+                    for key, (model, columns, filters, extra, signal_only) in six.iteritems(pending)
+                }
+            )
+
+    def _write_incrs(self, incrs):
+        timestamp = time()
+        commands = {}
+
+        for key, (model, columns, filters, extra, signal_only) in six.iteritems(incrs):
+            arguments = [
+                self.key_expire,
+                timestamp,
+                "%s.%s" % (model.__module__, model.__name__),
+                self._encode_filters(filters),
+                "1" if signal_only is True else "0",
+                len(columns),
+            ]
+            for column, amount in six.iteritems(columns):
+                arguments.extend((column, amount))
+
+            if extra:
+                # Group tries to serialize 'score', so we'd need some kind of processing
+                # hook here
+                # e.g. "update score if last_seen or times_seen is changed"
+                for column, value in six.iteritems(extra):
+                    arguments.extend((column, self._encode_extra_value(value)))
+
+            # Every host has its own pending set, so the pending key is
+            # written on the host of the buffer key by the same script call.
+            commands[key] = [(IncrScript, [key, self._make_pending_key_from_key(key)], arguments)]
+
+        self.cluster.execute_commands(commands)
+
     def process_pending(self, partition=None):
         if partition is None and self.pending_partitions > 1:
             # If we're using partitions, this one task fans out into
@@ -251,56 +371,84 @@ class RedisBuffer(Buffer):
         if key is not None:
             batch_keys = [key]
 
-        for key in batch_keys:
-            self._process_single_incr(key)
-
-    def _process_single_incr(self, key):
-        client = self.cluster.get_routing_client()
-        lock_key = self._make_lock_key(key)
         # prevent a stampede due to the way we use celery etas + duplicate
         # tasks
-        if not client.set(lock_key, "1", nx=True, ex=10):
-            metrics.incr("buffer.revoked", tags={"reason": "locked"}, skip_internal=False)
-            self.logger.debug("buffer.revoked.locked", extra={"redis_key": key})
-            return
+        with self.cluster.map() as client:
+            locks = [
+                (key, client.set(self._make_lock_key(key), "1", nx=True, ex=10))
+                for key in batch_keys
+            ]
+
+        locked_keys = []
+        for key, lock in locks:
+            if lock.value:
+                locked_keys.append(key)
+            else:
+                metrics.incr("buffer.revoked", tags={"reason": "locked"}, skip_internal=False)
+                self.logger.debug("buffer.revoked.locked", extra={"redis_key": key})
 
-        pending_key = self._make_pending_key_from_key(key)
+        if not locked_keys:
+            return
 
         try:
-            conn = self.cluster.get_local_client_for_key(key)
-            pipe = conn.pipeline()
-            pipe.hgetall(key)
-            pipe.zrem(pending_key, key)
-            pipe.delete(key)
-            values = pipe.execute()[0]
-
-            if not values:
-                metrics.incr("buffer.revoked", tags={"reason": "empty"}, skip_internal=False)
-                self.logger.debug("buffer.revoked.empty", extra={"redis_key": key})
-                return
-
-            model = import_string(values.pop("m"))
-            if values["f"].startswith("{"):
-                filters = self._load_values(json.loads(values.pop("f")))
-            else:
-                # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                filters = pickle.loads(values.pop("f"))
-
-            incr_values = {}
-            extra_values = {}
-            signal_only = None
-            for k, v in six.iteritems(values):
-                if k.startswith("i+"):
-                    incr_values[k[2:]] = int(v)
-                elif k.startswith("e+"):
-                    if v.startswith("["):
-                        extra_values[k[2:]] = self._load_value(json.loads(v))
-                    else:
-                        # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                        extra_values[k[2:]] = pickle.loads(v)
-                elif k == "s":
-                    signal_only = bool(int(v))  # Should be 1 if set
-
-            super(RedisBuffer, self).process(model, incr_values, filters, extra_values, signal_only)
+            incrs = []
+            for key, values in six.iteritems(self._read_and_delete_many(locked_keys)):
+                if not values:
+                    metrics.incr("buffer.revoked", tags={"reason": "empty"}, skip_internal=False)
+                    self.logger.debug("buffer.revoked.empty", extra={"redis_key": key})
+                    continue
+
+                incrs.append(self._load_incr(values))
+
+            self.process_batch(incrs)
         finally:
-            client.delete(lock_key)
+            with self.cluster.map() as client:
+                for key in locked_keys:
+                    client.delete(self._make_lock_key(key))
+
+    def _read_and_delete_many(self, keys):
+        """
+        Reads and removes the buffered values of all given keys, using one
+        transaction per Redis host.
+        """
+        keys_by_host = {}
+        router = self.cluster.get_router()
+        for key in keys:
+            keys_by_host.setdefault(router.get_host_for_key(key), []).append(key)
+
+        results = {}
+        for host_id, host_keys in six.iteritems(keys_by_host):
+            pipe = self.cluster.get_local_client(host_id).pipeline()
+            for key in host_keys:
+                pipe.hgetall(key)
+                pipe.zrem(self._make_pending_key_from_key(key), key)
+                pipe.delete(key)
+            values = pipe.execute()[::3]
+            results.update(zip(host_keys, values))
+
+        return results
+
+    def _load_incr(self, values):
+        model = import_string(values.pop("m"))
+        if values["f"].startswith("{"):
+            filters = self._load_values(json.loads(values.pop("f")))
+        else:
+            # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+            filters = pickle.loads(values.pop("f"))
+
+        incr_values = {}
+        extra_values = {}
+        signal_only = None
+        for k, v in six.iteritems(values):
+            if k.startswith("i+"):
+                incr_values[k[2:]] = int(v)
+            elif k.startswith("e+"):
+                if v.startswith("["):
+                    extra_values[k[2:]] = self._load_value(json.loads(v))
+                else:
+                    # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+                    extra_values[k[2:]] = pickle.loads(v)
+            elif k == "s":
+                signal_only = bool(int(v))  # Should be 1 if set
+
+        return (model, incr_values, filters, extra_values, signal_only)
@@ -128,3 +128,25 @@ class ExportedData(Model):
         db_table = "sentry_exporteddata"
 
     __repr__ = sane_repr("query_type", "query_info")
+
+
+class ExportedDataBlob(Model):
+    """
+    A chunk of rows of an export that is still being assembled. Chunks are
+    keyed by the row offset they start at, and double as the progress of the
+    export, which allows a retried task to continue where it stopped.
+    """
+
+    __core__ = False
+
+    data_export = FlexibleForeignKey("sentry.ExportedData")
+    blob = FlexibleForeignKey("sentry.FileBlob")
+    offset = BoundedPositiveIntegerField()
+    row_count = BoundedPositiveIntegerField()
+
+    class Meta:
+        app_label = "sentry"
+        db_table = "sentry_exporteddatablob"
+        unique_together = (("data_export", "offset"),)
+
+    __repr__ = sane_repr("data_export_id", "offset", "row_count")
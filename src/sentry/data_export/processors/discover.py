@@ -8,7 +8,7 @@ from sentry.models import Group, Project
 from sentry.snuba import discover
 from sentry.utils.compat import map
 
-from ..base import ExportError
+from ..base import ExportError, SNUBA_MAX_RESULTS
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +18,8 @@ class DiscoverProcessor(object):
     Processor for exports of discover data based on a provided query
     """
 
+    batch_size = SNUBA_MAX_RESULTS
+
     def __init__(self, organization_id, discover_query):
         self.projects = self.get_projects(organization_id, discover_query)
         self.start, self.end = get_date_range_from_params(discover_query)
@@ -55,6 +57,12 @@ class DiscoverProcessor(object):
 
         return data_fn
 
+    def run_query(self, offset, limit):
+        """
+        Returns a list of result dictionaries for the given range of rows
+        """
+        return self.handle_fields(self.data_fn(offset=offset, limit=limit)["data"])
+
     def handle_fields(self, result_list):
         # Find issue short_id if present
         # (originally in `/api/bases/organization_events.py`)
@@ -13,6 +13,9 @@ class IssuesByTagProcessor(object):
     Processor for exports of issues data based on a provided tag
     """
 
+    # The tagstore returns pages of at most 1000 values
+    batch_size = 1000
+
     def __init__(self, project_id, group_id, key, environment_id):
         self.project = self.get_project(project_id)
         self.group = self.get_group(group_id, self.project)
@@ -113,3 +116,9 @@ class IssuesByTagProcessor(object):
         """
         raw_data = self.get_raw_data(offset)
         return [self.serialize_row(item, self.key) for item in raw_data]
+
+    def run_query(self, offset, limit):
+        """
+        Returns a list of serialized GroupTagValue dictionaries for the given range of rows
+        """
+        return self.get_serialized_data(offset)[:limit]
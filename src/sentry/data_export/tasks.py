@@ -4,15 +4,18 @@ import csv
 import logging
 import six
 import tempfile
+from hashlib import sha1
 from django.db import transaction, IntegrityError
 
-from sentry.models import File
+from sentry.app import locks
+from sentry.models import File, FileBlob, FileBlobIndex
 from sentry.tasks.base import instrumented_task
 from sentry.utils import metrics
+from sentry.utils.retries import TimedRetryPolicy
 from sentry.utils.sdk import capture_exception
 
-from .base import ExportError, ExportQueryType, SNUBA_MAX_RESULTS
-from .models import ExportedData
+from .base import ExportError, ExportQueryType
+from .models import ExportedData, ExportedDataBlob
 from .utils import convert_to_utf8, snuba_error_handler
 from .processors.discover import DiscoverProcessor
 from .processors.issues_by_tag import IssuesByTagProcessor
@@ -20,9 +23,24 @@ from .processors.issues_by_tag import IssuesByTagProcessor
 
 logger = logging.getLogger(__name__)
 
+# The number of chunks of an export that are fetched at the same time
+EXPORT_CONCURRENCY = 4
+EXPORTED_ROWS_LIMIT = 1000000
+MERGE_LOCK_TIMEOUT = 60
 
-@instrumented_task(name="sentry.data_export.tasks.assemble_download", queue="data_export")
-def assemble_download(data_export_id, limit=1000000, environment_id=None):
+
+@instrumented_task(
+    name="sentry.data_export.tasks.assemble_download", queue="data_export", acks_late=True
+)
+def assemble_download(
+    data_export_id, limit=EXPORTED_ROWS_LIMIT, environment_id=None, concurrency=EXPORT_CONCURRENCY
+):
+    """
+    Starts exporting the data in chunks of rows, see ``export_chunk``.
+
+    Chunks that were already stored by a previous run are not fetched again,
+    so calling this for an unfinished export continues where it stopped.
+    """
     # Get the ExportedData object
     try:
         logger.info("dataexport.start", extra={"data_export_id": data_export_id})
@@ -33,131 +51,214 @@ def assemble_download(data_export_id, limit=1000000, environment_id=None):
         capture_exception(error)
         return
 
-    # Create a temporary file
+    # Validate the query before scheduling any chunks
     try:
-        with tempfile.TemporaryFile() as tf:
-            # Process the query based on its type
-            if data_export.query_type == ExportQueryType.ISSUES_BY_TAG:
-                process_issues_by_tag(
-                    data_export=data_export, file=tf, limit=limit, environment_id=environment_id
-                )
-            elif data_export.query_type == ExportQueryType.DISCOVER:
-                process_discover(
-                    data_export=data_export, file=tf, limit=limit, environment_id=environment_id
-                )
-            # Create a new File object and attach it to the ExportedData
-            tf.seek(0)
-            try:
-                with transaction.atomic():
-                    file = File.objects.create(
-                        name=data_export.file_name,
-                        type="export.csv",
-                        headers={"Content-Type": "text/csv"},
-                    )
-                    file.putfile(tf, logger=logger)
-                    data_export.finalize_upload(file=file)
-                    logger.info("dataexport.end", extra={"data_export_id": data_export_id})
-                    metrics.incr("dataexport.end", sample_rate=1.0)
-            except IntegrityError as error:
-                metrics.incr(
-                    "dataexport.error", tags={"error": six.text_type(error)}, sample_rate=1.0
-                )
-                logger.info(
-                    "dataexport.error: {}".format(six.text_type(error)),
-                    extra={"query": data_export.payload, "org": data_export.organization_id},
-                )
-                capture_exception(error)
-                raise ExportError("Failed to save the assembled file")
+        get_processor(data_export, environment_id)
     except ExportError as error:
         return data_export.email_failure(message=six.text_type(error))
     except BaseException as error:
-        metrics.incr("dataexport.error", tags={"error": six.text_type(error)}, sample_rate=1.0)
-        logger.info(
-            "dataexport.error: {}".format(six.text_type(error)),
-            extra={"query": data_export.payload, "org": data_export.organization_id},
-        )
-        capture_exception(error)
-        return data_export.email_failure(message="Internal processing failure")
+        return handle_error(data_export, error)
+
+    export_chunk.delay(
+        data_export_id=data_export_id,
+        offset=0,
+        limit=limit or EXPORTED_ROWS_LIMIT,
+        environment_id=environment_id,
+        concurrency=concurrency,
+    )
 
 
-def process_issues_by_tag(data_export, file, limit, environment_id):
+@instrumented_task(
+    name="sentry.data_export.tasks.export_chunk",
+    queue="data_export",
+    acks_late=True,
+    default_retry_delay=60,
+    max_retries=3,
+)
+def export_chunk(
+    data_export_id, offset, limit, environment_id=None, concurrency=EXPORT_CONCURRENCY
+):
     """
-    Convert the tag query to a CSV, writing it to the provided file.
+    Stores the rows of the export starting at ``offset`` as a FileBlob.
+
+    The export is split into chunks of the processor's batch size. Once the
+    first chunk turns out to be full, ``concurrency`` chains of tasks fetch
+    every ``concurrency``-th chunk, until they reach the end of the data or
+    the limit. Every chunk checks whether the export is complete and the
+    one that completes it merges all chunks into the final file.
     """
+    try:
+        data_export = ExportedData.objects.get(id=data_export_id)
+    except ExportedData.DoesNotExist:
+        # The export failed in another chunk and has been deleted
+        return
+
+    if data_export.date_finished is not None:
+        return
+
+    try:
+        batch_size = get_processor_class(data_export).batch_size
+        chunk = ExportedDataBlob.objects.filter(data_export=data_export, offset=offset).first()
+        if chunk is None:
+            processor = get_processor(data_export, environment_id)
+            chunk = store_export_chunk(
+                data_export, processor, offset=offset, limit=min(batch_size, limit - offset)
+            )
+
+        if not is_last_chunk(chunk, batch_size, limit):
+            # The first chunk starts the other chains, every chain then
+            # continues with its next chunk.
+            if offset == 0:
+                next_offsets = [batch_size * i for i in range(1, concurrency + 1)]
+            else:
+                next_offsets = [offset + batch_size * concurrency]
+
+            for next_offset in next_offsets:
+                if next_offset < limit:
+                    export_chunk.delay(
+                        data_export_id=data_export_id,
+                        offset=next_offset,
+                        limit=limit,
+                        environment_id=environment_id,
+                        concurrency=concurrency,
+                    )
+
+        merge_export_chunks(data_export, batch_size, limit)
+    except ExportError as error:
+        return data_export.email_failure(message=six.text_type(error))
+    except Exception as error:
+        if export_chunk.request.retries < export_chunk.max_retries:
+            metrics.incr("dataexport.retry", sample_rate=1.0)
+            raise export_chunk.retry(exc=error)
+        return handle_error(data_export, error)
+
+
+def get_processor_class(data_export):
+    if data_export.query_type == ExportQueryType.ISSUES_BY_TAG:
+        return IssuesByTagProcessor
+    elif data_export.query_type == ExportQueryType.DISCOVER:
+        return DiscoverProcessor
+    raise ExportError("Unknown export type")
+
+
+def get_processor(data_export, environment_id):
     payload = data_export.query_info
     try:
-        processor = IssuesByTagProcessor(
-            project_id=payload["project"][0],
-            group_id=payload["group"],
-            key=payload["key"],
-            environment_id=environment_id,
-        )
+        if data_export.query_type == ExportQueryType.ISSUES_BY_TAG:
+            return IssuesByTagProcessor(
+                project_id=payload["project"][0],
+                group_id=payload["group"],
+                key=payload["key"],
+                environment_id=environment_id,
+            )
+        elif data_export.query_type == ExportQueryType.DISCOVER:
+            return DiscoverProcessor(
+                discover_query=payload, organization_id=data_export.organization_id
+            )
+        raise ExportError("Unknown export type")
     except ExportError as error:
         metrics.incr("dataexport.error", tags={"error": six.text_type(error)}, sample_rate=1.0)
         logger.info("dataexport.error: {}".format(six.text_type(error)))
         capture_exception(error)
         raise error
 
-    writer = create_writer(file, processor.header_fields)
-    iteration = 0
+
+def store_export_chunk(data_export, processor, offset, limit):
+    """
+    Convert a range of rows to CSV and store it as a chunk of the export.
+    """
     with snuba_error_handler(logger=logger):
-        is_completed = False
-        while not is_completed:
-            offset = SNUBA_MAX_RESULTS * iteration
-            next_offset = SNUBA_MAX_RESULTS * (iteration + 1)
-            is_exceeding_limit = limit and limit < next_offset
-            gtv_list_unicode = processor.get_serialized_data(offset=offset)
-            # TODO(python3): Remove next line once the 'csv' module has been updated to Python 3
-            # See associated comment in './utils.py'
-            gtv_list = convert_to_utf8(gtv_list_unicode)
-            if is_exceeding_limit:
-                # Since the next offset will pass the limit, just write the remainder
-                writer.writerows(gtv_list[: limit % SNUBA_MAX_RESULTS])
-            else:
-                writer.writerows(gtv_list)
-                iteration += 1
-            # If there are no returned results, or we've passed the limit, stop iterating
-            is_completed = len(gtv_list) == 0 or is_exceeding_limit
+        rows_unicode = processor.run_query(offset=offset, limit=limit)
+    # TODO(python3): Remove next line once the 'csv' module has been updated to Python 3
+    # See associated comment in './utils.py'
+    rows = convert_to_utf8(rows_unicode)
+
+    with tempfile.TemporaryFile() as tf:
+        writer = csv.DictWriter(tf, processor.header_fields, extrasaction="ignore")
+        if offset == 0:
+            writer.writeheader()
+        writer.writerows(rows)
+        tf.seek(0)
+        blob = FileBlob.from_file(tf, logger=logger)
+
+    try:
+        with transaction.atomic():
+            return ExportedDataBlob.objects.create(
+                data_export=data_export, blob=blob, offset=offset, row_count=len(rows)
+            )
+    except IntegrityError:
+        # A concurrent run of the same task stored the chunk first
+        return ExportedDataBlob.objects.get(data_export=data_export, offset=offset)
 
 
-def process_discover(data_export, file, limit, environment_id):
+def is_last_chunk(chunk, batch_size, limit):
+    return chunk.offset + batch_size >= limit or chunk.row_count < batch_size
+
+
+def merge_export_chunks(data_export, batch_size, limit):
     """
-    Convert the discovery query to a CSV, writing it to the provided file.
+    Assemble the file of the export once all of its chunks have been stored.
     """
-    try:
-        processor = DiscoverProcessor(
-            discover_query=data_export.query_info, organization_id=data_export.organization_id
-        )
-    except ExportError as error:
-        metrics.incr("dataexport.error", tags={"error": six.text_type(error)}, sample_rate=1.0)
-        logger.info("dataexport.error: {}".format(six.text_type(error)))
-        capture_exception(error)
-        raise error
+    lock = locks.get(u"dataexport:merge:{}".format(data_export.id), duration=MERGE_LOCK_TIMEOUT)
+    with TimedRetryPolicy(MERGE_LOCK_TIMEOUT, metric_instance="lock.dataexport.merge")(
+        lock.acquire
+    ):
+        chunks = []
+        for index, chunk in enumerate(
+            ExportedDataBlob.objects.filter(data_export=data_export)
+            .select_related("blob")
+            .order_by("offset")
+        ):
+            if chunk.offset != batch_size * index:
+                return
+            chunks.append(chunk)
+            # Chains may already have stored empty chunks past the last one
+            if is_last_chunk(chunk, batch_size, limit):
+                break
+        else:
+            return
 
-    writer = create_writer(file, processor.header_fields)
-    iteration = 0
-    with snuba_error_handler(logger=logger):
-        is_completed = False
-        while not is_completed:
-            offset = SNUBA_MAX_RESULTS * iteration
-            next_offset = SNUBA_MAX_RESULTS * (iteration + 1)
-            is_exceeding_limit = limit and limit < next_offset
-            raw_data_unicode = processor.data_fn(offset=offset, limit=SNUBA_MAX_RESULTS)["data"]
-            # TODO(python3): Remove next line once the 'csv' module has been updated to Python 3
-            # See associated comment in './utils.py'
-            raw_data = convert_to_utf8(raw_data_unicode)
-            raw_data = processor.handle_fields(raw_data)
-            if is_exceeding_limit:
-                # Since the next offset will pass the limit, just write the remainder
-                writer.writerows(raw_data[: limit % SNUBA_MAX_RESULTS])
-            else:
-                writer.writerows(raw_data)
-                iteration += 1
-            # If there are no returned results, or we've passed the limit, stop iterating
-            is_completed = len(raw_data) == 0 or is_exceeding_limit
+        data_export = ExportedData.objects.get(id=data_export.id)
+        if data_export.date_finished is not None:
+            return
+
+        try:
+            with transaction.atomic():
+                file = File.objects.create(
+                    name=data_export.file_name,
+                    type="export.csv",
+                    headers={"Content-Type": "text/csv"},
+                )
+                size = 0
+                checksum = sha1(b"")
+                for chunk in chunks:
+                    # Only the first chunk contributes the header to an empty export
+                    if not chunk.row_count and chunk.offset:
+                        continue
+                    FileBlobIndex.objects.create(file=file, blob=chunk.blob, offset=size)
+                    for data in chunk.blob.getfile().chunks():
+                        checksum.update(data)
+                    size += chunk.blob.size
+                file.update(size=size, checksum=checksum.hexdigest())
+                data_export.finalize_upload(file=file)
+                ExportedDataBlob.objects.filter(data_export=data_export).delete()
+                logger.info("dataexport.end", extra={"data_export_id": data_export.id})
+                metrics.incr("dataexport.end", sample_rate=1.0)
+        except IntegrityError as error:
+            metrics.incr("dataexport.error", tags={"error": six.text_type(error)}, sample_rate=1.0)
+            logger.info(
+                "dataexport.error: {}".format(six.text_type(error)),
+                extra={"query": data_export.payload, "org": data_export.organization_id},
+            )
+            capture_exception(error)
+            raise ExportError("Failed to save the assembled file")
 
 
-def create_writer(file, fields):
-    writer = csv.DictWriter(file, fields, extrasaction="ignore")
-    writer.writeheader()
-    return writer
+def handle_error(data_export, error):
+    metrics.incr("dataexport.error", tags={"error": six.text_type(error)}, sample_rate=1.0)
+    logger.info(
+        "dataexport.error: {}".format(six.text_type(error)),
+        extra={"query": data_export.payload, "org": data_export.organization_id},
+    )
+    capture_exception(error)
+    return data_export.email_failure(message="Internal processing failure")
@@ -3,15 +3,15 @@ from __future__ import absolute_import
 import itertools
 import six
 
-from django.db import IntegrityError, router, transaction
-from django.db.models import Model, Q
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import AutoField, Model, Q
 from django.db.models.expressions import CombinedExpression
 from django.db.models.signals import post_save
 from six.moves import reduce
 
 from .utils import resolve_combined_expression
 
-__all__ = ("update", "create_or_update")
+__all__ = ("update", "create_or_update", "bulk_update_from_values")
 
 
 def update(self, using=None, **kwargs):
@@ -98,6 +98,89 @@ def create_or_update(model, using=None, **kwargs):
     return affected, False
 
 
+def _get_cast_type(field, connection):
+    # Serial columns cannot be used as casts, fall back to their plain
+    # integer types (see ``BoundedBigAutoField``).
+    if hasattr(field, "get_related_db_type"):
+        return field.get_related_db_type(connection)
+    if isinstance(field, AutoField):
+        return field.rel_db_type(connection)
+    return field.db_type(connection)
+
+
+def bulk_update_from_values(model, lookups, increments, values, rows, expressions=None, using=None):
+    """
+    Updates many rows of ``model`` with a single statement of the form
+    ``UPDATE ... FROM (VALUES ...)``.
+
+    Every row is a tuple holding the values for the ``lookups`` columns used
+    to find the row, followed by the ``increments`` columns which are added
+    to the current values, followed by the ``values`` columns which replace
+    the current values. ``expressions`` maps further columns to raw SQL that
+    can refer to the current row as ``t`` and to the new values as ``v``.
+
+    Returns the set of lookup tuples of all rows that were updated.
+
+    >>> bulk_update_from_values(Group, ['id'], ['times_seen'], [], [(1, 2), (3, 1)])
+    """
+    if not rows:
+        return set()
+
+    if not using:
+        using = router.db_for_write(model)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    opts = model._meta
+
+    def get_field(name):
+        return opts.pk if name == "pk" else opts.get_field(name)
+
+    lookup_fields = [get_field(name) for name in lookups]
+    increment_fields = [get_field(name) for name in increments]
+    value_fields = [get_field(name) for name in values]
+    fields = lookup_fields + increment_fields + value_fields
+
+    assignments = [
+        u"{0} = t.{0} + v.{0}".format(qn(field.column)) for field in increment_fields
+    ] + [u"{0} = v.{0}".format(qn(field.column)) for field in value_fields]
+    for name, sql in six.iteritems(expressions or {}):
+        assignments.append(u"{} = {}".format(qn(get_field(name).column), sql))
+
+    placeholder = u"({})".format(
+        u", ".join(u"%s::{}".format(_get_cast_type(field, connection)) for field in fields)
+    )
+    params = []
+    for row in rows:
+        assert len(row) == len(fields)
+        for field, value in zip(fields, row):
+            if isinstance(value, Model):
+                value = value.pk
+            params.append(field.get_db_prep_save(value, connection))
+
+    sql = u"""
+        UPDATE {table} AS t SET {assignments}
+        FROM (VALUES {values}) AS v ({columns})
+        WHERE {conditions}
+        RETURNING {returning}
+    """.format(
+        table=qn(opts.db_table),
+        assignments=u", ".join(assignments),
+        values=u", ".join([placeholder] * len(rows)),
+        columns=u", ".join(qn(field.column) for field in fields),
+        conditions=u" AND ".join(
+            u"t.{0} = v.{0}".format(qn(field.column)) for field in lookup_fields
+        ),
+        returning=u", ".join(u"t.{}".format(qn(field.column)) for field in lookup_fields),
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return set(
+            tuple(field.to_python(value) for field, value in zip(lookup_fields, result))
+            for result in cursor.fetchall()
+        )
+
+
 def in_iexact(column, values):
     """Operator to test if any of the given values are (case-insensitive)
        matching to values in the given column."""
@@ -467,204 +467,69 @@ class EventManager(object):
                 id=project.organization_id
             )
 
-        job = {"data": self._data, "project_id": project_id, "raw": raw, "start_time": start_time}
+        job = {
+            "data": self._data,
+            "project_id": project_id,
+            "raw": raw,
+            "start_time": start_time,
+            "cache_key": cache_key,
+        }
         jobs = [job]
 
         _pull_out_data(jobs, projects)
         _get_or_create_release_many(jobs, projects)
         _get_event_user_many(jobs, projects)
-
-        with metrics.timer("event_manager.load_grouping_config"):
-            # At this point we want to normalize the in_app values in case the
-            # clients did not set this appropriately so far.
-            grouping_config = load_grouping_config(
-                get_grouping_config_dict_for_event_data(job["data"], project)
-            )
-
-        with metrics.timer("event_manager.normalize_stacktraces_for_grouping"):
-            normalize_stacktraces_for_grouping(job["data"], grouping_config)
-
+        _normalize_stacktraces_for_grouping_many(jobs, projects)
         _derive_plugin_tags_many(jobs, projects)
         _derive_interface_tags_many(jobs)
-
-        with metrics.timer("event_manager.apply_server_fingerprinting"):
-            # The active grouping config was put into the event in the
-            # normalize step before.  We now also make sure that the
-            # fingerprint was set to `'{{ default }}' just in case someone
-            # removed it from the payload.  The call to get_hashes will then
-            # look at `grouping_config` to pick the right parameters.
-            job["data"]["fingerprint"] = job["data"].get("fingerprint") or ["{{ default }}"]
-            apply_server_fingerprinting(job["data"], get_fingerprinting_config_for_project(project))
-
-        with metrics.timer("event_manager.event.get_hashes"):
-            # Here we try to use the grouping config that was requested in the
-            # event.  If that config has since been deleted (because it was an
-            # experimental grouping config) we fall back to the default.
-            try:
-                hashes = job["event"].get_hashes()
-            except GroupingConfigNotFound:
-                job["data"]["grouping_config"] = get_grouping_config_dict_for_project(project)
-                hashes = job["event"].get_hashes()
-
-        job["data"]["hashes"] = hashes
-
+        _calculate_event_grouping_many(jobs, projects)
         _materialize_metadata_many(jobs)
 
-        # The group gets the same metadata as the event when it's flushed but
-        # additionally the `last_received` key is set.  This key is used by
-        # _save_aggregate.
-        group_metadata = dict(job["materialized_metadata"])
-        group_metadata["last_received"] = job["received_timestamp"]
-        kwargs = {
-            "platform": job["platform"],
-            "message": job["event"].search_message,
-            "culprit": job["culprit"],
-            "logger": job["logger_name"],
-            "level": LOG_LEVELS_MAP.get(job["level"]),
-            "last_seen": job["event"].datetime,
-            "first_seen": job["event"].datetime,
-            "active_at": job["event"].datetime,
-            "data": group_metadata,
-        }
+        if _save_aggregate_many(jobs, projects):
+            _handle_discarded_hash(job, project)
+            raise HashDiscarded(job["discard_reason"])
 
-        if job["release"]:
-            kwargs["first_release"] = job["release"]
+        _finish_saving_events(jobs, projects)
 
-        try:
-            job["group"], job["is_new"], job["is_regression"] = _save_aggregate(
-                event=job["event"], hashes=hashes, release=job["release"], **kwargs
-            )
-        except HashDiscarded:
-            project_key = None
-            if job["key_id"] is not None:
-                try:
-                    project_key = ProjectKey.objects.get_from_cache(id=job["key_id"])
-                except ProjectKey.DoesNotExist:
-                    pass
-
-            quotas.refund(project, key=project_key, timestamp=start_time)
-
-            track_outcome(
-                org_id=project.organization_id,
-                project_id=project_id,
-                key_id=job["key_id"],
-                outcome=Outcome.FILTERED,
-                reason=FilterStatKeys.DISCARDED_HASH,
-                timestamp=to_datetime(job["start_time"]),
-                event_id=job["event"].event_id,
-                category=job["category"],
-            )
+        self._data = job["event"].data.data
+        return job["event"]
 
-            metrics.incr(
-                "events.discarded",
-                skip_internal=True,
-                tags={"organization_id": project.organization_id, "platform": job["platform"]},
-            )
-            raise
 
+def _finish_saving_events(jobs, projects):
+    """
+    Everything that happens to error events after they have been assigned to
+    a group. Shared between `EventManager.save` and `save_error_events`.
+    """
+    for job in jobs:
         job["event"].group = job["group"]
 
         # store a reference to the group id to guarantee validation of isolation
         # XXX(markus): No clue what this does
         job["event"].data.bind_ref(job["event"])
 
-        _get_or_create_environment_many(jobs, projects)
-
-        if job["group"]:
-            group_environment, job["is_new_group_environment"] = GroupEnvironment.get_or_create(
-                group_id=job["group"].id,
-                environment_id=job["environment"].id,
-                defaults={"first_release": job["release"] or None},
-            )
-        else:
-            job["is_new_group_environment"] = False
-
-        _get_or_create_release_associated_models(jobs, projects)
-
-        if job["release"] and job["group"]:
-            job["grouprelease"] = GroupRelease.get_or_create(
-                group=job["group"],
-                release=job["release"],
-                environment=job["environment"],
-                datetime=job["event"].datetime,
-            )
-
-        _tsdb_record_all_metrics(jobs)
-
-        if job["group"]:
-            UserReport.objects.filter(project=project, event_id=job["event"].event_id).update(
-                group=job["group"], environment=job["environment"]
-            )
-
-        _materialize_event_metrics(jobs)
-
-        # Load attachments first, but persist them at the very last after
-        # posting to eventstream to make sure all counters and eventstream are
-        # incremented for sure.
-        attachments = []
-        for attachment in get_attachments(cache_key, job["event"]):
-            try:
-                attachment_data = attachment.data
-            except MissingAttachmentChunks:
-                logger.exception("Missing chunks for cache_key=%s", cache_key)
-            else:
-                key = "bytes.stored.%s" % (attachment.type,)
-                job["event_metrics"][key] = (job["event_metrics"].get(key) or 0) + len(
-                    attachment_data
-                )
-                attachments.append(attachment)
-
-        _nodestore_save_many(jobs)
-
-        if job["release"]:
-            if job["is_new"]:
-                buffer.incr(
-                    ReleaseProject,
-                    {"new_groups": 1},
-                    {"release_id": job["release"].id, "project_id": project.id},
-                )
-            if job["is_new_group_environment"]:
-                buffer.incr(
-                    ReleaseProjectEnvironment,
-                    {"new_issues_count": 1},
-                    {
-                        "project_id": project.id,
-                        "release_id": job["release"].id,
-                        "environment_id": job["environment"].id,
-                    },
-                )
-
-        if not raw:
-            if not project.first_event:
-                project.update(first_event=job["event"].datetime)
-                first_event_received.send_robust(
-                    project=project, event=job["event"], sender=Project
-                )
-
-        _eventstream_insert_many(jobs)
-
-        # Do this last to ensure signals get emitted even if connection to the
-        # file store breaks temporarily.
-        save_attachments(attachments, job["event"])
+    _get_or_create_environment_many(jobs, projects)
+    _get_or_create_group_environment_many(jobs)
+    _get_or_create_release_associated_models(jobs, projects)
+    _get_or_create_group_release_many(jobs)
+    _tsdb_record_all_metrics(jobs)
+    _update_user_reports_many(jobs)
+    _materialize_event_metrics(jobs)
 
-        metric_tags = {"from_relay": "_relay_processed" in job["data"]}
+    # Load attachments first, but persist them at the very last after
+    # posting to eventstream to make sure all counters and eventstream are
+    # incremented for sure.
+    _get_attachments_many(jobs)
 
-        metrics.timing(
-            "events.latency",
-            job["received_timestamp"] - job["recorded_timestamp"],
-            tags=metric_tags,
-        )
-        metrics.timing("events.size.data.post_save", job["event"].size, tags=metric_tags)
-        metrics.incr(
-            "events.post_save.normalize.errors",
-            amount=len(job["data"].get("errors") or ()),
-            tags=metric_tags,
-        )
-
-        _track_outcome_accepted_many(jobs)
+    _nodestore_save_many(jobs)
+    _increment_release_associated_counts_many(jobs, projects)
+    _record_first_event_many(jobs, projects)
+    _eventstream_insert_many(jobs)
 
-        self._data = job["event"].data.data
-        return job["event"]
+    # Do this last to ensure signals get emitted even if connection to the
+    # file store breaks temporarily.
+    _save_attachments_many(jobs)
+    _track_event_metrics_many(jobs)
+    _track_outcome_accepted_many(jobs)
 
 
 @metrics.wraps("save_event.pull_out_data")
@@ -773,6 +638,47 @@ def _get_event_user_many(jobs, projects):
         job["user"] = user
 
 
+@metrics.wraps("save_event.normalize_stacktraces_for_grouping_many")
+def _normalize_stacktraces_for_grouping_many(jobs, projects):
+    for job in jobs:
+        with metrics.timer("event_manager.load_grouping_config"):
+            # At this point we want to normalize the in_app values in case the
+            # clients did not set this appropriately so far.
+            grouping_config = load_grouping_config(
+                get_grouping_config_dict_for_event_data(job["data"], projects[job["project_id"]])
+            )
+
+        with metrics.timer("event_manager.normalize_stacktraces_for_grouping"):
+            normalize_stacktraces_for_grouping(job["data"], grouping_config)
+
+
+@metrics.wraps("save_event.calculate_event_grouping_many")
+def _calculate_event_grouping_many(jobs, projects):
+    for job in jobs:
+        project = projects[job["project_id"]]
+
+        with metrics.timer("event_manager.apply_server_fingerprinting"):
+            # The active grouping config was put into the event in the
+            # normalize step before.  We now also make sure that the
+            # fingerprint was set to `'{{ default }}' just in case someone
+            # removed it from the payload.  The call to get_hashes will then
+            # look at `grouping_config` to pick the right parameters.
+            job["data"]["fingerprint"] = job["data"].get("fingerprint") or ["{{ default }}"]
+            apply_server_fingerprinting(job["data"], get_fingerprinting_config_for_project(project))
+
+        with metrics.timer("event_manager.event.get_hashes"):
+            # Here we try to use the grouping config that was requested in the
+            # event.  If that config has since been deleted (because it was an
+            # experimental grouping config) we fall back to the default.
+            try:
+                hashes = job["event"].get_hashes()
+            except GroupingConfigNotFound:
+                job["data"]["grouping_config"] = get_grouping_config_dict_for_project(project)
+                hashes = job["event"].get_hashes()
+
+        job["data"]["hashes"] = hashes
+
+
 @metrics.wraps("save_event.derive_plugin_tags_many")
 def _derive_plugin_tags_many(jobs, projects):
     # XXX: We ought to inline or remove this one for sure
@@ -828,6 +734,19 @@ def _get_or_create_environment_many(jobs, projects):
         )
 
 
+@metrics.wraps("save_event.get_or_create_group_environment_many")
+def _get_or_create_group_environment_many(jobs):
+    for job in jobs:
+        if job["group"]:
+            group_environment, job["is_new_group_environment"] = GroupEnvironment.get_or_create(
+                group_id=job["group"].id,
+                environment_id=job["environment"].id,
+                defaults={"first_release": job["release"] or None},
+            )
+        else:
+            job["is_new_group_environment"] = False
+
+
 @metrics.wraps("save_event.get_or_create_release_associated_models")
 def _get_or_create_release_associated_models(jobs, projects):
     # XXX: This is possibly unnecessarily detached from
@@ -851,6 +770,18 @@ def _get_or_create_release_associated_models(jobs, projects):
         )
 
 
+@metrics.wraps("save_event.get_or_create_group_release_many")
+def _get_or_create_group_release_many(jobs):
+    for job in jobs:
+        if job["release"] and job["group"]:
+            job["grouprelease"] = GroupRelease.get_or_create(
+                group=job["group"],
+                release=job["release"],
+                environment=job["environment"],
+                datetime=job["event"].datetime,
+            )
+
+
 @metrics.wraps("save_event.tsdb_record_all_metrics")
 def _tsdb_record_all_metrics(jobs):
     """
@@ -907,6 +838,52 @@ def _tsdb_record_all_metrics(jobs):
             tsdb.record_frequency_multi(frequencies, timestamp=event.datetime)
 
 
+@metrics.wraps("save_event.update_user_reports_many")
+def _update_user_reports_many(jobs):
+    jobs_by_event = {
+        (job["project_id"], job["event"].event_id): job for job in jobs if job["group"]
+    }
+    if not jobs_by_event:
+        return
+
+    # Most events do not have user reports, so look them up for the entire
+    # batch at once instead of issuing one UPDATE per event.
+    user_reports = UserReport.objects.filter(
+        project_id__in=set(project_id for project_id, _ in jobs_by_event),
+        event_id__in=set(event_id for _, event_id in jobs_by_event),
+    )
+
+    for user_report in user_reports:
+        job = jobs_by_event.get((user_report.project_id, user_report.event_id))
+        if job is not None:
+            user_report.update(group=job["group"], environment=job["environment"])
+
+
+@metrics.wraps("save_event.get_attachments_many")
+def _get_attachments_many(jobs):
+    for job in jobs:
+        cache_key = job.get("cache_key")
+        attachments = []
+        for attachment in get_attachments(cache_key, job["event"]):
+            try:
+                attachment_data = attachment.data
+            except MissingAttachmentChunks:
+                logger.exception("Missing chunks for cache_key=%s", cache_key)
+            else:
+                key = "bytes.stored.%s" % (attachment.type,)
+                job["event_metrics"][key] = (job["event_metrics"].get(key) or 0) + len(
+                    attachment_data
+                )
+                attachments.append(attachment)
+        job["attachments"] = attachments
+
+
+@metrics.wraps("save_event.save_attachments_many")
+def _save_attachments_many(jobs):
+    for job in jobs:
+        save_attachments(job["attachments"], job["event"])
+
+
 @metrics.wraps("save_event.nodestore_save_many")
 def _nodestore_save_many(jobs):
     for job in jobs:
@@ -914,6 +891,44 @@ def _nodestore_save_many(jobs):
         job["event"].data.save()
 
 
+@metrics.wraps("save_event.increment_release_associated_counts_many")
+def _increment_release_associated_counts_many(jobs, projects):
+    for job in jobs:
+        release = job["release"]
+        if not release:
+            continue
+
+        project_id = projects[job["project_id"]].id
+        if job["is_new"]:
+            buffer.incr(
+                ReleaseProject,
+                {"new_groups": 1},
+                {"release_id": release.id, "project_id": project_id},
+            )
+        if job["is_new_group_environment"]:
+            buffer.incr(
+                ReleaseProjectEnvironment,
+                {"new_issues_count": 1},
+                {
+                    "project_id": project_id,
+                    "release_id": release.id,
+                    "environment_id": job["environment"].id,
+                },
+            )
+
+
+@metrics.wraps("save_event.record_first_event_many")
+def _record_first_event_many(jobs, projects):
+    for job in jobs:
+        if job["raw"]:
+            continue
+
+        project = projects[job["project_id"]]
+        if not project.first_event:
+            project.update(first_event=job["event"].datetime)
+            first_event_received.send_robust(project=project, event=job["event"], sender=Project)
+
+
 @metrics.wraps("save_event.eventstream_insert_many")
 def _eventstream_insert_many(jobs):
     for job in jobs:
@@ -934,6 +949,24 @@ def _eventstream_insert_many(jobs):
         )
 
 
+@metrics.wraps("save_event.track_event_metrics_many")
+def _track_event_metrics_many(jobs):
+    for job in jobs:
+        metric_tags = {"from_relay": "_relay_processed" in job["data"]}
+
+        metrics.timing(
+            "events.latency",
+            job["received_timestamp"] - job["recorded_timestamp"],
+            tags=metric_tags,
+        )
+        metrics.timing("events.size.data.post_save", job["event"].size, tags=metric_tags)
+        metrics.incr(
+            "events.post_save.normalize.errors",
+            amount=len(job["data"].get("errors") or ()),
+            tags=metric_tags,
+        )
+
+
 @metrics.wraps("save_event.track_outcome_accepted_many")
 def _track_outcome_accepted_many(jobs):
     for job in jobs:
@@ -1050,84 +1083,260 @@ def get_culprit(data):
     )
 
 
-def _save_aggregate(event, hashes, release, **kwargs):
-    project = event.project
+def _get_group_creation_kwargs(job):
+    # The group gets the same metadata as the event when it's flushed but
+    # additionally the `last_received` key is set.  This key is used by
+    # _save_aggregate_many.
+    group_metadata = dict(job["materialized_metadata"])
+    group_metadata["last_received"] = job["received_timestamp"]
+    kwargs = {
+        "platform": job["platform"],
+        "message": job["event"].search_message,
+        "culprit": job["culprit"],
+        "logger": job["logger_name"],
+        "level": LOG_LEVELS_MAP.get(job["level"]),
+        "last_seen": job["event"].datetime,
+        "first_seen": job["event"].datetime,
+        "active_at": job["event"].datetime,
+        "data": group_metadata,
+    }
+
+    if job["release"]:
+        kwargs["first_release"] = job["release"]
 
-    # attempt to find a matching hash
-    all_hashes = _find_hashes(project, hashes)
+    return kwargs
 
-    existing_group_id = None
-    for h in all_hashes:
-        if h.group_id is not None:
-            existing_group_id = h.group_id
-            break
-        if h.group_tombstone_id is not None:
-            raise HashDiscarded("Matches group tombstone %s" % h.group_tombstone_id)
+
+def _handle_discarded_hash(job, project):
+    project_key = None
+    if job["key_id"] is not None:
+        try:
+            project_key = ProjectKey.objects.get_from_cache(id=job["key_id"])
+        except ProjectKey.DoesNotExist:
+            pass
+
+    quotas.refund(project, key=project_key, timestamp=job["start_time"])
+
+    track_outcome(
+        org_id=project.organization_id,
+        project_id=job["project_id"],
+        key_id=job["key_id"],
+        outcome=Outcome.FILTERED,
+        reason=FilterStatKeys.DISCARDED_HASH,
+        timestamp=to_datetime(job["start_time"]),
+        event_id=job["event"].event_id,
+        category=job["category"],
+    )
+
+    metrics.incr(
+        "events.discarded",
+        skip_internal=True,
+        tags={"organization_id": project.organization_id, "platform": job["platform"]},
+    )
+
+
+@metrics.wraps("save_event.find_hashes_many")
+def _find_hashes_many(jobs, projects):
+    """
+    Assigns the ``GroupHash`` of every hash to the jobs. Existing hashes of
+    all jobs are fetched with a single query, only hashes seen for the first
+    time are created one by one.
+    """
+    hashes = set()
+    for job in jobs:
+        for hash in job["data"]["hashes"]:
+            hashes.add((job["project_id"], hash))
+
+    if not hashes:
+        return
+
+    grouphashes = {}
+    for grouphash in GroupHash.objects.filter(
+        project_id__in=set(project_id for project_id, _ in hashes),
+        hash__in=set(hash for _, hash in hashes),
+    ):
+        grouphashes[(grouphash.project_id, grouphash.hash)] = grouphash
+
+    for project_id, hash in hashes:
+        if (project_id, hash) not in grouphashes:
+            grouphashes[(project_id, hash)] = GroupHash.objects.get_or_create(
+                project=projects[project_id], hash=hash
+            )[0]
+
+    for job in jobs:
+        job["grouphashes"] = [
+            grouphashes[(job["project_id"], hash)] for hash in job["data"]["hashes"]
+        ]
+
+
+@metrics.wraps("save_event.save_aggregate_many")
+def _save_aggregate_many(jobs, projects):
+    """
+    Assigns ``group``, ``is_new`` and ``is_regression`` to every job. Returns
+    the jobs that were dropped instead, because their hashes matched a group
+    tombstone or a group that no longer exists. Each of these has a
+    ``discard_reason``.
+
+    Jobs are resolved in order as if they had been saved one after another:
+    an event whose hashes were claimed by a group created earlier in the same
+    batch ends up in that group.
+    """
+    _find_hashes_many(jobs, projects)
+
+    # Groups that hashes were assigned to by earlier jobs in this batch,
+    # either an existing group id or the job that creates a new group.
+    assigned = {}
+    existing_group_ids = set()
+    creating_jobs = []
+    discarded_jobs = []
+    saved_jobs = []
+
+    for job in jobs:
+        project_id = job["project_id"]
+        target = None
+        discarded = False
+        for h in job["grouphashes"]:
+            target = assigned.get((project_id, h.hash))
+            if target is None and h.group_id is not None:
+                target = h.group_id
+            if target is not None:
+                break
+            if h.group_tombstone_id is not None:
+                discarded = True
+                job["discard_reason"] = "Matches group tombstone %s" % h.group_tombstone_id
+                break
+
+        if discarded:
+            discarded_jobs.append(job)
+            continue
+
+        if target is None:
+            target = job
+            creating_jobs.append(job)
+        elif not isinstance(target, dict):
+            existing_group_ids.add(target)
+
+        job["group_target"] = target
+        job["new_grouphashes"] = [
+            h
+            for h in job["grouphashes"]
+            if h.group_id is None and (project_id, h.hash) not in assigned
+        ]
+        for h in job["new_grouphashes"]:
+            if h.state != GroupHash.State.LOCKED_IN_MIGRATION:
+                assigned[(project_id, h.hash)] = target
+        saved_jobs.append(job)
+
+    groups = Group.objects.in_bulk(existing_group_ids)
 
     # XXX(dcramer): this has the opportunity to create duplicate groups
     # it should be resolved by the hash merging function later but this
     # should be better tested/reviewed
-    if existing_group_id is None:
-        # it's possible the release was deleted between
-        # when we queried for the release and now, so
-        # make sure it still exists
-        first_release = kwargs.pop("first_release", None)
+    _create_groups_many(creating_jobs, projects)
+
+    grouped_jobs = []
+    for job in saved_jobs:
+        target = job.pop("group_target")
+        if isinstance(target, dict):
+            # Created in this batch by `_create_groups_many`.
+            group = target["group"]
+        elif target in groups:
+            group = groups[target]
+        else:
+            # The group was deleted after its hashes were looked up. Drop
+            # this job like the ones matching a tombstone, rather than
+            # failing the whole batch.
+            job.pop("new_grouphashes")
+            job["discard_reason"] = "Matches deleted group %s" % target
+            discarded_jobs.append(job)
+            continue
 
-        with transaction.atomic():
-            short_id = project.next_short_id()
-            group, group_is_new = (
-                Group.objects.create(
-                    project=project,
-                    short_id=short_id,
-                    first_release_id=Release.objects.filter(id=first_release.id)
-                    .values_list("id", flat=True)
-                    .first()
-                    if first_release
-                    else None,
-                    **kwargs
-                ),
-                True,
-            )
+        group._project_cache = projects[job["project_id"]]
+        job["group"] = group
+        grouped_jobs.append(job)
+    saved_jobs = grouped_jobs
+
+    # XXX: There is a race condition here wherein another process could
+    # create a new group that is associated with one of the new hashes,
+    # add some event(s) to it, and then subsequently have the hash
+    # "stolen" by this process. This then "orphans" those events from
+    # their "siblings" in the group we've created here. We don't have a
+    # way to fix this, since we can't update the group on those hashes
+    # without filtering on `group_id` (which we can't do due to query
+    # planner weirdness.) For more context, see 84c6f75a and d0e22787,
+    # as well as GH-5085.
+    new_grouphash_ids = {}
+    for job in saved_jobs:
+        for h in job["new_grouphashes"]:
+            new_grouphash_ids.setdefault(job["group"].id, (job["group"], set()))[1].add(h.id)
+
+    for group, grouphash_ids in six.itervalues(new_grouphash_ids):
+        GroupHash.objects.filter(id__in=grouphash_ids).exclude(
+            state=GroupHash.State.LOCKED_IN_MIGRATION
+        ).update(group=group)
 
-        metrics.incr(
-            "group.created", skip_internal=True, tags={"platform": event.platform or "unknown"}
+    for job in saved_jobs:
+        new_hashes = job.pop("new_grouphashes")
+        job["is_new"] = job.pop("group_is_new", False) and len(new_hashes) == len(
+            job["grouphashes"]
         )
 
-    else:
-        group = Group.objects.get(id=existing_group_id)
-
-        group_is_new = False
-
-    group._project_cache = project
-
-    # If all hashes are brand new we treat this event as new
-    is_new = False
-    new_hashes = [h for h in all_hashes if h.group_id is None]
-    if new_hashes:
-        # XXX: There is a race condition here wherein another process could
-        # create a new group that is associated with one of the new hashes,
-        # add some event(s) to it, and then subsequently have the hash
-        # "stolen" by this process. This then "orphans" those events from
-        # their "siblings" in the group we've created here. We don't have a
-        # way to fix this, since we can't update the group on those hashes
-        # without filtering on `group_id` (which we can't do due to query
-        # planner weirdness.) For more context, see 84c6f75a and d0e22787,
-        # as well as GH-5085.
-        GroupHash.objects.filter(id__in=[h.id for h in new_hashes]).exclude(
-            state=GroupHash.State.LOCKED_IN_MIGRATION
-        ).update(group=group)
+        if not job["is_new"]:
+            job["is_regression"] = _process_existing_aggregate(
+                group=job["group"],
+                event=job["event"],
+                data=_get_group_creation_kwargs(job),
+                release=job["release"],
+            )
+        else:
+            job["is_regression"] = False
 
-        if group_is_new and len(new_hashes) == len(all_hashes):
-            is_new = True
+    return discarded_jobs
 
-    if not is_new:
-        is_regression = _process_existing_aggregate(
-            group=group, event=event, data=kwargs, release=release
-        )
-    else:
-        is_regression = False
 
-    return group, is_new, is_regression
+@metrics.wraps("save_event.create_groups_many")
+def _create_groups_many(jobs, projects):
+    if not jobs:
+        return
+
+    # it's possible the release was deleted between when we queried for the
+    # release and now, so make sure it still exists
+    release_ids = set(job["release"].id for job in jobs if job["release"])
+    if release_ids:
+        release_ids = set(Release.objects.filter(id__in=release_ids).values_list("id", flat=True))
+
+    jobs_by_project = {}
+    for job in jobs:
+        jobs_by_project.setdefault(job["project_id"], []).append(job)
+
+    for project_id, project_jobs in six.iteritems(jobs_by_project):
+        project = projects[project_id]
+
+        groups = []
+        with transaction.atomic():
+            last_short_id = project.next_short_id(delta=len(project_jobs))
+            first_short_id = last_short_id - len(project_jobs) + 1
+            for short_id, job in enumerate(project_jobs, first_short_id):
+                kwargs = _get_group_creation_kwargs(job)
+                first_release = kwargs.pop("first_release", None)
+                groups.append(
+                    Group(
+                        project=project,
+                        short_id=short_id,
+                        first_release_id=first_release.id
+                        if first_release and first_release.id in release_ids
+                        else None,
+                        **kwargs
+                    )
+                )
+            Group.objects.bulk_create(groups)
+
+        for job, group in zip(project_jobs, groups):
+            job["group"] = group
+            job["group_is_new"] = True
+            metrics.incr(
+                "group.created", skip_internal=True, tags={"platform": job["platform"] or "unknown"}
+            )
 
 
 def _handle_regression(group, event, release):
@@ -1328,12 +1537,6 @@ def save_attachments(attachments, event):
         )
 
 
-def _find_hashes(project, hash_list):
-    return map(
-        lambda hash: GroupHash.objects.get_or_create(project=project, hash=hash)[0], hash_list
-    )
-
-
 @metrics.wraps("event_manager.save_transactions.materialize_event_metrics")
 def _materialize_event_metrics(jobs):
     for job in jobs:
@@ -1347,22 +1550,61 @@ def _materialize_event_metrics(jobs):
         job["event_metrics"] = event_metrics
 
 
-@metrics.wraps("event_manager.save_transaction_events")
-def save_transaction_events(jobs, projects):
-    with metrics.timer("event_manager.save_transactions.collect_organization_ids"):
-        organization_ids = set(project.organization_id for project in six.itervalues(projects))
+@metrics.wraps("save_event.set_organization_cache_many")
+def _set_organization_cache_many(projects):
+    organization_ids = set(project.organization_id for project in six.itervalues(projects))
+    organizations = {o.id: o for o in Organization.objects.get_many_from_cache(organization_ids)}
 
-    with metrics.timer("event_manager.save_transactions.fetch_organizations"):
-        organizations = {
-            o.id: o for o in Organization.objects.get_many_from_cache(organization_ids)
-        }
+    for project in six.itervalues(projects):
+        try:
+            project._organization_cache = organizations[project.organization_id]
+        except KeyError:
+            continue
 
-    with metrics.timer("event_manager.save_transactions.set_organization_cache"):
-        for project in six.itervalues(projects):
-            try:
-                project._organization_cache = organizations[project.organization_id]
-            except KeyError:
-                continue
+
+@metrics.wraps("event_manager.save_error_events")
+def save_error_events(jobs, projects):
+    """
+    Batched counterpart of `EventManager.save` for error and default events.
+    Hashes and existing groups of all jobs are resolved with a handful of
+    queries, and new groups are created in bulk.
+
+    Jobs are dictionaries with normalized ``data``, ``start_time`` and
+    optionally ``raw`` and ``cache_key``. Unlike `EventManager.save` this does
+    not raise `HashDiscarded`; jobs that match a group tombstone or a deleted
+    group are dropped from the returned list instead.
+    """
+    _set_organization_cache_many(projects)
+
+    with metrics.timer("event_manager.save_error_events.prepare_jobs"):
+        for job in jobs:
+            job["project_id"] = job["data"]["project"]
+            job.setdefault("raw", False)
+
+    _pull_out_data(jobs, projects)
+    _get_or_create_release_many(jobs, projects)
+    _get_event_user_many(jobs, projects)
+    _normalize_stacktraces_for_grouping_many(jobs, projects)
+    _derive_plugin_tags_many(jobs, projects)
+    _derive_interface_tags_many(jobs)
+    _calculate_event_grouping_many(jobs, projects)
+    _materialize_metadata_many(jobs)
+
+    discarded_jobs = _save_aggregate_many(jobs, projects)
+    for job in discarded_jobs:
+        _handle_discarded_hash(job, projects[job["project_id"]])
+
+    if discarded_jobs:
+        discarded_ids = set(id(job) for job in discarded_jobs)
+        jobs = [job for job in jobs if id(job) not in discarded_ids]
+
+    _finish_saving_events(jobs, projects)
+    return jobs
+
+
+@metrics.wraps("event_manager.save_transaction_events")
+def save_transaction_events(jobs, projects):
+    _set_organization_cache_many(projects)
 
     with metrics.timer("event_manager.save_transactions.prepare_jobs"):
         for job in jobs:
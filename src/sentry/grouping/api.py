@@ -18,10 +18,15 @@ from sentry.grouping.utils import (
     hash_from_values,
     resolve_fingerprint_values,
 )
+from sentry.utils.lru import LRUCache
 
 
 HASH_RE = re.compile(r"^[0-9a-f]{32}$")
 
+# Parsed fingerprinting rules by the hash of the project option, see
+# ``get_fingerprinting_config_for_project``.
+_fingerprinting_rules_cache = LRUCache(max_size=1000, sizeof=lambda value: 1)
+
 
 class GroupingConfigNotFound(LookupError):
     pass
@@ -115,16 +120,25 @@ def get_fingerprinting_config_for_project(project):
     from sentry.utils.cache import cache
     from sentry.utils.hashlib import md5_text
 
-    cache_key = "fingerprinting-rules:" + md5_text(rules).hexdigest()
+    # The rules are keyed by the hash of the option, so changing the option
+    # invalidates the process local copy as well.
+    config_hash = md5_text(rules).hexdigest()
+    rv = _fingerprinting_rules_cache.get(config_hash)
+    if rv is not None:
+        return rv
+
+    cache_key = "fingerprinting-rules:" + config_hash
     rv = cache.get(cache_key)
     if rv is not None:
-        return FingerprintingRules.from_json(rv)
+        rv = FingerprintingRules.from_json(rv)
+    else:
+        try:
+            rv = FingerprintingRules.from_config_string(rules)
+        except InvalidFingerprintingConfig:
+            rv = FingerprintingRules([])
+        cache.set(cache_key, rv.to_json())
 
-    try:
-        rv = FingerprintingRules.from_config_string(rules)
-    except InvalidFingerprintingConfig:
-        rv = FingerprintingRules([])
-    cache.set(cache_key, rv.to_json())
+    _fingerprinting_rules_cache.set(config_hash, rv)
     return rv
 
 
@@ -7,6 +7,9 @@ import zlib
 import base64
 import msgpack
 import inspect
+import itertools
+
+from collections import defaultdict
 
 from parsimonious.grammar import Grammar, NodeVisitor
 from parsimonious.exceptions import ParseError
@@ -16,8 +19,10 @@ from sentry.stacktraces.functions import set_in_app
 from sentry.stacktraces.platform import get_behavior_family_for_platform
 from sentry.grouping.component import GroupingComponent
 from sentry.grouping.utils import get_rule_bool
+from sentry.utils.cache import memoize
 from sentry.utils.compat import implements_to_string
 from sentry.utils.glob import glob_match
+from sentry.utils.lru import LRUCache
 from sentry.utils.safe import get_path
 from sentry.utils.compat import zip
 
@@ -106,12 +111,33 @@ class Match(object):
         )
 
     def matches_frame(self, frame_data, platform):
+        return self.matches_value(self.get_frame_value(self.key, frame_data, platform))
+
+    @staticmethod
+    def get_frame_value(key, frame_data, platform):
+        """
+        Returns the value of the frame that matchers of ``key`` look at.
+        """
+        if key == "package":
+            return frame_data.get("package") or ""
+        if key == "path":
+            return frame_data.get("abs_path") or frame_data.get("filename") or ""
+        if key == "family":
+            return get_behavior_family_for_platform(frame_data.get("platform") or platform)
+        if key == "app":
+            return frame_data.get("in_app")
+        if key == "function":
+            from sentry.stacktraces.functions import get_function_name_for_frame
+
+            return get_function_name_for_frame(frame_data, platform) or "<unknown>"
+        if key == "module":
+            return frame_data.get("module") or "<unknown>"
+        # should not happen :)
+        return "<unknown>"
+
+    def matches_value(self, value):
         # Path matches are always case insensitive
         if self.key in ("path", "package"):
-            if self.key == "package":
-                value = frame_data.get("package") or ""
-            else:
-                value = frame_data.get("abs_path") or frame_data.get("filename") or ""
             if glob_match(
                 value, self.pattern, ignorecase=True, doublestar=True, path_normalize=True
             ):
@@ -125,26 +151,14 @@ class Match(object):
         # families need custom handling as well
         if self.key == "family":
             flags = self.pattern.split(",")
-            if "all" in flags:
-                return True
-            family = get_behavior_family_for_platform(frame_data.get("platform") or platform)
-            return family in flags
+            return "all" in flags or value in flags
 
         # in-app matching is just a bool
         if self.key == "app":
             ref_val = get_rule_bool(self.pattern)
-            return ref_val is not None and ref_val == frame_data.get("in_app")
+            return ref_val is not None and ref_val == value
 
         # all other matches are case sensitive
-        if self.key == "function":
-            from sentry.stacktraces.functions import get_function_name_for_frame
-
-            value = get_function_name_for_frame(frame_data, platform) or "<unknown>"
-        elif self.key == "module":
-            value = frame_data.get("module") or "<unknown>"
-        else:
-            # should not happen :)
-            value = "<unknown>"
         return glob_match(value, self.pattern)
 
     def _to_config_structure(self):
@@ -292,6 +306,108 @@ class StacktraceState(object):
         return "%s by grouping enhancement rule (%s)" % (hint, description)
 
 
+# Enhancements by their serialized config, see ``Enhancements.loads``.
+_loaded_enhancements = LRUCache(max_size=1000, sizeof=lambda value: 1)
+
+# Static matches of all compiled rules, keyed by ``(CompiledRules.cache_id,
+# frame values)``. The budget is shared so that the number of loaded configs
+# does not multiply the size of the cache.
+_static_matches_cache = LRUCache(max_size=10000, sizeof=lambda value: 1)
+_compiled_rules_ids = itertools.count()
+
+# Matchers of these keys only look at frame values that rules do not modify,
+# so their results can be shared between frames with the same values.
+STATIC_MATCH_KEYS = ("family", "function", "module", "path", "package")
+
+
+class CompiledRules(object):
+    """
+    The rules of an enhancements config prepared for matching frames.
+
+    Matchers of ``STATIC_MATCH_KEYS`` are evaluated once per distinct
+    combination of frame values, and the rules they match are remembered.
+    Frames of the same event, of later events and of both passes over a
+    stacktrace then share the result instead of matching every pattern
+    again. ``app`` matchers are checked per frame because earlier rules may
+    have changed ``in_app``.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.cache_id = next(_compiled_rules_ids)
+        # key -> [(matcher, [rule index, ...]), ...]
+        self.matchers_by_key = defaultdict(list)
+        self.static_matcher_counts = []
+        self.app_matchers = []
+        always = []
+
+        patterns = {}
+        for rule_id, rule in enumerate(rules):
+            count = 0
+            app_matchers = []
+            for matcher in rule.matchers:
+                if matcher.key == "app":
+                    app_matchers.append(matcher)
+                    continue
+                count += 1
+                pattern_key = (matcher.key, matcher.pattern)
+                if pattern_key not in patterns:
+                    patterns[pattern_key] = []
+                    self.matchers_by_key[matcher.key].append((matcher, patterns[pattern_key]))
+                patterns[pattern_key].append(rule_id)
+            self.static_matcher_counts.append(count)
+            self.app_matchers.append(app_matchers)
+            # Rules without matchers never match
+            if not count and app_matchers:
+                always.append(rule_id)
+
+        self.keys = [key for key in STATIC_MATCH_KEYS if key in self.matchers_by_key]
+        self.always_matching = frozenset(always)
+
+    def get_static_matches(self, frame_data, platform):
+        """
+        Returns the indexes of the rules whose static matchers all match the
+        frame.
+        """
+        values = tuple(Match.get_frame_value(key, frame_data, platform) for key in self.keys)
+        cache_key = (self.cache_id, values)
+        rv = _static_matches_cache.get(cache_key)
+        if rv is not None:
+            return rv
+
+        counts = defaultdict(int)
+        for key, value in zip(self.keys, values):
+            for matcher, rule_ids in self.matchers_by_key[key]:
+                if matcher.matches_value(value):
+                    for rule_id in rule_ids:
+                        counts[rule_id] += 1
+
+        rv = self.always_matching.union(
+            rule_id
+            for rule_id, count in six.iteritems(counts)
+            if count == self.static_matcher_counts[rule_id]
+        )
+        _static_matches_cache.set(cache_key, rv)
+        return rv
+
+    def iter_matching_frames(self, frames, platform):
+        """
+        Yields ``(rule, index)`` for every frame matched by a rule, ordered by
+        rule and then by frame like matching every rule against all frames.
+        Frames are matched lazily so that modifications made by earlier rules
+        are seen by the ``app`` matchers of later rules.
+        """
+        static_matches = [self.get_static_matches(frame, platform) for frame in frames]
+        for rule_id in sorted(frozenset().union(*static_matches)):
+            rule = self.rules[rule_id]
+            app_matchers = self.app_matchers[rule_id]
+            for idx, frame in enumerate(frames):
+                if rule_id not in static_matches[idx]:
+                    continue
+                if all(m.matches_frame(frame, platform) for m in app_matchers):
+                    yield rule, idx
+
+
 class Enhancements(object):
     def __init__(self, rules, changelog=None, version=None, bases=None, id=None):
         self.id = id
@@ -304,26 +420,27 @@ class Enhancements(object):
             bases = []
         self.bases = bases
 
+    @memoize
+    def compiled_rules(self):
+        return CompiledRules(list(self.iter_rules()))
+
     def apply_modifications_to_frame(self, frames, platform):
         """This applies the frame modifications to the frames itself.  This
         does not affect grouping.
         """
-        for rule in self.iter_rules():
-            for idx, frame in enumerate(frames):
-                actions = rule.get_matching_frame_actions(frame, platform)
-                for action in actions or ():
-                    action.apply_modifications_to_frame(frames, idx)
+        for rule, idx in self.compiled_rules.iter_matching_frames(frames, platform):
+            for action in rule.actions:
+                action.apply_modifications_to_frame(frames, idx)
 
     def update_frame_components_contributions(self, components, frames, platform):
         stacktrace_state = StacktraceState()
 
         # Apply direct frame actions and update the stack state alongside
-        for rule in self.iter_rules():
-            for idx, (component, frame) in enumerate(zip(components, frames)):
-                actions = rule.get_matching_frame_actions(frame, platform)
-                for action in actions or ():
-                    action.update_frame_components_contributions(components, frames, idx, rule=rule)
-                    action.modify_stacktrace_state(stacktrace_state, rule)
+        matched_frames = frames[: len(components)]
+        for rule, idx in self.compiled_rules.iter_matching_frames(matched_frames, platform):
+            for action in rule.actions:
+                action.update_frame_components_contributions(components, frames, idx, rule=rule)
+                action.modify_stacktrace_state(stacktrace_state, rule)
 
         # Use the stack state to update frame contributions again to trim
         # down to max-frames.  min-frames is handled on the other hand for
@@ -418,14 +535,24 @@ class Enhancements(object):
     def loads(cls, data):
         if isinstance(data, six.text_type):
             data = data.encode("ascii", "ignore")
+
+        # Every event loads the enhancements of its grouping config, sharing
+        # the loaded config also shares its compiled rules.
+        rv = _loaded_enhancements.get((cls, data))
+        if rv is not None:
+            return rv
+
         padded = data + b"=" * (4 - (len(data) % 4))
         try:
-            return cls._from_config_structure(
+            rv = cls._from_config_structure(
                 msgpack.loads(zlib.decompress(base64.urlsafe_b64decode(padded)))
             )
         except (LookupError, AttributeError, TypeError, ValueError) as e:
             raise ValueError("invalid grouping enhancement config: %s" % e)
 
+        _loaded_enhancements.set((cls, data), rv)
+        return rv
+
     @classmethod
     def from_config_string(self, s, bases=None, id=None):
         try:
@@ -8,8 +8,11 @@ from parsimonious.exceptions import ParseError
 
 from sentry.stacktraces.platform import get_behavior_family_for_platform
 from sentry.grouping.utils import get_rule_bool
+from sentry.utils.cache import memoize
+from sentry.utils.compat import zip
 from sentry.utils.safe import get_path
 from sentry.utils.glob import glob_match
+from sentry.utils.lru import LRUCache
 
 
 VERSION = 1
@@ -135,6 +138,77 @@ class EventAccess(object):
         return []
 
 
+# Results of frame matchers by ``(key, pattern, value)``. A matcher's result
+# only depends on these, so the entries are shared by all compiled rules and
+# the budget does not grow with the number of loaded configs.
+_frame_matches_cache = LRUCache(max_size=10000, sizeof=lambda value: 1)
+
+
+class CompiledRules(object):
+    """
+    The rules of a fingerprinting config prepared for matching events.
+
+    Matchers are deduplicated across rules and grouped by the interface they
+    look at, so every interface of an event is extracted once and every
+    distinct matcher is evaluated at most once per value, no matter how many
+    rules use it. Results for frame values are also remembered across events
+    since the same functions, modules and paths show up over and over again.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.matchers = []
+        # rule index -> [(interface, [matcher index, ...]), ...]
+        self.rule_matchers = []
+
+        matcher_ids = {}
+        for rule in rules:
+            by_interface = {}
+            for matcher in rule.matchers:
+                pattern_key = (matcher.key, matcher.pattern)
+                if pattern_key not in matcher_ids:
+                    matcher_ids[pattern_key] = len(self.matchers)
+                    self.matchers.append(matcher)
+                by_interface.setdefault(matcher.interface, []).append(matcher_ids[pattern_key])
+            self.rule_matchers.append(sorted(six.iteritems(by_interface)))
+
+    def _matches(self, matcher_id, value, results):
+        key = (matcher_id, value)
+        rv = results.get(key)
+        if rv is not None:
+            return rv
+
+        matcher = self.matchers[matcher_id]
+        is_frame = matcher.interface == "frame"
+        if is_frame:
+            cache_key = (matcher.key, matcher.pattern, value)
+            rv = _frame_matches_cache.get(cache_key)
+        if rv is None:
+            rv = matcher.matches_value(value)
+            if is_frame:
+                _frame_matches_cache.set(cache_key, rv)
+        results[key] = rv
+        return rv
+
+    def get_fingerprint_values_for_event_access(self, access):
+        # (matcher index, value) -> bool, for the values of this event
+        results = {}
+        for rule, by_interface in zip(self.rules, self.rule_matchers):
+            for interface, matcher_ids in by_interface:
+                for values in access.get_values(interface):
+                    if all(
+                        self._matches(
+                            matcher_id, values.get(self.matchers[matcher_id].key), results
+                        )
+                        for matcher_id in matcher_ids
+                    ):
+                        break
+                else:
+                    break
+            else:
+                return rule.fingerprint
+
+
 class FingerprintingRules(object):
     def __init__(self, rules, changelog=None, version=None):
         if version is None:
@@ -146,14 +220,14 @@ class FingerprintingRules(object):
     def iter_rules(self):
         return iter(self.rules)
 
+    @memoize
+    def compiled_rules(self):
+        return CompiledRules(list(self.iter_rules()))
+
     def get_fingerprint_values_for_event(self, event):
         if not self.rules:
             return
-        access = EventAccess(event)
-        for rule in self.iter_rules():
-            new_values = rule.get_fingerprint_values_for_event_access(access)
-            if new_values is not None:
-                return new_values
+        return self.compiled_rules.get_fingerprint_values_for_event_access(EventAccess(event))
 
     @classmethod
     def _from_config_structure(cls, data):
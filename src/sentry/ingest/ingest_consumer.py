@@ -3,11 +3,13 @@ from __future__ import absolute_import
 import atexit
 import logging
 import msgpack
+import time
 from six import BytesIO
 
 import multiprocessing.dummy
 import multiprocessing as _multiprocessing
 
+from django import db
 from django.core.cache import cache
 
 from sentry import eventstore, features, options
@@ -30,10 +32,22 @@ logger = logging.getLogger(__name__)
 
 CACHE_TIMEOUT = 3600
 
+# How long worker processes hold on to a project before fetching it again.
+PROJECT_CACHE_TIMEOUT = 60
+
 
 class IngestConsumerWorker(AbstractBatchWorker):
-    def __init__(self, concurrency):
-        self.pool = _multiprocessing.dummy.Pool(concurrency)
+    def __init__(self, concurrency, pool_type="thread"):
+        if pool_type == "thread":
+            self.pool = _multiprocessing.dummy.Pool(concurrency)
+        elif pool_type == "process":
+            # Forked children must not share the parent's database connections,
+            # so drop them before forking. Each side reconnects on demand.
+            db.connections.close_all()
+            self.pool = _multiprocessing.Pool(concurrency, initializer=_init_worker_process)
+        else:
+            raise ValueError("Unknown pool type: {}".format(pool_type))
+        self.pool_type = pool_type
         atexit.register(self.pool.close)
 
     def process_message(self, message):
@@ -52,16 +66,12 @@ class IngestConsumerWorker(AbstractBatchWorker):
                 message_type = message["type"]
                 projects_to_fetch.add(message["project_id"])
 
-                if message_type == "event":
-                    other_messages.append((process_event, message))
-                elif message_type == "transaction":
+                if message_type == "transaction":
                     transactions.append(message)
                 elif message_type == "attachment_chunk":
                     attachment_chunks.append(message)
-                elif message_type == "attachment":
-                    other_messages.append((process_individual_attachment, message))
-                elif message_type == "user_report":
-                    other_messages.append((process_userreport, message))
+                elif message_type in MESSAGE_PROCESSORS:
+                    other_messages.append(message)
                 else:
                     raise ValueError("Unknown message type: {}".format(message_type))
                 metrics.incr(
@@ -74,27 +84,84 @@ class IngestConsumerWorker(AbstractBatchWorker):
         if attachment_chunks:
             # attachment_chunk messages need to be processed before attachment/event messages.
             with metrics.timer("ingest_consumer.process_attachment_chunk_batch"):
-                for _ in self.pool.imap_unordered(
-                    lambda msg: process_attachment_chunk(msg, projects=projects),
-                    attachment_chunks,
-                    chunksize=100,
-                ):
-                    pass
+                self._process_messages(attachment_chunks, projects)
 
         if other_messages:
             with metrics.timer("ingest_consumer.process_other_messages_batch"):
-                for _ in self.pool.imap_unordered(
-                    lambda args: args[0](args[1], projects=projects), other_messages, chunksize=100
-                ):
-                    pass
+                self._process_messages(other_messages, projects)
 
         if transactions:
             process_transactions_batch(transactions, projects)
 
+    def _process_messages(self, messages, projects):
+        """
+        Runs all messages through the pool and blocks until every one of them
+        has been processed, so that callers can rely on ordering between
+        subsequent calls.
+        """
+        if self.pool_type == "process":
+            # Model instances are expensive to pickle and would be sent once
+            # per message. Instead, hand the raw message over msgpack-encoded
+            # and let every worker process resolve projects from its own cache.
+            results = self.pool.imap_unordered(
+                _process_packed_message,
+                [msgpack.packb(message) for message in messages],
+                chunksize=100,
+            )
+        else:
+            results = self.pool.imap_unordered(
+                lambda message: _process_message(message, projects=projects),
+                messages,
+                chunksize=100,
+            )
+
+        for _ in results:
+            pass
+
     def shutdown(self):
         pass
 
 
+# Projects cached by the current worker process, mapping ids to
+# ``(project, expires_at)``. Only used with the ``process`` pool type.
+_worker_projects = {}
+
+
+def _init_worker_process():
+    _worker_projects.clear()
+
+
+def _get_worker_projects(project_ids):
+    now = time.time()
+    projects = {}
+    missing = set()
+
+    for project_id in project_ids:
+        cached = _worker_projects.get(project_id)
+        if cached is not None and cached[1] > now:
+            projects[project_id] = cached[0]
+        else:
+            missing.add(project_id)
+
+    if missing:
+        metrics.incr("ingest_consumer.worker_project_cache.miss", amount=len(missing))
+        for project in Project.objects.get_many_from_cache(missing):
+            _worker_projects[project.id] = (project, now + PROJECT_CACHE_TIMEOUT)
+            projects[project.id] = project
+
+    return projects
+
+
+def _process_packed_message(packed_message):
+    message = msgpack.unpackb(packed_message, use_list=False)
+    project_id = int(message["project_id"])
+    return _process_message(message, projects=_get_worker_projects([project_id]))
+
+
+def _process_message(message, projects):
+    return MESSAGE_PROCESSORS[message["type"]](message, projects=projects)
+
+
 @metrics.wraps("ingest_consumer.process_transactions_batch")
 def process_transactions_batch(messages, projects):
     if options.get("store.transactions-celery") is True:
@@ -276,7 +343,17 @@ def process_userreport(message, projects):
         return False
 
 
-def get_ingest_consumer(consumer_types, once=False, concurrency=None, **options):
+MESSAGE_PROCESSORS = {
+    "event": process_event,
+    "attachment_chunk": process_attachment_chunk,
+    "attachment": process_individual_attachment,
+    "user_report": process_userreport,
+}
+
+
+def get_ingest_consumer(
+    consumer_types, once=False, concurrency=None, pool_type="thread", **options
+):
     """
     Handles events coming via a kafka queue.
 
@@ -286,5 +363,7 @@ def get_ingest_consumer(consumer_types, once=False, concurrency=None, **options)
         ConsumerType.get_topic_name(consumer_type) for consumer_type in consumer_types
     )
     return create_batching_kafka_consumer(
-        topic_names=topic_names, worker=IngestConsumerWorker(concurrency=concurrency), **options
+        topic_names=topic_names,
+        worker=IngestConsumerWorker(concurrency=concurrency, pool_type=pool_type),
+        **options
     )
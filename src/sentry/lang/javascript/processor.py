@@ -24,7 +24,7 @@ except ImportError:
         pass
 
 
-from sentry import http
+from sentry import http, options
 from sentry.interfaces.stacktrace import Stacktrace
 from sentry.models import EventError, ReleaseFile, Organization
 
@@ -34,8 +34,9 @@ from sentry.models import EventError, ReleaseFile, Organization
 from sentry.utils.cache import cache
 
 from sentry.utils.files import compress_file
-from sentry.utils.hashlib import md5_text
+from sentry.utils.hashlib import md5_text, sha1_text
 from sentry.utils.http import is_valid_origin
+from sentry.utils.lru import LRUCache
 from sentry.utils.safe import get_path
 from sentry.utils import metrics
 from sentry.utils.urls import non_standard_url_join
@@ -74,6 +75,11 @@ MAX_RESOURCE_FETCHES = 100
 
 logger = logging.getLogger(__name__)
 
+# Parsed sourcemaps shared by all events processed by this worker, keyed by
+# the checksum of the sourcemap and sized by its length in bytes. Disabled
+# unless ``sourcemaps.local-cache-size`` is set.
+_sourcemap_cache = LRUCache(max_size=0, sizeof=lambda value: value[1])
+
 
 class UnparseableSourcemap(http.BadSource):
     error_type = EventError.JS_INVALID_SOURCEMAP
@@ -144,44 +150,57 @@ def get_source_context(source, lineno, colno, context=LINES_OF_CONTEXT):
     return pre_context or None, context_line, post_context or None
 
 
+def get_sourcemap_reference(body):
+    """
+    Returns the ``sourceMappingURL`` of a minified source as it appears in
+    the source, or ``None`` if it does not reference a sourcemap.
+    """
+    # Source maps are only going to exist at either the top or bottom of the document.
+    # Technically, there isn't anything indicating *where* it should exist, so we
+    # are generous and assume it's somewhere either in the first or last 5 lines.
+    # If it's somewhere else in the document, you're probably doing it wrong.
+    # Large bundles are not split entirely, only the lines we look at.
+    if body.count("\n") >= 10:
+        possibilities = body.split("\n", 5)[:5] + body.rsplit("\n", 5)[-5:]
+    else:
+        possibilities = body.split("\n")
+
+    sourcemap = None
+
+    # We want to scan each line sequentially, and the last one found wins
+    # This behavior is undocumented, but matches what Chrome and Firefox do.
+    for line in possibilities:
+        if line[:21] in ("//# sourceMappingURL=", "//@ sourceMappingURL="):
+            # We want everything AFTER the indicator, which is 21 chars long
+            sourcemap = line[21:].rstrip()
+
+    # If we still haven't found anything, check end of last line AFTER source code.
+    # This is not the literal interpretation of the spec, but browsers support it.
+    # e.g. {code}//# sourceMappingURL={url}
+    if not sourcemap:
+        # Only look at last 300 characters to keep search space reasonable (minified
+        # JS on a single line could be tens of thousands of chars). This is a totally
+        # arbitrary number / best guess; most sourceMappingURLs are relative and
+        # not very long.
+        search_space = possibilities[-1][-300:].rstrip()
+        match = SOURCE_MAPPING_URL_RE.search(search_space)
+        if match:
+            sourcemap = match.group(1)
+
+    return sourcemap or None
+
+
 def discover_sourcemap(result):
     """
     Given a UrlResult object, attempt to discover a sourcemap URL.
     """
     # When coercing the headers returned by urllib to a dict
-    # all keys become lowercase so they're normalized
+    # all keys become lowercase so they're normalized. Artifacts uploaded
+    # in bundles carry the reference found when they were assembled.
     sourcemap = result.headers.get("sourcemap", result.headers.get("x-sourcemap"))
 
     if not sourcemap:
-        parsed_body = result.body.split("\n")
-        # Source maps are only going to exist at either the top or bottom of the document.
-        # Technically, there isn't anything indicating *where* it should exist, so we
-        # are generous and assume it's somewhere either in the first or last 5 lines.
-        # If it's somewhere else in the document, you're probably doing it wrong.
-        if len(parsed_body) > 10:
-            possibilities = parsed_body[:5] + parsed_body[-5:]
-        else:
-            possibilities = parsed_body
-
-        # We want to scan each line sequentially, and the last one found wins
-        # This behavior is undocumented, but matches what Chrome and Firefox do.
-        for line in possibilities:
-            if line[:21] in ("//# sourceMappingURL=", "//@ sourceMappingURL="):
-                # We want everything AFTER the indicator, which is 21 chars long
-                sourcemap = line[21:].rstrip()
-
-        # If we still haven't found anything, check end of last line AFTER source code.
-        # This is not the literal interpretation of the spec, but browsers support it.
-        # e.g. {code}//# sourceMappingURL={url}
-        if not sourcemap:
-            # Only look at last 300 characters to keep search space reasonable (minified
-            # JS on a single line could be tens of thousands of chars). This is a totally
-            # arbitrary number / best guess; most sourceMappingURLs are relative and
-            # not very long.
-            search_space = possibilities[-1][-300:].rstrip()
-            match = SOURCE_MAPPING_URL_RE.search(search_space)
-            if match:
-                sourcemap = match.group(1)
+        sourcemap = get_sourcemap_reference(result.body)
 
     if sourcemap:
         # react-native shoves a comment at the end of the
@@ -428,13 +447,49 @@ def fetch_sourcemap(url, project=None, release=None, dist=None, allow_scraping=T
         )
         body = result.body
     try:
-        return SourceMapView.from_json_bytes(body)
+        return parse_sourcemap(body)
     except Exception as exc:
         # This is in debug because the product shows an error already.
         logger.debug(six.text_type(exc), exc_info=True)
         raise UnparseableSourcemap({"url": http.expose_url(url)})
 
 
+def get_sourcemap_cache():
+    max_size = options.get("sourcemaps.local-cache-size")
+    if not max_size:
+        return None
+
+    evicted = _sourcemap_cache.configure(max_size)
+    if evicted:
+        metrics.incr("sourcemaps.local_cache.evicted", amount=evicted)
+    return _sourcemap_cache
+
+
+def parse_sourcemap(body):
+    """
+    Parses the sourcemap in ``body`` into a `SourceMapView`.
+
+    Views are only read from, so events of the same release share the view
+    parsed for the first of them. The same contents always have the same
+    checksum, so a release file that is replaced simply misses the cache.
+    """
+    sourcemap_cache = get_sourcemap_cache()
+    if sourcemap_cache is None:
+        return SourceMapView.from_json_bytes(body)
+
+    checksum = sha1_text(body).hexdigest()
+    cached = sourcemap_cache.get(checksum)
+    if cached is not None:
+        metrics.incr("sourcemaps.local_cache.hit")
+        return cached[0]
+
+    metrics.incr("sourcemaps.local_cache.miss")
+    with metrics.timer("sourcemaps.parse"):
+        sourcemap_view = SourceMapView.from_json_bytes(body)
+    sourcemap_cache.set(checksum, (sourcemap_view, len(body)))
+    return sourcemap_view
+
+
 def is_data_uri(url):
     return url[:BASE64_PREAMBLE_LENGTH] == BASE64_SOURCEMAP_PREAMBLE
 
@@ -1,9 +1,12 @@
 from __future__ import absolute_import
 
+import os
 import sys
 import jsonschema
 import logging
+import random
 import six
+import threading
 import time
 
 from django.conf import settings
@@ -98,6 +101,27 @@ def _task_id_cache_key_for_event(project_id, event_id):
     return u"symbolicator:{1}:{0}".format(project_id, event_id)
 
 
+def _task_stats_cache_key_for_event(project_id, event_id):
+    return u"symbolicator:stats:{1}:{0}".format(project_id, event_id)
+
+
+_local = threading.local()
+
+
+def _get_pooled_session():
+    """
+    Returns the HTTP session of the current thread. It outlives the
+    ``SymbolicatorSession`` of a single event so that connections to
+    symbolicator are kept alive between events.
+    """
+    # Connections must not be shared with a forked parent process.
+    pid = os.getpid()
+    if getattr(_local, "pid", None) != pid:
+        _local.session = Session()
+        _local.pid = pid
+    return _local.session
+
+
 class Symbolicator(object):
     def __init__(self, project, event_id):
         symbolicator_options = options.get("symbolicator.options")
@@ -113,9 +137,13 @@ class Symbolicator(object):
         )
 
         self.task_id_cache_key = _task_id_cache_key_for_event(project.id, event_id)
+        self.task_stats_cache_key = _task_stats_cache_key_for_event(project.id, event_id)
 
     def _process(self, create_task):
         task_id = default_cache.get(self.task_id_cache_key)
+        # When the task was created and how often it was polled. This is kept
+        # apart from the task id, which workers pass to symbolicator as is.
+        task_stats = default_cache.get(self.task_stats_cache_key)
         json_response = None
 
         with self.sess:
@@ -127,6 +155,7 @@ class Symbolicator(object):
                     json_response = self.sess.query_task(task_id)
 
                 if json_response is None:
+                    task_stats = {"created": time.time(), "polls": 0}
                     # This is a new task, so we compute all request parameters
                     # (potentially expensive if we need to pull minidumps), and then
                     # upload all information to symbolicator. It will likely not
@@ -153,14 +182,29 @@ class Symbolicator(object):
                 default_cache.set(
                     self.task_id_cache_key, json_response["request_id"], REQUEST_CACHE_TIMEOUT
                 )
+                if task_stats is not None:
+                    task_stats["polls"] += 1
+                    default_cache.set(self.task_stats_cache_key, task_stats, REQUEST_CACHE_TIMEOUT)
                 raise RetrySymbolication(retry_after=json_response["retry_after"])
             else:
                 # Once we arrive here, we are done processing. Clean up the
                 # task id from the cache.
                 default_cache.delete(self.task_id_cache_key)
+                default_cache.delete(self.task_stats_cache_key)
                 metrics.timing(
                     "events.symbolicator.response.completed.size", len(json.dumps(json_response))
                 )
+                # Tasks created by older workers have no stats.
+                if task_stats is not None:
+                    # Time from creating the task until the response, including
+                    # the time spent waiting in the sleep queue between polls.
+                    metrics.timing(
+                        "events.symbolicator.response.completed.wait",
+                        time.time() - task_stats["created"],
+                    )
+                    metrics.timing(
+                        "events.symbolicator.response.completed.polls", task_stats["polls"]
+                    )
                 return json_response
 
     def process_minidump(self, minidump):
@@ -327,12 +371,11 @@ class SymbolicatorSession(object):
 
     def open(self):
         if self.session is None:
-            self.session = Session()
+            self.session = _get_pooled_session()
 
     def close(self):
-        if self.session is not None:
-            self.session.close()
-            self.session = None
+        # The pooled session stays open for subsequent events.
+        self.session = None
 
     def _ensure_open(self):
         if not self.session:
@@ -402,7 +445,9 @@ class SymbolicatorSession(object):
                     logger.error("Failed to contact symbolicator", exc_info=True)
                     raise
 
-                time.sleep(wait)
+                # Jitter the backoff so that workers do not retry in lockstep
+                # when symbolicator becomes unreachable.
+                time.sleep(random.uniform(wait / 2, wait))
                 wait *= 2.0
 
     def _create_task(self, path, **kwargs):
@@ -4,7 +4,6 @@ import re
 import os
 import six
 import uuid
-import errno
 import shutil
 import hashlib
 import logging
@@ -17,7 +16,7 @@ from symbolic import Archive, SymbolicError, ObjectErrorUnsupportedObject, norma
 from sentry import options
 from sentry.constants import KNOWN_DIF_FORMATS
 from sentry.db.models import FlexibleForeignKey, Model, sane_repr, BaseManager, JSONField
-from sentry.models.file import File, clear_cached_files
+from sentry.models.file import File, FileCache
 from sentry.reprocessing import resolve_processing_issue, bump_reprocessing_revision
 from sentry.utils.zip import safe_extract_zip
 
@@ -409,21 +408,23 @@ class DIFCache(object):
         debug_ids = [six.text_type(debug_id).lower() for debug_id in debug_ids]
         difs = ProjectDebugFile.objects.find_by_debug_ids(project, debug_ids, features)
 
+        file_cache = self.file_cache
+        project_id = six.text_type(project.id)
+
         rv = {}
         for debug_id, dif in six.iteritems(difs):
-            dif_path = os.path.join(self.get_project_path(project), debug_id)
-            try:
-                os.stat(dif_path)
-            except OSError as e:
-                if e.errno != errno.ENOENT:
-                    raise
-                dif.file.save_to(dif_path)
-            rv[debug_id] = dif_path
+            rv[debug_id], _ = file_cache.get(project_id, debug_id, dif.file)
 
         return rv
 
+    @property
+    def file_cache(self):
+        return FileCache(
+            self.cache_path, max_size=options.get("dsym.cache-size"), metric_prefix="dsym.cache"
+        )
+
     def clear_old_entries(self):
-        clear_cached_files(self.cache_path)
+        self.file_cache.clear_old_entries()
 
 
 ProjectDebugFile.difcache = DIFCache()
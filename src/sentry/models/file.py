@@ -1,8 +1,11 @@
 from __future__ import absolute_import
 
 import os
+import re
 import six
 import mmap
+import errno
+import fcntl
 import tempfile
 import time
 
@@ -35,6 +38,10 @@ CHUNK_STATE_HEADER = "__state"
 MULTI_BLOB_UPLOAD_CONCURRENCY = 8
 MAX_FILE_SIZE = 2 ** 31  # 2GB is the maximum offset supported by fileblob
 
+# Names of the blobs in a ``FileCache``, everything else in the blob folder is
+# a lock or a download in progress.
+_blob_name_re = re.compile(r"^[0-9a-f]{40}$")
+
 
 class nooplogger(object):
     debug = staticmethod(lambda *a, **kw: None)
@@ -609,27 +616,200 @@ class FileBlobOwner(Model):
 
 
 def clear_cached_files(cache_path):
-    try:
-        cache_folders = os.listdir(cache_path)
-    except OSError:
-        return
+    FileCache(cache_path).clear_old_entries()
+
+
+class FileCache(object):
+    """
+    A cache of ``File`` contents on the local disk, shared by all processes
+    using the same ``cache_path``.
+
+    Entries live at ``<cache_path>/<folder>/<name>``. Their contents are
+    stored once per checksum in ``<cache_path>/.blobs`` and hardlinked into
+    place, so a file cached under several names only takes up space once.
+    Downloading a blob holds an exclusive lock on a file next to it, which
+    makes concurrent workers missing on the same contents wait for the first
+    download instead of fetching the blob again.
+
+    Hits refresh the modification time of an entry. ``clear_old_entries``
+    drops entries that were not used for a day and a half and then evicts the
+    least recently used ones until the cache fits into ``max_size`` bytes. A
+    ``max_size`` of ``0`` disables the size limit.
+    """
+
+    blob_folder = ".blobs"
+
+    def __init__(self, cache_path, max_size=0, metric_prefix="file.cache"):
+        self.cache_path = cache_path
+        self.max_size = max_size
+        self.metric_prefix = metric_prefix
+
+    def get_path(self, folder, name):
+        return os.path.join(self.cache_path, folder, name)
+
+    def get(self, folder, name, file):
+        """
+        Returns the path of the cached contents of ``file`` and whether they
+        were already present, downloading them on a miss.
+        """
+        path = self.get_path(folder, name)
+        try:
+            os.utime(path, None)
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+        else:
+            metrics.incr(self.metric_prefix + ".hit")
+            return path, True
 
-    cutoff = int(time.time()) - ONE_DAY_AND_A_HALF
+        metrics.incr(self.metric_prefix + ".miss")
+        if not file.checksum:
+            file.save_to(path)
+            return path, False
 
-    for cache_folder in cache_folders:
-        cache_folder = os.path.join(cache_path, cache_folder)
+        blob_path = os.path.join(self.cache_path, self.blob_folder, file.checksum)
+        with self._lock(blob_path):
+            try:
+                os.utime(blob_path, None)
+            except OSError as e:
+                if e.errno != errno.ENOENT:
+                    raise
+                file.save_to(blob_path)
+
+        try:
+            os.makedirs(os.path.dirname(path))
+        except OSError:
+            pass
+
+        try:
+            os.link(blob_path, path)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                # The blob was evicted in the meantime or the file system does
+                # not support hardlinks, so the entry gets its own copy.
+                file.save_to(path)
+
+        return path, False
+
+    @contextmanager
+    def _lock(self, path):
         try:
-            items = os.listdir(cache_folder)
+            os.makedirs(os.path.dirname(path))
         except OSError:
-            continue
-        for cached_file in items:
-            cached_file = os.path.join(cache_folder, cached_file)
+            pass
+
+        lock_path = path + ".lock"
+        while True:
+            fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
             try:
-                mtime = os.path.getmtime(cached_file)
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                # ``_remove`` may have deleted the lock file between opening
+                # and locking it. Another worker can then lock a new file at
+                # the same path, so retry with that one.
+                st = os.fstat(fd)
+                current = os.stat(lock_path)
+                if (st.st_dev, st.st_ino) == (current.st_dev, current.st_ino):
+                    break
+            except OSError as e:
+                if e.errno != errno.ENOENT:
+                    os.close(fd)
+                    raise
+            except BaseException:
+                os.close(fd)
+                raise
+            os.close(fd)
+
+        try:
+            yield
+        finally:
+            os.close(fd)
+
+    def _scan(self):
+        # Hardlinks share their inode, so the cache is accounted for by inode:
+        # inode -> [mtime, size, paths]
+        inodes = {}
+        try:
+            cache_folders = os.listdir(self.cache_path)
+        except OSError:
+            return inodes
+
+        for folder in cache_folders:
+            cache_folder = os.path.join(self.cache_path, folder)
+            try:
+                items = os.listdir(cache_folder)
             except OSError:
                 continue
-            if mtime < cutoff:
+            for cached_file in items:
+                if folder == self.blob_folder and not _blob_name_re.match(cached_file):
+                    continue
+                cached_file = os.path.join(cache_folder, cached_file)
+                if cached_file.endswith(".lock"):
+                    continue
                 try:
-                    os.remove(cached_file)
+                    st = os.stat(cached_file)
+                except OSError:
+                    continue
+                entry = inodes.setdefault((st.st_dev, st.st_ino), [st.st_mtime, st.st_size, []])
+                entry[2].append(cached_file)
+
+        return inodes
+
+    def _remove(self, paths):
+        """
+        Removes all paths of an entry and returns whether it was removed. A
+        blob whose lock is held by a worker is in use and stays in place.
+        """
+        lock_path = None
+        lock_fd = None
+        for path in paths:
+            if os.path.basename(os.path.dirname(path)) == self.blob_folder:
+                lock_path = path + ".lock"
+                try:
+                    lock_fd = os.open(lock_path, os.O_RDWR)
+                except OSError:
+                    lock_path = None
+                break
+
+        if lock_fd is not None:
+            try:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except (IOError, OSError):
+                os.close(lock_fd)
+                return False
+
+        try:
+            for path in paths:
+                try:
+                    os.remove(path)
                 except OSError:
                     pass
+            # Only removed while holding the lock. Workers waiting for it
+            # notice the removal in ``_lock`` and lock a new file instead.
+            if lock_path is not None:
+                try:
+                    os.remove(lock_path)
+                except OSError:
+                    pass
+        finally:
+            if lock_fd is not None:
+                os.close(lock_fd)
+        return True
+
+    def clear_old_entries(self):
+        inodes = sorted(six.itervalues(self._scan()), key=lambda entry: entry[0])
+        cutoff = int(time.time()) - ONE_DAY_AND_A_HALF
+        total_size = sum(size for _, size, _ in inodes)
+
+        evicted = 0
+        for mtime, size, paths in inodes:
+            if mtime >= cutoff and (not self.max_size or total_size <= self.max_size):
+                break
+            if not self._remove(paths):
+                continue
+            total_size -= size
+            if mtime >= cutoff:
+                evicted += 1
+
+        metrics.timing(self.metric_prefix + ".size", total_size)
+        if evicted:
+            metrics.incr(self.metric_prefix + ".evicted", amount=evicted)
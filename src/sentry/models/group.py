@@ -27,6 +27,7 @@ from sentry.db.models import (
     Model,
     sane_repr,
 )
+from sentry.utils import metrics
 from sentry.utils.http import absolute_uri
 from sentry.utils.numbers import base32_decode, base32_encode
 from sentry.utils.strings import strip, truncatechars
@@ -161,6 +162,29 @@ def get_oldest_or_latest_event_for_environments(
 class GroupManager(BaseManager):
     use_for_related_fields = True
 
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        Inserts groups with a single query, applying the defaults of
+        ``Group.save``.
+
+        No signals are sent for the new groups. The ``objects.created``
+        metric is recorded here, but the groups are not written to the model
+        cache like a regular save would.
+        """
+        objs = list(objs)
+        for group in objs:
+            group._apply_save_defaults()
+        rv = super(GroupManager, self).bulk_create(objs, *args, **kwargs)
+        for group in objs:
+            group._update_tracked_data()
+        metrics.incr(
+            "objects.created",
+            amount=len(objs),
+            instance=self.model._meta.db_table,
+            skip_internal=False,
+        )
+        return rv
+
     def by_qualified_short_id(self, organization_id, short_id):
         short_id = parse_short_id(short_id)
         if not short_id:
@@ -300,6 +324,10 @@ class Group(Model):
         return "(%s) %s" % (self.times_seen, self.error())
 
     def save(self, *args, **kwargs):
+        self._apply_save_defaults()
+        super(Group, self).save(*args, **kwargs)
+
+    def _apply_save_defaults(self):
         if not self.last_seen:
             self.last_seen = timezone.now()
         if not self.first_seen:
@@ -315,7 +343,6 @@ class Group(Model):
         self.score = type(self).calculate_score(
             times_seen=self.times_seen, last_seen=self.last_seen
         )
-        super(Group, self).save(*args, **kwargs)
 
     def get_absolute_url(self, params=None):
         url = reverse("sentry-organization-issue", args=[self.organization.slug, self.id])
@@ -127,10 +127,10 @@ class Project(Model, PendingDeletionMixin):
     def __unicode__(self):
         return u"%s (%s)" % (self.name, self.slug)
 
-    def next_short_id(self):
+    def next_short_id(self, delta=1):
         from sentry.models import Counter
 
-        return Counter.increment(self)
+        return Counter.increment(self, delta)
 
     def save(self, *args, **kwargs):
         if not self.slug:
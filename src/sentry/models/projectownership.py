@@ -10,12 +10,16 @@ from django.utils import timezone
 
 from sentry.db.models import Model, sane_repr
 from sentry.db.models.fields import FlexibleForeignKey, JSONField
-from sentry.ownership.grammar import load_schema
+from sentry.ownership.grammar import CompiledRules
 from sentry.utils.cache import cache
+from sentry.utils.lru import LRUCache
 from functools import reduce
 
 READ_CACHE_DURATION = 3600
 
+# Compiled rules by ownership row and version, see `get_compiled_rules`.
+_compiled_rules_cache = LRUCache(max_size=100, sizeof=lambda value: 1)
+
 
 class ProjectOwnership(Model):
     __core__ = True
@@ -64,6 +68,26 @@ class ProjectOwnership(Model):
             cache.set(cache_key, ownership, READ_CACHE_DURATION)
         return ownership or None
 
+    def get_compiled_rules(self):
+        """
+        Returns the schema of this ownership as `CompiledRules`.
+
+        Compiling is only done once per version of the row, the schema is
+        only ever changed together with `last_updated`.
+        """
+        if self.schema is None:
+            return CompiledRules([])
+
+        if self.id is None:
+            return CompiledRules.from_schema(self.schema)
+
+        cache_key = (self.id, self.last_updated)
+        rv = _compiled_rules_cache.get(cache_key)
+        if rv is None:
+            rv = CompiledRules.from_schema(self.schema)
+            _compiled_rules_cache.set(cache_key, rv)
+        return rv
+
     @classmethod
     def get_owners(cls, project_id, data):
         """
@@ -128,13 +152,7 @@ class ProjectOwnership(Model):
 
     @classmethod
     def _matching_ownership_rules(cls, ownership, project_id, data):
-        rules = []
-        if ownership.schema is not None:
-            for rule in load_schema(ownership.schema):
-                if rule.test(data):
-                    rules.append(rule)
-
-        return rules
+        return ownership.get_compiled_rules().get_matching_rules(data)
 
 
 def resolve_actors(owners, project_id):
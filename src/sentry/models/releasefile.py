@@ -1,7 +1,5 @@
 from __future__ import absolute_import
 
-import os
-import errno
 import six
 
 from django.core.files.base import File as FileObj
@@ -10,7 +8,7 @@ from six.moves.urllib.parse import urlsplit, urlunsplit
 
 from sentry import options
 from sentry.db.models import BoundedPositiveIntegerField, FlexibleForeignKey, Model, sane_repr
-from sentry.models import clear_cached_files
+from sentry.models import FileCache
 from sentry.utils import metrics
 from sentry.utils.hashlib import sha1_text
 
@@ -99,24 +97,24 @@ class ReleaseFileCache(object):
             metrics.timing("release_file.cache.get.size", file_size, tags={"cutoff": True})
             return releasefile.file.getfile()
 
-        file_id = six.text_type(releasefile.file_id)
-        organization_id = six.text_type(releasefile.organization_id)
-        file_path = os.path.join(self.cache_path, organization_id, file_id)
-
-        hit = True
-        try:
-            os.stat(file_path)
-        except OSError as e:
-            if e.errno != errno.ENOENT:
-                raise
-            releasefile.file.save_to(file_path)
-            hit = False
-
+        file_path, hit = self.file_cache.get(
+            six.text_type(releasefile.organization_id),
+            six.text_type(releasefile.file_id),
+            releasefile.file,
+        )
         metrics.timing("release_file.cache.get.size", file_size, tags={"hit": hit, "cutoff": False})
         return FileObj(open(file_path, "rb"))
 
+    @property
+    def file_cache(self):
+        return FileCache(
+            self.cache_path,
+            max_size=options.get("releasefile.cache-size"),
+            metric_prefix="release_file.cache",
+        )
+
     def clear_old_entries(self):
-        clear_cached_files(self.cache_path)
+        self.file_cache.clear_old_entries()
 
 
 ReleaseFile.cache = ReleaseFileCache()
@@ -3,14 +3,23 @@ from __future__ import absolute_import
 import six
 
 from base64 import b64encode
+from six.moves import cPickle as pickle
 from threading import local
 from uuid import uuid4
 
 from django.core.cache import caches, InvalidCacheBackendError
 
+from sentry import options
+from sentry.utils import metrics
 from sentry.utils.cache import memoize
+from sentry.utils.lru import LRUCache
 from sentry.utils.services import Service
 
+# Process local cache tier, shared by all threads. Values are stored pickled
+# so that callers can't mutate cached data and so that the size budget is
+# enforced in bytes. Disabled unless ``nodedata.local-cache-size`` is set.
+_local_cache = LRUCache(max_size=0)
+
 
 class NodeStorage(local, Service):
     __all__ = (
@@ -30,6 +39,7 @@ class NodeStorage(local, Service):
         "_set_cache_item",
         "_delete_cache_item",
         "_delete_cache_items",
+        "_clear_cache",
     )
 
     def create(self, data):
@@ -98,32 +108,76 @@ class NodeStorage(local, Service):
     def bootstrap(self):
         raise NotImplementedError
 
+    def _get_local_cache(self):
+        max_size = options.get("nodedata.local-cache-size")
+        if not max_size:
+            return None
+
+        evicted = _local_cache.configure(max_size, options.get("nodedata.local-cache-ttl"))
+        if evicted:
+            metrics.incr("nodestore.local_cache.evicted", amount=evicted)
+        return _local_cache
+
+    def _get_local_cache_items(self, id_list):
+        local_cache = self._get_local_cache()
+        if local_cache is None:
+            return {}
+
+        items = {
+            id: pickle.loads(value) for id, value in six.iteritems(local_cache.get_many(id_list))
+        }
+        if items:
+            metrics.incr("nodestore.local_cache.hit", amount=len(items))
+        if len(items) < len(id_list):
+            metrics.incr("nodestore.local_cache.miss", amount=len(id_list) - len(items))
+        return items
+
+    def _set_local_cache_items(self, items):
+        local_cache = self._get_local_cache()
+        if local_cache is None:
+            return
+
+        evicted = local_cache.set_many(
+            {id: pickle.dumps(data, pickle.HIGHEST_PROTOCOL) for id, data in six.iteritems(items)}
+        )
+        if evicted:
+            metrics.incr("nodestore.local_cache.evicted", amount=evicted)
+
     def _get_cache_item(self, id):
-        if self.cache:
-            return self.cache.get(id)
+        return self._get_cache_items([id]).get(id)
 
     def _get_cache_items(self, id_list):
-        if self.cache:
-            return self.cache.get_many(id_list)
-        return {}
+        items = self._get_local_cache_items(id_list)
+        if self.cache and len(items) < len(id_list):
+            shared_items = self.cache.get_many([id for id in id_list if id not in items])
+            self._set_local_cache_items(shared_items)
+            items.update(shared_items)
+        return items
 
     def _set_cache_item(self, id, data):
-        if self.cache and data:
-            self.cache.set(id, data)
+        self._set_cache_items({id: data})
 
     def _set_cache_items(self, items):
         cacheable_items = {k: v for k, v in six.iteritems(items) if v}
+        self._set_local_cache_items(cacheable_items)
         if self.cache:
             self.cache.set_many(cacheable_items)
 
     def _delete_cache_item(self, id):
+        _local_cache.delete(id)
         if self.cache:
             self.cache.delete(id)
 
     def _delete_cache_items(self, id_list):
+        _local_cache.delete_many(id_list)
         if self.cache:
             self.cache.delete_many(id_list)
 
+    def _clear_cache(self):
+        _local_cache.clear()
+        if self.cache:
+            self.cache.clear()
+
     @memoize
     def cache(self):
         try:
@@ -1,9 +1,10 @@
 from __future__ import absolute_import, print_function
 
 import os
+import six
 import struct
+from concurrent.futures import ThreadPoolExecutor
 from threading import Lock
-from zlib import compress as zlib_compress, decompress as zlib_decompress
 
 from google.cloud import bigtable
 from google.cloud.bigtable.row_set import RowSet
@@ -11,6 +12,8 @@ from simplejson import JSONEncoder, _default_decoder
 from django.utils import timezone
 
 from sentry.nodestore.base import NodeStorage
+from sentry.nodestore.codecs import CODECS, get_codec
+from sentry.utils.iterators import chunked
 
 
 # Cache an instance of the encoder we want to use
@@ -52,6 +55,24 @@ def get_connection(project, instance, table, options):
     return _connection_cache[key]
 
 
+_thread_pool_lock = Lock()
+_thread_pool_cache = {}
+
+
+def get_thread_pool(size):
+    # The pools are shared by all threads of the process, since the
+    # node storage itself is thread local.
+    try:
+        return _thread_pool_cache[size]
+    except KeyError:
+        with _thread_pool_lock:
+            try:
+                return _thread_pool_cache[size]
+            except KeyError:
+                _thread_pool_cache[size] = ThreadPoolExecutor(max_workers=size)
+    return _thread_pool_cache[size]
+
+
 class BigtableNodeStorage(NodeStorage):
     """
     A Bigtable-based backend for storing node data.
@@ -63,15 +84,28 @@ class BigtableNodeStorage(NodeStorage):
     ...     default_ttl=timedelta(days=30),
     ...     compression=True,
     ... )
+
+    ``compression`` is either a boolean (zlib) or the name of a codec from
+    ``sentry.nodestore.codecs``, configured with ``compression_options``:
+
+    >>> BigtableNodeStorage(
+    ...     compression='zstd',
+    ...     compression_options={'dictionaries': {'javascript': '/path/to/javascript.zdict'}},
+    ... )
+
+    Rows written with any other codec remain readable.
     """
 
     max_size = 1024 * 1024 * 10
+    # Rows requested by a single ``read_rows`` call in ``get_multi``. Larger
+    # requests are split and read concurrently.
+    get_multi_chunk_size = 100
     column_family = b"x"
     ttl_column = b"t"
     flags_column = b"f"
     data_column = b"0"
 
-    _FLAG_COMPRESSED = 1 << 0
+    _FLAG_COMPRESSED = CODECS["zlib"].flag
 
     def __init__(
         self,
@@ -81,7 +115,8 @@ class BigtableNodeStorage(NodeStorage):
         automatic_expiry=False,
         default_ttl=None,
         compression=False,
-        thread_pool_size=5,  # TODO(mattrobenolt): Remove this
+        compression_options=None,
+        thread_pool_size=5,
         **kwargs
     ):
         self.project = project
@@ -90,9 +125,29 @@ class BigtableNodeStorage(NodeStorage):
         self.options = kwargs
         self.automatic_expiry = automatic_expiry
         self.default_ttl = default_ttl
+        if compression is True:
+            compression = "zlib"
         self.compression = compression
+        self.thread_pool_size = thread_pool_size
+        self.compression_options = compression_options or {}
+        self._codecs = {}
+        self.codec = self._get_codec(compression) if compression else None
         self.skip_deletes = automatic_expiry and "_SENTRY_CLEANUP" in os.environ
 
+    def _get_codec(self, name):
+        try:
+            return self._codecs[name]
+        except KeyError:
+            options = self.compression_options if name == self.compression else {}
+            codec = self._codecs[name] = get_codec(name, **options)
+            return codec
+
+    def _get_codec_for_flags(self, flags):
+        for name, codec in six.iteritems(CODECS):
+            if flags & codec.flag:
+                return self._get_codec(name)
+        return None
+
     @property
     def connection(self):
         return get_connection(self.project, self.instance, self.table, self.options)
@@ -118,16 +173,28 @@ class BigtableNodeStorage(NodeStorage):
             return cache_items
 
         uncached_ids = [id for id in id_list if id not in cache_items]
+        chunks = list(chunked(uncached_ids, self.get_multi_chunk_size))
+        if len(chunks) == 1 or self.thread_pool_size <= 1:
+            results = [self._read_rows(chunk) for chunk in chunks]
+        else:
+            results = get_thread_pool(self.thread_pool_size).map(self._read_rows, chunks)
+
+        rv = {}
+        for result in results:
+            rv.update(result)
+        self._set_cache_items(rv)
+        rv.update(cache_items)
+        return rv
+
+    def _read_rows(self, id_list):
         rv = {}
         rows = RowSet()
-        for id in uncached_ids:
+        for id in id_list:
             rows.add_row_key(id)
             rv[id] = None
 
         for row in self.connection.read_rows(row_set=rows):
             rv[row.row_key] = self.decode_row(row)
-        self._set_cache_items(rv)
-        rv.update(cache_items)
         return rv
 
     def decode_row(self, row):
@@ -160,9 +227,10 @@ class BigtableNodeStorage(NodeStorage):
             flags = struct.unpack("B", columns[self.flags_column][0].value)[0]
 
         # Check for a compression flag on, if so
-        # decompress the data.
-        if flags & self._FLAG_COMPRESSED:
-            data = zlib_decompress(data)
+        # decompress the data with the matching codec.
+        codec = self._get_codec_for_flags(flags)
+        if codec is not None:
+            data = codec.decode(data)
 
         return json_loads(data)
 
@@ -172,6 +240,7 @@ class BigtableNodeStorage(NodeStorage):
         self._set_cache_item(id, data)
 
     def encode_row(self, id, data, ttl=None):
+        platform = data.get("platform") if isinstance(data, dict) else None
         data = json_dumps(data)
 
         row = self.connection.row(id)
@@ -205,12 +274,12 @@ class BigtableNodeStorage(NodeStorage):
             )
 
         # Track flags for metadata about this row.
-        # This only flag we're tracking now is whether compression
-        # is on or not for the data column.
+        # This only flag we're tracking now is which codec,
+        # if any, compressed the data column.
         flags = 0
-        if self.compression:
-            flags |= self._FLAG_COMPRESSED
-            data = zlib_compress(data)
+        if self.codec is not None:
+            flags |= self.codec.flag
+            data = self.codec.encode(data, platform=platform)
 
         # Only need to write the column at all if any flags
         # are enabled. And if so, pack it into a single byte.
@@ -0,0 +1,125 @@
+from __future__ import absolute_import
+
+import six
+import threading
+import zlib
+import zstandard
+
+
+class NodeCodec(object):
+    """
+    Compresses serialized node payloads. Every codec has a unique ``flag`` bit
+    that backends persist next to the payload, so that rows written with a
+    different codec (or no codec at all) can still be decoded.
+    """
+
+    name = None
+    flag = 0
+
+    def encode(self, value, platform=None):
+        raise NotImplementedError
+
+    def decode(self, value):
+        raise NotImplementedError
+
+
+class ZlibCodec(NodeCodec):
+    name = "zlib"
+    flag = 1 << 0
+
+    def __init__(self, level=6):
+        self.level = level
+
+    def encode(self, value, platform=None):
+        return zlib.compress(value, self.level)
+
+    def decode(self, value):
+        return zlib.decompress(value)
+
+
+class ZstdCodec(NodeCodec):
+    """
+    Zstandard compression with optional trained dictionaries per platform.
+
+    Frames embed the id of the dictionary they were written with, so rows stay
+    readable as long as their dictionary remains configured, even after the
+    dictionary for a platform was replaced.
+
+    >>> ZstdCodec(level=3, dictionaries={
+    ...     'javascript': '/etc/sentry/nodestore/javascript.zdict',
+    ... })
+    """
+
+    name = "zstd"
+    flag = 1 << 1
+
+    def __init__(self, level=3, dictionaries=None):
+        self.level = level
+        self.dictionaries = {}
+        self._dictionaries_by_id = {}
+        for platform, dictionary in six.iteritems(dictionaries or {}):
+            dictionary = load_dictionary(dictionary)
+            self.dictionaries[platform] = dictionary
+            self._dictionaries_by_id[dictionary.dict_id()] = dictionary
+        # zstd (de)compression contexts must not be shared between threads.
+        self._local = threading.local()
+
+    def _get_context(self, kind, dictionary):
+        contexts = getattr(self._local, kind, None)
+        if contexts is None:
+            contexts = {}
+            setattr(self._local, kind, contexts)
+        key = dictionary.dict_id() if dictionary is not None else None
+        try:
+            return contexts[key]
+        except KeyError:
+            if kind == "compressors":
+                context = zstandard.ZstdCompressor(level=self.level, dict_data=dictionary)
+            else:
+                context = zstandard.ZstdDecompressor(dict_data=dictionary)
+            contexts[key] = context
+            return context
+
+    def encode(self, value, platform=None):
+        dictionary = self.dictionaries.get(platform)
+        return self._get_context("compressors", dictionary).compress(value)
+
+    def decode(self, value):
+        dict_id = zstandard.get_frame_parameters(value).dict_id
+        if dict_id:
+            try:
+                dictionary = self._dictionaries_by_id[dict_id]
+            except KeyError:
+                raise ValueError("Unknown zstd dictionary: %d" % dict_id)
+        else:
+            dictionary = None
+        return self._get_context("decompressors", dictionary).decompress(value)
+
+
+CODECS = {codec.name: codec for codec in (ZlibCodec, ZstdCodec)}
+
+
+def get_codec(name, **options):
+    try:
+        cls = CODECS[name]
+    except KeyError:
+        raise ValueError("Unknown nodestore codec: %r" % (name,))
+    return cls(**options)
+
+
+def load_dictionary(dictionary):
+    """
+    Loads a zstd dictionary from a file path, already loaded dictionaries are
+    returned as is.
+    """
+    if isinstance(dictionary, zstandard.ZstdCompressionDict):
+        return dictionary
+    with open(dictionary, "rb") as fp:
+        return zstandard.ZstdCompressionDict(fp.read())
+
+
+def train_dictionary(samples, dict_size=16 * 1024):
+    """
+    Trains a zstd dictionary from serialized sample payloads of a platform.
+    """
+    return zstandard.train_dictionary(dict_size, list(samples))
@@ -6,11 +6,15 @@ from django.utils import timezone
 
 from sentry.db.models import create_or_update
 from sentry.nodestore.base import NodeStorage
+from sentry.utils.iterators import chunked
 
 from .models import Node
 
 
 class DjangoNodeStorage(NodeStorage):
+    # Upper bound for the number of ids in a single ``IN`` query
+    get_multi_chunk_size = 1000
+
     def delete(self, id):
         Node.objects.filter(id=id).delete()
         self._delete_cache_item(id)
@@ -31,8 +35,10 @@ class DjangoNodeStorage(NodeStorage):
         if len(cache_items) == len(id_list):
             return cache_items
 
-        uncached_ids = [id for id in id_list if id not in cache_items]
-        items = {n.id: n.data for n in Node.objects.filter(id__in=uncached_ids)}
+        uncached_ids = list(set(id for id in id_list if id not in cache_items))
+        items = {}
+        for chunk in chunked(uncached_ids, self.get_multi_chunk_size):
+            items.update((n.id, n.data) for n in Node.objects.filter(id__in=chunk))
         self._set_cache_items(items)
         items.update(cache_items)
         return items
@@ -52,8 +58,7 @@ class DjangoNodeStorage(NodeStorage):
         days = math.floor(total_seconds / 86400)
 
         BulkDeleteQuery(model=Node, dtfield="timestamp", days=days).execute()
-        if self.cache:
-            self.cache.clear()
+        self._clear_cache()
 
     def bootstrap(self):
         # Nothing for Django backend to do during bootstrap
@@ -53,6 +53,9 @@ register(
     flags=FLAG_PRIORITIZE_DISK,
 )
 register("releasefile.cache-limit", type=Int, default=10 * 1024 * 1024, flags=FLAG_PRIORITIZE_DISK)
+# Byte budgets of the on-disk caches above, 0 means unbounded
+register("dsym.cache-size", type=Int, default=0, flags=FLAG_PRIORITIZE_DISK)
+register("releasefile.cache-size", type=Int, default=0, flags=FLAG_PRIORITIZE_DISK)
 
 # Mail
 register("mail.backend", default="smtp", flags=FLAG_NOSTORE)
@@ -154,6 +157,8 @@ register("snuba.search.max-chunk-size", default=2000)
 register("snuba.search.max-total-chunk-time-seconds", default=30.0)
 register("snuba.search.hits-sample-size", default=100)
 register("snuba.track-outcomes-sample-rate", default=0.0)
+# Seconds for which the results of snuba queries are cached, per referrer.
+register("snuba.query-cache.referrer-ttls", type=Dict, default={}, flags=FLAG_PRIORITIZE_DISK)
 
 # The percentage of tagkeys that we want to cache. Set to 1.0 in order to cache everything, <=0.0 to stop caching
 register("snuba.tagstore.cache-tagkeys-rate", default=0.0, flags=FLAG_PRIORITIZE_DISK)
@@ -215,6 +220,19 @@ register("outcomes.tsdb-in-consumer-sample-rate", default=0.0)
 # Node data save rate
 register("nodedata.cache-sample-rate", default=0.0, flags=FLAG_PRIORITIZE_DISK)
 register("nodedata.cache-on-save", default=False, flags=FLAG_PRIORITIZE_DISK)
+# Byte budget and TTL (seconds) of the process local nodestore cache, 0 disables it
+register("nodedata.local-cache-size", default=0, flags=FLAG_PRIORITIZE_DISK)
+register("nodedata.local-cache-ttl", default=60, flags=FLAG_PRIORITIZE_DISK)
+
+# Byte budget of the parsed sourcemaps kept by every worker, 0 disables it
+register("sourcemaps.local-cache-size", default=0, flags=FLAG_PRIORITIZE_DISK)
+
+# Number of frame processing results kept by every worker, 0 disables it
+register("stacktraces.local-cache-size", default=0, flags=FLAG_PRIORITIZE_DISK)
+
+# Write None, booleans and JSON containers to the Redis buffer as JSON instead
+# of pickle. Only enable once every buffer flusher can read them.
+register("buffer.write-extended-json-types", default=False, flags=FLAG_PRIORITIZE_DISK)
 
 # Use nodestore for eventstore.get_events
 register("eventstore.use-nodestore", default=False, flags=FLAG_PRIORITIZE_DISK)
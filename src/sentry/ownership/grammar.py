@@ -1,15 +1,23 @@
 from __future__ import absolute_import
 
+import re
+import six
+
 from collections import namedtuple
 from parsimonious.grammar import Grammar, NodeVisitor
 from parsimonious.exceptions import ParseError  # noqa
+from sentry.utils.compat import zip
 from sentry.utils.safe import get_path
 from sentry.utils.glob import glob_match
 
-__all__ = ("parse_rules", "dump_schema", "load_schema")
+__all__ = ("parse_rules", "dump_schema", "load_schema", "CompiledRules")
 
 VERSION = 1
 
+# Everything up to the first of these characters is matched literally by
+# `glob_match`, see `PatternIndex`.
+_glob_chars_re = re.compile(r"[*?\[\]{}\\!]")
+
 # Grammar is defined in EBNF syntax.
 ownership_grammar = Grammar(
     r"""
@@ -197,6 +205,133 @@ class OwnershipVisitor(NodeVisitor):
         return children or node
 
 
+def _normalize_path(value):
+    return value.lower().replace("\\", "/")
+
+
+def _normalize_url(value):
+    return value.lower()
+
+
+class PatternIndex(object):
+    """
+    Matchers of one kind indexed by the literal text their pattern starts
+    with. A glob can only match values that start with its literal prefix,
+    so only patterns whose prefix is a prefix of the value are candidates.
+    Patterns without any glob characters are compared directly.
+    """
+
+    def __init__(self, normalize, match):
+        self.normalize = normalize
+        self.match = match
+        # literal prefix -> [(pattern, is_literal, matcher index), ...]
+        self.by_prefix = {}
+        self.prefix_lengths = []
+
+    def add(self, pattern, matcher_id):
+        prefix = _glob_chars_re.split(pattern, 1)[0]
+        is_literal = prefix == pattern
+        prefix = self.normalize(prefix)
+        if prefix not in self.by_prefix:
+            self.by_prefix[prefix] = []
+            self.prefix_lengths = sorted(set(self.prefix_lengths) | {len(prefix)})
+        self.by_prefix[prefix].append((pattern, is_literal, matcher_id))
+
+    def iter_matches(self, value):
+        """
+        Yields the indexes of all matchers that match ``value``.
+        """
+        normalized = self.normalize(value)
+        for length in self.prefix_lengths:
+            if length > len(normalized):
+                break
+            for pattern, is_literal, matcher_id in self.by_prefix.get(normalized[:length], ()):
+                if is_literal:
+                    if length == len(normalized):
+                        yield matcher_id
+                elif self.match(value, pattern):
+                    yield matcher_id
+
+
+class CompiledRules(object):
+    """
+    A Rule tree prepared for testing events.
+
+    Path and URL patterns are kept in a `PatternIndex` and tag patterns in
+    one index per tag, so an event is only tested against the patterns that
+    can match it. The frames of an event are walked once and every distinct
+    filename is looked up once for all rules.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        # rule index -> matcher index
+        self.rule_matchers = []
+        self.paths = PatternIndex(
+            _normalize_path,
+            lambda value, pattern: glob_match(value, pattern, ignorecase=True, path_normalize=True),
+        )
+        self.urls = PatternIndex(
+            _normalize_url, lambda value, pattern: glob_match(value, pattern, ignorecase=True)
+        )
+        self.tags = {}
+
+        matcher_ids = {}
+        for rule in rules:
+            matcher = rule.matcher
+            if matcher not in matcher_ids:
+                matcher_id = matcher_ids[matcher] = len(matcher_ids)
+                if matcher.type == "path":
+                    self.paths.add(matcher.pattern, matcher_id)
+                elif matcher.type == "url":
+                    self.urls.add(matcher.pattern, matcher_id)
+                elif matcher.type.startswith("tags."):
+                    tag = matcher.type[5:]
+                    if tag not in self.tags:
+                        self.tags[tag] = PatternIndex(lambda value: value, glob_match)
+                    self.tags[tag].add(matcher.pattern, matcher_id)
+            self.rule_matchers.append(matcher_ids[matcher])
+
+    @classmethod
+    def from_schema(cls, schema):
+        return cls(load_schema(schema))
+
+    def get_matching_rules(self, data):
+        """
+        Returns all rules matching the event, in the order of the rules.
+        """
+        if not self.rules:
+            return []
+
+        matched = set()
+
+        if self.paths.by_prefix:
+            filenames = set()
+            for frame in _iter_frames(data):
+                filename = frame.get("filename") or frame.get("abs_path")
+                if filename:
+                    filenames.add(filename)
+            for filename in filenames:
+                matched.update(self.paths.iter_matches(filename))
+
+        if self.urls.by_prefix:
+            url = get_path(data, "request", "url")
+            if url:
+                matched.update(self.urls.iter_matches(url))
+
+        if self.tags:
+            for key, value in data.get("tags") or ():
+                index = self.tags.get(key)
+                if index is not None and isinstance(value, six.string_types):
+                    matched.update(index.iter_matches(value))
+
+        return [
+            rule
+            for rule, matcher_id in zip(self.rules, self.rule_matchers)
+            if matcher_id in matched
+        ]
+
+
 def _iter_frames(data):
     try:
         for frame in get_path(data, "stacktrace", "frames", filter=True) or ():
@@ -4,9 +4,16 @@ from sentry.utils.services import Service
 
 
 class RateLimiter(Service):
-    __all__ = ("is_limited", "validate")
+    __all__ = ("is_limited", "is_limited_many", "validate")
 
     window = 60
 
     def is_limited(self, key, limit, project=None, window=None):
         return False
+
+    def is_limited_many(self, requests, project=None, window=None):
+        """
+        Checks several ``(key, limit)`` pairs at once and returns a list of
+        booleans in the same order. Every key is limited independently.
+        """
+        return [self.is_limited(key, limit, project, window) for key, limit in requests]
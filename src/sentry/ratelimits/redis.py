@@ -2,13 +2,18 @@ from __future__ import absolute_import
 
 import six
 
+from pkg_resources import resource_string
+from redis.client import Script
 from time import time
 
 from sentry.exceptions import InvalidConfiguration
 from sentry.ratelimits.base import RateLimiter
 from sentry.utils.hashlib import md5_text
+from sentry.utils import metrics
 from sentry.utils.redis import get_cluster_from_options
 
+GCRAScript = Script(None, resource_string("sentry", "scripts/ratelimits/gcra.lua"))
+
 
 class RedisRateLimiter(RateLimiter):
     window = 60
@@ -40,3 +45,73 @@ class RedisRateLimiter(RateLimiter):
             client.expire(key, window)
 
         return result.value > limit
+
+
+class RedisGCRARateLimiter(RedisRateLimiter):
+    """
+    Rate limiter that enforces a sliding window with the generic cell rate
+    algorithm (see ``gcra.lua``), so bursts at bucket boundaries cannot exceed
+    the limit. Every check is a single script call.
+
+    Keys that are known to be limited are remembered in a process-local cache
+    until they would be accepted again, and are rejected without talking to
+    Redis. This is exact, since rejected requests do not change any state.
+    """
+
+    def __init__(self, negative_cache_size=10000, **options):
+        super(RedisGCRARateLimiter, self).__init__(**options)
+        self.negative_cache_size = negative_cache_size
+        self._limited_until = {}
+
+    def _make_key(self, key, project=None):
+        key_hex = md5_text(key).hexdigest()
+        if project:
+            return "rlg:%s:%s" % (key_hex, project.id)
+        return "rlg:%s" % (key_hex,)
+
+    def _remember_limited(self, key, until):
+        if len(self._limited_until) >= self.negative_cache_size:
+            now = time()
+            self._limited_until = {k: v for k, v in six.iteritems(self._limited_until) if v > now}
+            if len(self._limited_until) >= self.negative_cache_size:
+                self._limited_until = {}
+        self._limited_until[key] = until
+
+    def is_limited(self, key, limit, project=None, window=None):
+        return self.is_limited_many([(key, limit)], project, window)[0]
+
+    def is_limited_many(self, requests, project=None, window=None):
+        if window is None:
+            window = self.window
+
+        now = time()
+        requests = list(requests)
+        results = [None] * len(requests)
+        commands = {}
+        positions = {}
+        for index, (key, limit) in enumerate(requests):
+            redis_key = self._make_key(key, project)
+            if limit <= 0:
+                results[index] = True
+            elif self._limited_until.get((redis_key, limit, window), 0) > now:
+                metrics.incr("ratelimits.negative_cache.hit", skip_internal=True)
+                results[index] = True
+            else:
+                commands.setdefault(redis_key, []).append(
+                    (GCRAScript, [redis_key], [now, limit, window])
+                )
+                positions.setdefault(redis_key, []).append(index)
+
+        if commands:
+            responses = self.cluster.execute_commands(commands)
+            for redis_key, promises in six.iteritems(responses):
+                for index, promise in zip(positions[redis_key], promises):
+                    rejected, retry_after_ms = promise.value
+                    results[index] = bool(rejected)
+                    if rejected:
+                        limit = requests[index][1]
+                        self._remember_limited(
+                            (redis_key, limit, window), now + retry_after_ms / 1000.0
+                        )
+
+        return results
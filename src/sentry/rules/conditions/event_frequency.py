@@ -52,6 +52,8 @@ class BaseEventFrequencyCondition(EventCondition):
 
     def __init__(self, *args, **kwargs):
         self.tsdb = kwargs.pop("tsdb", tsdb)
+        # Values fetched ahead of time by `batch_query`, keyed by `get_rate_key`
+        self.rates = kwargs.pop("rates", None) or {}
 
         super(BaseEventFrequencyCondition, self).__init__(*args, **kwargs)
 
@@ -71,6 +73,20 @@ class BaseEventFrequencyCondition(EventCondition):
 
     def query(self, event, start, end, environment_id):
         query_result = self.query_hook(event, start, end, environment_id)
+        self.record_query()
+        return query_result
+
+    def batch_query(self, group_ids, start, end, environment_id):
+        """
+        Returns the values of many groups keyed by group id, or ``None`` if
+        the condition cannot query groups in bulk.
+        """
+        query_result = self.batch_query_hook(group_ids, start, end, environment_id)
+        if query_result is not None:
+            self.record_query()
+        return query_result
+
+    def record_query(self):
         metrics.incr(
             "rules.conditions.queried_snuba",
             tags={
@@ -78,14 +94,26 @@ class BaseEventFrequencyCondition(EventCondition):
                 "is_created_on_project_creation": self.is_guessed_to_be_created_on_project_creation,
             },
         )
-        return query_result
 
     def query_hook(self, event, start, end, environment_id):
         """
         """
         raise NotImplementedError  # subclass must implement
 
+    def batch_query_hook(self, group_ids, start, end, environment_id):
+        """
+        """
+        return None
+
+    @classmethod
+    def get_rate_key(cls, interval, environment_id, group_id):
+        return (cls, interval, environment_id, group_id)
+
     def get_rate(self, event, interval, environment_id):
+        key = self.get_rate_key(interval, environment_id, event.group_id)
+        if key in self.rates:
+            return self.rates[key]
+
         _, duration = intervals[interval]
         end = timezone.now()
         return self.query(event, end - duration, end, environment_id=environment_id)
@@ -114,6 +142,15 @@ class EventFrequencyCondition(BaseEventFrequencyCondition):
             environment_id=environment_id,
         )[event.group_id]
 
+    def batch_query_hook(self, group_ids, start, end, environment_id):
+        return self.tsdb.get_sums(
+            model=self.tsdb.models.group,
+            keys=group_ids,
+            start=start,
+            end=end,
+            environment_id=environment_id,
+        )
+
 
 class EventUniqueUserFrequencyCondition(BaseEventFrequencyCondition):
     label = "An issue is seen by more than {value} users in {interval}"
@@ -126,3 +163,12 @@ class EventUniqueUserFrequencyCondition(BaseEventFrequencyCondition):
             end=end,
             environment_id=environment_id,
         )[event.group_id]
+
+    def batch_query_hook(self, group_ids, start, end, environment_id):
+        return self.tsdb.get_distinct_counts_totals(
+            model=self.tsdb.models.users_affected_by_group,
+            keys=group_ids,
+            start=start,
+            end=end,
+            environment_id=environment_id,
+        )
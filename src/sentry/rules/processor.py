@@ -12,6 +12,7 @@ from random import randrange
 from sentry import analytics
 from sentry.models import GroupRuleStatus, Rule
 from sentry.rules import EventState, rules
+from sentry.rules.conditions.event_frequency import BaseEventFrequencyCondition, intervals
 from sentry.utils.hashlib import hash_values
 from sentry.utils.safe import safe_execute
 
@@ -21,7 +22,9 @@ RuleFuture = namedtuple("RuleFuture", ["rule", "kwargs"])
 class RuleProcessor(object):
     logger = logging.getLogger("sentry.rules")
 
-    def __init__(self, event, is_new, is_regression, is_new_group_environment, has_reappeared):
+    def __init__(
+        self, event, is_new, is_regression, is_new_group_environment, has_reappeared, rules=None
+    ):
         self.event = event
         self.group = event.group
         self.project = event.project
@@ -31,9 +34,13 @@ class RuleProcessor(object):
         self.is_new_group_environment = is_new_group_environment
         self.has_reappeared = has_reappeared
 
+        self.rules = rules
+        self.rates = {}
         self.grouped_futures = {}
 
     def get_rules(self):
+        if self.rules is not None:
+            return self.rules
         return Rule.get_for_project(self.project.id)
 
     def get_rule_status(self, rule):
@@ -52,7 +59,11 @@ class RuleProcessor(object):
             self.logger.warn("Unregistered condition %r", condition["id"])
             return
 
-        condition_inst = condition_cls(self.project, data=condition, rule=rule)
+        kwargs = {}
+        if issubclass(condition_cls, BaseEventFrequencyCondition):
+            kwargs["rates"] = self.rates
+
+        condition_inst = condition_cls(self.project, data=condition, rule=rule, **kwargs)
         return safe_execute(condition_inst.passes, self.event, state, _with_transaction=False)
 
     def get_state(self):
@@ -63,14 +74,14 @@ class RuleProcessor(object):
             has_reappeared=self.has_reappeared,
         )
 
-    def apply_rule(self, rule):
-        match = rule.data.get("action_match") or Rule.DEFAULT_ACTION_MATCH
-        condition_list = rule.data.get("conditions", ())
-        frequency = rule.data.get("frequency") or Rule.DEFAULT_FREQUENCY
-
+    def should_apply_rule(self, rule, now):
+        """
+        Returns the status of the rule if its conditions have to be evaluated
+        for this event, ``None`` otherwise.
+        """
         # XXX(dcramer): if theres no condition should we really skip it,
         # or should we just apply it blindly?
-        if not condition_list:
+        if not rule.data.get("conditions", ()):
             return
 
         if (
@@ -81,12 +92,26 @@ class RuleProcessor(object):
 
         status = self.get_rule_status(rule)
 
-        now = timezone.now()
+        frequency = rule.data.get("frequency") or Rule.DEFAULT_FREQUENCY
         freq_offset = now - timedelta(minutes=frequency)
 
         if status.last_active and status.last_active > freq_offset:
             return
 
+        return status
+
+    def apply_rule(self, rule):
+        match = rule.data.get("action_match") or Rule.DEFAULT_ACTION_MATCH
+        condition_list = rule.data.get("conditions", ())
+        frequency = rule.data.get("frequency") or Rule.DEFAULT_FREQUENCY
+
+        now = timezone.now()
+        freq_offset = now - timedelta(minutes=frequency)
+
+        status = self.should_apply_rule(rule, now)
+        if status is None:
+            return
+
         state = self.get_state()
 
         condition_iter = (self.condition_matches(c, state, rule) for c in condition_list)
@@ -144,11 +169,85 @@ class RuleProcessor(object):
                     self.grouped_futures[key][1].append(rule_future)
 
     def apply(self):
+        return self.apply_batch([self])[0]
+
+    @classmethod
+    def apply_batch(cls, processors):
+        """
+        Applies the rules to the events of several processors at once and
+        returns the grouped futures of every processor, in order.
+
+        The rules of a project are loaded once and shared by its events, and
+        the frequency conditions of all rules and events are resolved up front
+        with one query per condition type, interval and environment instead of
+        one query per rule and event.
+        """
+        processors = list(processors)
         # we should only apply rules on unresolved issues
-        if not self.event.group.is_unresolved():
-            return six.itervalues({})
-
-        self.grouped_futures.clear()
-        for rule in self.get_rules():
-            self.apply_rule(rule)
-        return six.itervalues(self.grouped_futures)
+        active = [p for p in processors if p.event.group.is_unresolved()]
+
+        rules_by_project = {}
+        for processor in active:
+            if processor.rules is None:
+                project_id = processor.project.id
+                if project_id not in rules_by_project:
+                    rules_by_project[project_id] = processor.get_rules()
+                processor.rules = rules_by_project[project_id]
+
+        rates = cls.get_rates(active)
+
+        for processor in processors:
+            processor.grouped_futures.clear()
+        for processor in active:
+            processor.rates = rates
+            for rule in processor.get_rules():
+                processor.apply_rule(rule)
+
+        return [six.itervalues(p.grouped_futures) for p in processors]
+
+    @classmethod
+    def get_rates(cls, processors):
+        """
+        Fetches the values of all frequency conditions that the rules of the
+        processors are going to check, keyed by
+        `BaseEventFrequencyCondition.get_rate_key`.
+        """
+        now = timezone.now()
+        # (condition class, interval, environment id) -> (condition, group ids)
+        requests = {}
+        for processor in processors:
+            for rule in processor.get_rules():
+                if processor.should_apply_rule(rule, now) is None:
+                    continue
+                for condition in rule.data.get("conditions", ()):
+                    condition_cls = rules.get(condition["id"])
+                    if condition_cls is None or not issubclass(
+                        condition_cls, BaseEventFrequencyCondition
+                    ):
+                        continue
+                    interval = condition.get("interval")
+                    if interval not in intervals:
+                        continue
+                    key = (condition_cls, interval, rule.environment_id)
+                    if key not in requests:
+                        condition_inst = condition_cls(processor.project, data=condition, rule=rule)
+                        requests[key] = (condition_inst, set())
+                    requests[key][1].add(processor.group.id)
+
+        rates = {}
+        for (condition_cls, interval, environment_id), (condition_inst, group_ids) in six.iteritems(
+            requests
+        ):
+            _, duration = intervals[interval]
+            values = safe_execute(
+                condition_inst.batch_query,
+                sorted(group_ids),
+                now - duration,
+                now,
+                environment_id,
+                _with_transaction=False,
+            )
+            # Conditions without results query their values one by one
+            for group_id, value in six.iteritems(values or {}):
+                rates[condition_cls.get_rate_key(interval, environment_id, group_id)] = value
+        return rates
@@ -61,6 +61,7 @@ list(
             "sentry.runner.commands.help.help",
             "sentry.runner.commands.init.init",
             "sentry.runner.commands.migrations.migrations",
+            "sentry.runner.commands.nodestore.nodestore",
             "sentry.runner.commands.plugins.plugins",
             "sentry.runner.commands.queues.queues",
             "sentry.runner.commands.repair.repair",
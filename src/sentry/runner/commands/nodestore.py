@@ -0,0 +1,103 @@
+from __future__ import absolute_import, print_function
+
+import click
+
+from sentry.runner.decorators import configuration
+
+
+@click.group()
+def nodestore():
+    "Tools for interacting with the node storage."
+
+
+@nodestore.command()
+@click.option("--iterations", "-n", default=100, help="How often every sample is encoded.")
+@click.option("--level", default=3, help="The zstd compression level.")
+@click.option("--dictionary-size", default=16 * 1024, help="Size of trained zstd dictionaries.")
+@click.option(
+    "--dictionary",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Benchmark an existing zstd dictionary instead of training one.",
+)
+@configuration
+def benchmark(iterations, level, dictionary_size, dictionary):
+    """
+    Compare nodestore codecs on the sample events.
+
+    Reports the stored size, encode and decode time per event for every
+    codec. Unless a dictionary is given, the dictionary for each sample is
+    trained on all other samples so that it does not see the sample itself.
+    """
+    import os
+    from timeit import default_timer
+
+    from sentry.constants import DATA_ROOT
+    from sentry.nodestore.codecs import ZlibCodec, ZstdCodec, train_dictionary
+    from sentry.utils import json
+
+    samples_root = os.path.join(DATA_ROOT, "samples")
+    samples = []
+    for filename in sorted(os.listdir(samples_root)):
+        if filename.endswith(".json"):
+            with open(os.path.join(samples_root, filename), "rb") as fp:
+                samples.append(json.dumps(json.loads(fp.read())).encode("utf-8"))
+
+    if dictionary is not None:
+        dictionary_codec = ZstdCodec(level=level, dictionaries={None: dictionary})
+
+        def get_dictionary_codec(index):
+            return dictionary_codec
+
+    else:
+
+        def get_dictionary_codec(index):
+            training = samples[:index] + samples[index + 1 :]
+            return ZstdCodec(
+                level=level, dictionaries={None: train_dictionary(training, dictionary_size)}
+            )
+
+    codecs = [
+        ("none", lambda index: None),
+        ("zlib", lambda index, codec=ZlibCodec(): codec),
+        ("zstd", lambda index, codec=ZstdCodec(level=level): codec),
+        ("zstd+dictionary", get_dictionary_codec),
+    ]
+
+    raw_size = sum(len(sample) for sample in samples)
+    click.echo(
+        "%d samples, %d bytes of JSON, %d iterations\n" % (len(samples), raw_size, iterations)
+    )
+    click.echo(
+        "%-16s %10s %7s %12s %12s" % ("codec", "bytes", "ratio", "encode (us)", "decode (us)")
+    )
+
+    for name, get_codec in codecs:
+        size = encode_time = decode_time = 0
+        for index, sample in enumerate(samples):
+            codec = get_codec(index)
+
+            start = default_timer()
+            for _ in range(iterations):
+                encoded = codec.encode(sample) if codec is not None else sample
+            encode_time += default_timer() - start
+
+            start = default_timer()
+            for _ in range(iterations):
+                decoded = codec.decode(encoded) if codec is not None else encoded
+                json.loads(decoded)
+            decode_time += default_timer() - start
+
+            assert decoded == sample
+            size += len(encoded)
+
+        runs = float(len(samples) * iterations)
+        click.echo(
+            "%-16s %10d %6.1f%% %12.1f %12.1f"
+            % (
+                name,
+                size,
+                100.0 * size / raw_size,
+                encode_time / runs * 1e6,
+                decode_time / runs * 1e6,
+            )
+        )
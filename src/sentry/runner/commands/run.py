@@ -433,6 +433,13 @@ def batching_kafka_options(group):
     default=1,
     help="Spawn this many threads to process messages. Defaults to 1.",
 )
+@click.option(
+    "--pool-type",
+    "pool_type",
+    default="thread",
+    type=click.Choice(["thread", "process"]),
+    help="Process messages in a pool of threads or of processes. A process pool allows a single consumer to use more than one core. Defaults to thread.",
+)
 @configuration
 def ingest_consumer(consumer_types, all_consumer_types, **options):
     """
@@ -0,0 +1,32 @@
+-- Applies one (possibly coalesced) buffer increment to the hash at ``KEYS[1]``
+-- and schedules it for processing by adding it to the pending set at
+-- ``KEYS[2]``. This replaces a pipeline of individual hash commands.
+--
+-- ``ARGV`` is laid out as follows, where ``filters`` and the extra values are
+-- already encoded by the caller:
+--
+--   ARGV = {expire, timestamp, model, filters, signal_only, column_count,
+--           column, amount, ..., extra_column, extra_value, ...}
+--
+-- Counters are incremented, extra values are set (last write wins) and the
+-- signal only flag is only ever set, never cleared.
+local key, pending_key = KEYS[1], KEYS[2]
+local expire, timestamp = ARGV[1], ARGV[2]
+
+redis.call('HSETNX', key, 'm', ARGV[3])
+redis.call('HSETNX', key, 'f', ARGV[4])
+if ARGV[5] == '1' then
+    redis.call('HSET', key, 's', '1')
+end
+
+local columns_end = 6 + tonumber(ARGV[6]) * 2
+for i = 7, columns_end, 2 do
+    redis.call('HINCRBY', key, 'i+' .. ARGV[i], ARGV[i + 1])
+end
+
+for i = columns_end + 1, #ARGV, 2 do
+    redis.call('HSET', key, 'e+' .. ARGV[i], ARGV[i + 1])
+end
+
+redis.call('EXPIRE', key, expire)
+redis.call('ZADD', pending_key, timestamp, key)
@@ -0,0 +1,35 @@
+-- Checks and updates a rate limit using the generic cell rate algorithm
+-- (GCRA), which behaves like a sliding window: at most ``limit`` requests are
+-- allowed within any ``window`` seconds, regardless of where fixed bucket
+-- boundaries would fall.
+--
+-- Instead of a counter, the key stores the "theoretical arrival time" (TAT)
+-- of the next request. Every accepted request pushes the TAT forward by the
+-- emission interval ``window / limit``. A request is rejected if accepting it
+-- would move the TAT more than ``window`` seconds into the future. Rejected
+-- requests do not change any state.
+--
+--   KEYS = {key}
+--   ARGV = {now, limit, window}
+--
+-- Returns ``{rejected, retry_after_ms}`` where ``retry_after_ms`` is the
+-- number of milliseconds until a request would be accepted again.
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local window = tonumber(ARGV[3])
+
+local interval = window / limit
+local tat = tonumber(redis.call('GET', key) or now)
+if tat < now then
+    tat = now
+end
+
+local new_tat = tat + interval
+local allow_at = new_tat - window
+if allow_at > now then
+    return {1, math.ceil((allow_at - now) * 1000)}
+end
+
+redis.call('SET', key, string.format('%.6f', new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {0, 0}
@@ -7,15 +7,25 @@ from django.utils import timezone
 
 from collections import namedtuple, OrderedDict
 
+from sentry import options
 from sentry.models import Project, Release
+from sentry.utils import metrics
 from sentry.utils.cache import cache
 from sentry.utils.hashlib import hash_values
+from sentry.utils.lru import LRUCache
 from sentry.utils.safe import get_path, safe_execute
 from sentry.stacktraces.functions import set_in_app, trim_function_name
 
 
 logger = logging.getLogger(__name__)
 
+FRAME_CACHE_TIMEOUT = 3600
+
+# Processing results of recently seen frames. Events of the same release
+# mostly share their frames, so every worker keeps the results of the last
+# processed frames in front of the shared cache.
+_frame_cache = LRUCache(max_size=0, ttl=FRAME_CACHE_TIMEOUT, sizeof=lambda value: 1)
+
 StacktraceInfo = namedtuple(
     "StacktraceInfo", ["stacktrace", "container", "platforms", "is_exception"]
 )
@@ -67,7 +77,10 @@ class ProcessableFrame(object):
 
     def set_cache_value(self, value):
         if self.cache_key is not None:
-            cache.set(self.cache_key, value, 3600)
+            cache.set(self.cache_key, value, FRAME_CACHE_TIMEOUT)
+            local_cache = get_local_frame_cache()
+            if local_cache is not None:
+                local_cache.set(self.cache_key, value)
             return True
         return False
 
@@ -443,10 +456,36 @@ def get_crash_frame_from_event_data(data, frame_filter=None):
         return default
 
 
+def get_local_frame_cache():
+    max_size = options.get("stacktraces.local-cache-size")
+    if not max_size:
+        return None
+
+    evicted = _frame_cache.configure(max_size, FRAME_CACHE_TIMEOUT)
+    if evicted:
+        metrics.incr("stacktraces.local_cache.evicted", amount=evicted)
+    return _frame_cache
+
+
 def lookup_frame_cache(keys):
-    rv = {}
-    for key in keys:
-        rv[key] = cache.get(key)
+    """
+    Returns the cached processing results for ``keys``, first from the cache
+    of this worker and then from the shared cache in a single request.
+    """
+    keys = list(keys)
+    local_cache = get_local_frame_cache()
+    if local_cache is None:
+        return cache.get_many(keys)
+
+    rv = local_cache.get_many(keys)
+    missing = [key for key in keys if key not in rv]
+    metrics.incr("stacktraces.local_cache.hit", amount=len(rv))
+    metrics.incr("stacktraces.local_cache.miss", amount=len(missing))
+
+    if missing:
+        shared = cache.get_many(missing)
+        local_cache.set_many(shared)
+        rv.update(shared)
     return rv
 
 
@@ -471,11 +510,12 @@ def get_stacktrace_processing_task(infos, processors):
                 processable_frame
             )
             if processable_frame.cache_key is not None:
-                to_lookup[processable_frame.cache_key] = processable_frame
+                to_lookup.setdefault(processable_frame.cache_key, []).append(processable_frame)
 
     frame_cache = lookup_frame_cache(to_lookup)
-    for cache_key, processable_frame in six.iteritems(to_lookup):
-        processable_frame.cache_value = frame_cache.get(cache_key)
+    for cache_key, processable_frames in six.iteritems(to_lookup):
+        for processable_frame in processable_frames:
+            processable_frame.cache_value = frame_cache.get(cache_key)
 
     return StacktraceProcessingTask(
         processable_stacktraces=by_stacktrace_info, processors=by_processor
@@ -1,6 +1,6 @@
 from __future__ import absolute_import, print_function
 
-from os import path
+from os import path, SEEK_END
 
 import hashlib
 import logging
@@ -17,6 +17,31 @@ from sentry.utils.sdk import configure_scope, bind_organization_context
 
 logger = logging.getLogger(__name__)
 
+# Artifacts that are scanned for a sourcemap reference when a bundle is
+# assembled, and how many bytes of their start and end are read for it.
+SOURCEMAP_REFERENCE_EXTENSIONS = (".js", ".mjs", ".cjs", ".bundle", ".jsbundle")
+SOURCEMAP_REFERENCE_SCAN_SIZE = 64 * 1024
+
+
+def read_sourcemap_reference(full_path):
+    """
+    Returns the sourcemap reference of the minified source at ``full_path``,
+    reading only its head and tail where the reference can appear.
+    """
+    from sentry.lang.javascript.processor import get_sourcemap_reference, is_data_uri
+
+    with open(full_path, "rb") as fp:
+        body = fp.read(2 * SOURCEMAP_REFERENCE_SCAN_SIZE)
+        if fp.read(1):
+            fp.seek(-SOURCEMAP_REFERENCE_SCAN_SIZE, SEEK_END)
+            body = body[:SOURCEMAP_REFERENCE_SCAN_SIZE] + b"\n" + fp.read()
+
+    sourcemap = get_sourcemap_reference(body.decode("utf-8", "replace"))
+    # Inline sourcemaps are resolved from the source itself and would bloat
+    # the file headers.
+    if sourcemap and not is_data_uri(sourcemap):
+        return sourcemap
+
 
 def enum(**named_values):
     """Creates an enum type."""
@@ -231,11 +256,20 @@ def assemble_artifacts(org_id, version, checksum, chunks, **kwargs):
             artifact_url = artifact.get("url", rel_path)
             artifact_basename = artifact_url.rsplit("/", 1)[-1]
 
-            file = File.objects.create(
-                name=artifact_basename, type="release.file", headers=artifact.get("headers", {})
-            )
-
             full_path = path.join(scratchpad, rel_path)
+            headers = dict(artifact.get("headers", {}))
+
+            # Look for the sourcemap reference of minified sources once now,
+            # instead of scanning the source for every event that uses it.
+            if artifact_basename.lower().endswith(SOURCEMAP_REFERENCE_EXTENSIONS) and not any(
+                key.lower() in ("sourcemap", "x-sourcemap") for key in headers
+            ):
+                sourcemap = read_sourcemap_reference(full_path)
+                if sourcemap:
+                    headers["Sourcemap"] = sourcemap
+
+            file = File.objects.create(name=artifact_basename, type="release.file", headers=headers)
+
             with open(full_path, "rb") as fp:
                 file.putfile(fp, logger=logger)
 
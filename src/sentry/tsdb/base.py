@@ -103,6 +103,7 @@ class BaseTSDB(Service):
     __read_methods__ = frozenset(
         [
             "get_range",
+            "get_range_multi",
             "get_sums",
             "get_distinct_counts_series",
             "get_distinct_counts_totals",
@@ -362,6 +363,31 @@ class BaseTSDB(Service):
         """
         raise NotImplementedError
 
+    def get_range_multi(self, requests):
+        """
+        Execute several ``get_range`` queries at once. ``requests`` maps a
+        name chosen by the caller to the keyword arguments of a ``get_range``
+        call, and the result maps the same names to the results of these
+        calls. Backends may fetch all requests in a single round trip.
+
+        >>> now = timezone.now()
+        >>> get_range_multi({
+        >>>     'received': {
+        >>>         'model': TSDBModel.project_total_received,
+        >>>         'keys': [1],
+        >>>         'start': now - timedelta(days=1),
+        >>>         'end': now,
+        >>>     },
+        >>>     'rejected': {
+        >>>         'model': TSDBModel.project_total_rejected,
+        >>>         'keys': [1],
+        >>>         'start': now - timedelta(days=1),
+        >>>         'end': now,
+        >>>     },
+        >>> })
+        """
+        return {name: self.get_range(**request) for name, request in six.iteritems(requests)}
+
     def get_sums(self, model, keys, start, end, rollup=None, environment_id=None):
         range_set = self.get_range(
             model,
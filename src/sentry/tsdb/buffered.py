@@ -0,0 +1,242 @@
+from __future__ import absolute_import
+
+import atexit
+import logging
+import six
+import threading
+
+from collections import defaultdict
+from functools import reduce
+
+from django.utils import timezone
+
+from sentry.tsdb.base import BaseTSDB
+from sentry.utils import metrics
+from sentry.utils.dates import to_datetime
+from sentry.utils.imports import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def _gcd(a, b):
+    while b:
+        a, b = b, a % b
+    return a
+
+
+def _make_proxy(name, flush_pending=False):
+    def method(self, *args, **kwargs):
+        if flush_pending:
+            # Buffered writes have to be applied before the backend is asked
+            # to merge or delete the data they belong to.
+            self.flush_pending()
+        return getattr(self.backend, name)(*args, **kwargs)
+
+    method.__name__ = name
+    return method
+
+
+class BufferedTSDB(BaseTSDB):
+    """
+    A TSDB backend that aggregates counter, distinct counter and frequency
+    table writes in memory before handing them to the wrapped backend.
+
+    Writes are merged per model, key, environment and time bucket, where the
+    bucket is the largest interval that divides all rollups, so a burst of
+    events for the same group results in a single write per bucket instead of
+    one write per event. Pending writes are flushed ``flush_interval``
+    seconds after the first of them was buffered, as soon as
+    ``max_pending`` distinct entries are pending and when the process exits.
+
+    All other options are passed to the wrapped backend:
+
+    >>> SENTRY_TSDB = 'sentry.tsdb.buffered.BufferedTSDB'
+    >>> SENTRY_TSDB_OPTIONS = {
+    ...     'backend': 'sentry.tsdb.redis.RedisTSDB',
+    ...     'flush_interval': 1,
+    ...     'max_pending': 1000,
+    ... }
+    """
+
+    def __init__(
+        self, backend="sentry.tsdb.redis.RedisTSDB", flush_interval=1, max_pending=1000, **options
+    ):
+        self.backend = import_string(backend)(**options)
+        super(BufferedTSDB, self).__init__(rollups=self.backend.rollups)
+
+        assert flush_interval > 0
+        assert max_pending > 0
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.bucket_size = reduce(_gcd, self.rollups.keys())
+
+        self._lock = threading.Lock()
+        self._timer = None
+        self._reset_pending()
+        atexit.register(self.flush_pending)
+
+    def _reset_pending(self):
+        # (environment_id, bucket) -> (model, key) -> count
+        self._incrs = defaultdict(lambda: defaultdict(int))
+        # (environment_id, bucket) -> (model, key) -> set(values)
+        self._records = defaultdict(lambda: defaultdict(set))
+        # (environment_id, bucket) -> model -> key -> item -> score
+        self._frequencies = defaultdict(
+            lambda: defaultdict(lambda: defaultdict(lambda: defaultdict(float)))
+        )
+        self._pending = 0
+
+    def _get_bucket(self, timestamp):
+        if timestamp is None:
+            timestamp = timezone.now()
+        return self.normalize_to_epoch(timestamp, self.bucket_size)
+
+    def _buffer(self, update):
+        """
+        Applies ``update`` to the pending writes. ``update`` returns the number
+        of entries it added.
+        """
+        with self._lock:
+            self._pending += update()
+            flush_now = self._pending >= self.max_pending
+            if not flush_now and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush_pending)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if flush_now:
+            self.flush_pending()
+
+    def incr(self, model, key, timestamp=None, count=1, environment_id=None):
+        self.incr_multi([(model, key)], timestamp, count, environment_id)
+
+    def incr_multi(self, items, timestamp=None, count=1, environment_id=None):
+        self.validate_arguments([item[0] for item in items], [environment_id])
+
+        def update():
+            added = 0
+            for item in items:
+                if len(item) == 2:
+                    model, key = item
+                    options = {}
+                else:
+                    model, key, options = item
+
+                bucket = self._get_bucket(options.get("timestamp", timestamp))
+                counters = self._incrs[(environment_id, bucket)]
+                if (model, key) not in counters:
+                    added += 1
+                counters[(model, key)] += options.get("count", count)
+            return added
+
+        self._buffer(update)
+
+    def record(self, model, key, values, timestamp=None, environment_id=None):
+        self.record_multi(((model, key, values),), timestamp, environment_id)
+
+    def record_multi(self, items, timestamp=None, environment_id=None):
+        self.validate_arguments([model for model, key, values in items], [environment_id])
+        bucket = self._get_bucket(timestamp)
+
+        def update():
+            added = 0
+            records = self._records[(environment_id, bucket)]
+            for model, key, values in items:
+                if (model, key) not in records:
+                    added += 1
+                records[(model, key)].update(values)
+            return added
+
+        self._buffer(update)
+
+    def record_frequency_multi(self, requests, timestamp=None, environment_id=None):
+        self.validate_arguments([model for model, request in requests], [environment_id])
+        bucket = self._get_bucket(timestamp)
+
+        def update():
+            added = 0
+            frequencies = self._frequencies[(environment_id, bucket)]
+            for model, request in requests:
+                for key, items in six.iteritems(request):
+                    if key not in frequencies[model]:
+                        added += 1
+                    scores = frequencies[model][key]
+                    for item, score in six.iteritems(items):
+                        scores[item] += score
+            return added
+
+        self._buffer(update)
+
+    def flush_pending(self):
+        """
+        Writes all buffered data to the wrapped backend.
+        """
+        with self._lock:
+            incrs, records, frequencies, pending = (
+                self._incrs,
+                self._records,
+                self._frequencies,
+                self._pending,
+            )
+            self._reset_pending()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        if not pending:
+            return
+
+        metrics.timing("tsdb.buffered.flush.pending", pending)
+
+        try:
+            for (environment_id, bucket), counters in six.iteritems(incrs):
+                self.backend.incr_multi(
+                    [
+                        (model, key, {"count": count})
+                        for (model, key), count in six.iteritems(counters)
+                    ],
+                    timestamp=to_datetime(bucket),
+                    environment_id=environment_id,
+                )
+
+            for (environment_id, bucket), distinct in six.iteritems(records):
+                self.backend.record_multi(
+                    [
+                        (model, key, list(values))
+                        for (model, key), values in six.iteritems(distinct)
+                    ],
+                    timestamp=to_datetime(bucket),
+                    environment_id=environment_id,
+                )
+
+            for (environment_id, bucket), requests in six.iteritems(frequencies):
+                self.backend.record_frequency_multi(
+                    [
+                        (model, {key: dict(items) for key, items in six.iteritems(request)})
+                        for model, request in six.iteritems(requests)
+                    ],
+                    timestamp=to_datetime(bucket),
+                    environment_id=environment_id,
+                )
+        except Exception:
+            metrics.incr("tsdb.buffered.flush.error", skip_internal=True)
+            logger.exception("tsdb.buffered.flush.error", extra={"pending": pending})
+
+    def flush(self):
+        with self._lock:
+            self._reset_pending()
+        return self.backend.flush()
+
+
+for name in BaseTSDB.__read_methods__:
+    setattr(BufferedTSDB, name, _make_proxy(name))
+
+for name in (
+    "merge",
+    "delete",
+    "merge_distinct_counts",
+    "delete_distinct_counts",
+    "merge_frequencies",
+    "delete_frequencies",
+):
+    setattr(BufferedTSDB, name, _make_proxy(name, flush_pending=True))
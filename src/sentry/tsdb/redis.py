@@ -274,35 +274,72 @@ class RedisTSDB(BaseTSDB):
         >>>          start=now - timedelta(days=1),
         >>>          end=now)
         """
-        # redis backend doesn't support multiple envs
-        if environment_ids is not None and len(environment_ids) > 1:
-            raise NotImplementedError
-        environment_id = environment_ids[0] if environment_ids else None
+        return self.get_range_multi(
+            {
+                None: {
+                    "model": model,
+                    "keys": keys,
+                    "start": start,
+                    "end": end,
+                    "rollup": rollup,
+                    "environment_ids": environment_ids,
+                }
+            }
+        )[None]
+
+    def get_range_multi(self, requests):
+        """
+        Reads the counters of all requests with a single pipelined fan-out
+        per cluster. Fields of the same hash are fetched with one ``HMGET``.
+        """
+        # (cluster) => (hash key) => [(request name, key, epoch, hash field), ...]
+        fields_by_cluster = defaultdict(lambda: defaultdict(list))
+        results = {}
 
-        self.validate_arguments([model], [environment_id])
+        for name, request in six.iteritems(requests):
+            model = request["model"]
+            environment_ids = request.get("environment_ids")
 
-        rollup, series = self.get_optimal_rollup_series(start, end, rollup)
-        series = map(to_datetime, series)
+            # redis backend doesn't support multiple envs
+            if environment_ids is not None and len(environment_ids) > 1:
+                raise NotImplementedError
+            environment_id = environment_ids[0] if environment_ids else None
 
-        results = []
-        cluster, _ = self.get_cluster(environment_id)
-        with cluster.map() as client:
-            for key in keys:
+            self.validate_arguments([model], [environment_id])
+
+            rollup, series = self.get_optimal_rollup_series(
+                request["start"], request["end"], request.get("rollup")
+            )
+            series = map(to_datetime, series)
+
+            results[name] = {}
+            fields_by_hash = fields_by_cluster[self.get_cluster(environment_id)[0]]
+            for key in request["keys"]:
+                results[name][key] = {}
                 for timestamp in series:
                     hash_key, hash_field = self.make_counter_key(
                         model, rollup, timestamp, key, environment_id
                     )
-                    results.append(
-                        (to_timestamp(timestamp), key, client.hget(hash_key, hash_field))
+                    fields_by_hash[hash_key].append(
+                        (name, key, to_timestamp(timestamp), hash_field)
                     )
 
-        results_by_key = defaultdict(dict)
-        for epoch, key, count in results:
-            results_by_key[key][epoch] = int(count.value or 0)
+        promises = []
+        for cluster, fields_by_hash in six.iteritems(fields_by_cluster):
+            with cluster.map() as client:
+                for hash_key, fields in six.iteritems(fields_by_hash):
+                    promises.append(
+                        (fields, client.hmget(hash_key, [field[3] for field in fields]))
+                    )
 
-        for key, points in six.iteritems(results_by_key):
-            results_by_key[key] = sorted(points.items())
-        return dict(results_by_key)
+        for fields, promise in promises:
+            for (name, key, epoch, _), count in zip(fields, promise.value):
+                results[name][key][epoch] = int(count or 0)
+
+        return {
+            name: {key: sorted(points.items()) for key, points in six.iteritems(result)}
+            for name, result in six.iteritems(results)
+        }
 
     def merge(self, model, destination, sources, timestamp=None, environment_ids=None):
         environment_ids = (set(environment_ids) if environment_ids is not None else set()).union(
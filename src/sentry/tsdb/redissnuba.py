@@ -4,6 +4,8 @@ import time
 import inspect
 import six
 
+from collections import defaultdict
+
 from sentry.tsdb.base import BaseTSDB
 from sentry.tsdb.dummy import DummyTSDB
 from sentry.tsdb.redis import RedisTSDB
@@ -29,6 +31,10 @@ def dont_do_this(callargs):
 method_specifications = {
     # method: (type, function(callargs) -> set[model])
     "get_range": (READ, single_model_argument),
+    "get_range_multi": (
+        READ,
+        lambda callargs: {request["model"] for request in six.itervalues(callargs["requests"])},
+    ),
     "get_sums": (READ, single_model_argument),
     "get_distinct_counts_series": (READ, single_model_argument),
     "get_distinct_counts_totals": (READ, single_model_argument),
@@ -98,7 +104,9 @@ def make_method(key):
 class RedisSnubaTSDBMeta(type):
     def __new__(cls, name, bases, attrs):
         for key in method_specifications.keys():
-            attrs[key] = make_method(key)
+            # Methods implemented by the class itself may span several backends
+            if key not in attrs:
+                attrs[key] = make_method(key)
         return type.__new__(cls, name, bases, attrs)
 
 
@@ -128,3 +136,16 @@ class RedisSnubaTSDB(BaseTSDB):
             "snuba": SnubaTSDB(**options.pop("snuba", {})),
         }
         super(RedisSnubaTSDB, self).__init__(**options)
+
+    def get_range_multi(self, requests):
+        requests_by_backend = defaultdict(dict)
+        for name, request in six.iteritems(requests):
+            backend = selector_func(
+                "get_range", {"model": request["model"]}, self.switchover_timestamp
+            )
+            requests_by_backend[backend][name] = request
+
+        results = {}
+        for backend, backend_requests in six.iteritems(requests_by_backend):
+            results.update(self.backends[backend].get_range_multi(backend_requests))
+        return results
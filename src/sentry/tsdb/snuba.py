@@ -220,6 +220,38 @@ class SnubaTSDB(BaseTSDB):
         `group_on_time`: whether to add a GROUP BY clause on the 'time' field.
         `group_on_model`: whether to add a GROUP BY clause on the primary model.
         """
+        query, fill_keys, keys = self.get_data_query(
+            model,
+            keys,
+            start,
+            end,
+            rollup,
+            environment_ids,
+            aggregation=aggregation,
+            group_on_model=group_on_model,
+            group_on_time=group_on_time,
+        )
+        result = snuba.query(**query) if keys else {}
+        return self.finish_data_result(result, query["groupby"], fill_keys, keys)
+
+    def get_data_query(
+        self,
+        model,
+        keys,
+        start,
+        end,
+        rollup=None,
+        environment_ids=None,
+        aggregation="count()",
+        group_on_model=True,
+        group_on_time=False,
+    ):
+        """
+        Builds the arguments of the snuba query for ``get_data``.
+
+        Returns a 3-tuple of the query arguments, the keys to zerofill the
+        result with and the normalized keys to trim it to.
+        """
         # XXX: to counteract the hack in project_key_stats.py
         if model in [
             TSDBModel.key_total_received,
@@ -267,31 +299,30 @@ class SnubaTSDB(BaseTSDB):
         end = to_datetime(series[-1] + rollup)
         limit = min(10000, int(len(keys) * ((end - start).total_seconds() / rollup)))
 
-        if keys:
-            result = snuba.query(
-                dataset=model_query_settings.dataset,
-                start=start,
-                end=end,
-                groupby=groupby,
-                conditions=deepcopy(
-                    model_query_settings.conditions
-                ),  # copy because we modify the conditions in snuba.query
-                filter_keys=keys_map,
-                aggregations=aggregations,
-                rollup=rollup,
-                limit=limit,
-                referrer="tsdb",
-                is_grouprelease=(model == TSDBModel.frequent_releases_by_group),
-            )
-        else:
-            result = {}
-
+        query = {
+            "dataset": model_query_settings.dataset,
+            "start": start,
+            "end": end,
+            "groupby": groupby,
+            # copy because we modify the conditions in snuba.query
+            "conditions": deepcopy(model_query_settings.conditions),
+            "filter_keys": keys_map,
+            "aggregations": aggregations,
+            "rollup": rollup,
+            "limit": limit,
+            "referrer": "tsdb",
+            "is_grouprelease": (model == TSDBModel.frequent_releases_by_group),
+        }
+
+        fill_keys = dict(keys_map)
         if group_on_time:
-            keys_map["time"] = series
+            fill_keys["time"] = series
 
-        self.zerofill(result, groupby, keys_map)
-        self.trim(result, groupby, keys)
+        return query, fill_keys, keys
 
+    def finish_data_result(self, result, groupby, fill_keys, keys):
+        self.zerofill(result, groupby, fill_keys)
+        self.trim(result, groupby, keys)
         return result
 
     def zerofill(self, result, groups, flat_keys):
@@ -332,19 +363,6 @@ class SnubaTSDB(BaseTSDB):
                         del result[rk]
 
     def get_range(self, model, keys, start, end, rollup=None, environment_ids=None):
-        # 10s is the only rollup under an hour that we support
-        if rollup and rollup == 10 and model in self.lower_rollup_query_settings.keys():
-            model_query_settings = self.lower_rollup_query_settings.get(model)
-        else:
-            model_query_settings = self.model_query_settings.get(model)
-
-        assert model_query_settings is not None, u"Unsupported TSDBModel: {}".format(model.name)
-
-        if model_query_settings.dataset == snuba.Dataset.Outcomes:
-            aggregate_function = "sum"
-        else:
-            aggregate_function = "count()"
-
         result = self.get_data(
             model,
             keys,
@@ -352,7 +370,7 @@ class SnubaTSDB(BaseTSDB):
             end,
             rollup,
             environment_ids,
-            aggregation=aggregate_function,
+            aggregation=self.get_range_aggregation(model, rollup),
             group_on_time=True,
         )
         # convert
@@ -361,6 +379,64 @@ class SnubaTSDB(BaseTSDB):
         #    {group: [(timestamp, count), ...]}
         return {k: sorted(result[k].items()) for k in result}
 
+    def get_range_multi(self, requests):
+        """
+        Sends the queries of all requests to snuba concurrently.
+        """
+        queries = {}
+        for name, request in six.iteritems(requests):
+            model = request["model"]
+            rollup = request.get("rollup")
+            queries[name] = self.get_data_query(
+                model,
+                request["keys"],
+                request["start"],
+                request["end"],
+                rollup,
+                request.get("environment_ids"),
+                aggregation=self.get_range_aggregation(model, rollup),
+                group_on_time=True,
+            )
+
+        names = [name for name in queries if requests[name]["keys"]]
+        try:
+            if names:
+                bodies = snuba.bulk_raw_query(
+                    [snuba.SnubaQueryParams(**queries[name][0]) for name in names], referrer="tsdb",
+                )
+            else:
+                bodies = []
+        except (snuba.QueryOutsideRetentionError, snuba.QueryOutsideGroupActivityError):
+            # These errors fail the whole batch, so let every request handle
+            # them on its own instead.
+            return super(SnubaTSDB, self).get_range_multi(requests)
+
+        results = {name: {} for name in queries}
+        for name, body in zip(names, bodies):
+            query = queries[name][0]
+            results[name] = snuba.nest_groups(
+                body["data"], query["groupby"], [a[2] for a in query["aggregations"]]
+            )
+
+        rv = {}
+        for name, (query, fill_keys, keys) in six.iteritems(queries):
+            result = self.finish_data_result(results[name], query["groupby"], fill_keys, keys)
+            rv[name] = {k: sorted(result[k].items()) for k in result}
+        return rv
+
+    def get_range_aggregation(self, model, rollup):
+        # 10s is the only rollup under an hour that we support
+        if rollup and rollup == 10 and model in self.lower_rollup_query_settings.keys():
+            model_query_settings = self.lower_rollup_query_settings.get(model)
+        else:
+            model_query_settings = self.model_query_settings.get(model)
+
+        assert model_query_settings is not None, u"Unsupported TSDBModel: {}".format(model.name)
+
+        if model_query_settings.dataset == snuba.Dataset.Outcomes:
+            return "sum"
+        return "count()"
+
     def get_distinct_counts_series(
         self, model, keys, start, end=None, rollup=None, environment_id=None
     ):
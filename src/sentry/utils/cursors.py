@@ -32,6 +32,8 @@ class Cursor(object):
     def __nonzero__(self):
         return self.has_results
 
+    __bool__ = __nonzero__
+
     @classmethod
     def from_string(cls, value):
         bits = value.split(":")
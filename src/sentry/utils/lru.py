@@ -0,0 +1,125 @@
+from __future__ import absolute_import
+
+import threading
+
+from collections import OrderedDict
+from time import time
+
+
+class LRUCache(object):
+    """
+    A thread safe, size bounded LRU mapping with an optional TTL.
+
+    The size of every value is determined by ``sizeof`` (``len`` by default,
+    which makes ``max_size`` a byte budget for string values). Writes evict
+    the least recently used entries until the cache fits its budget again,
+    values larger than the whole budget are never stored.
+
+    >>> cache = LRUCache(max_size=1024 * 1024, ttl=60)
+    >>> cache.set('key1', b'value')
+    >>> cache.get('key1')
+    """
+
+    def __init__(self, max_size, ttl=None, sizeof=len):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.size = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def configure(self, max_size, ttl=None):
+        """
+        Change the budget and TTL of the cache, evicting entries if the cache
+        no longer fits. Returns the number of evicted entries.
+        """
+        with self._lock:
+            self.ttl = ttl
+            if max_size == self.max_size:
+                return 0
+            self.max_size = max_size
+            return self._evict()
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._get(key, default, time())
+
+    def get_many(self, keys):
+        """
+        Returns a dictionary with the values of all keys present in the cache.
+        """
+        rv = {}
+        now = time()
+        with self._lock:
+            for key in keys:
+                value = self._get(key, None, now)
+                if value is not None:
+                    rv[key] = value
+        return rv
+
+    def set(self, key, value):
+        """
+        Store ``value`` under ``key``. Returns the number of entries evicted to
+        make room for it.
+        """
+        return self.set_many({key: value})
+
+    def set_many(self, items):
+        expires = time() + self.ttl if self.ttl else None
+        with self._lock:
+            for key, value in items.items():
+                self._delete(key)
+                size = self.sizeof(value)
+                if size > self.max_size:
+                    continue
+                self._data[key] = (value, size, expires)
+                self.size += size
+            return self._evict()
+
+    def delete(self, key):
+        with self._lock:
+            self._delete(key)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._delete(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.size = 0
+
+    def _get(self, key, default, now):
+        try:
+            entry = self._data.pop(key)
+        except KeyError:
+            return default
+
+        value, size, expires = entry
+        if expires is not None and expires <= now:
+            self.size -= size
+            return default
+
+        # Re-inserting moves the entry to the most recently used end.
+        self._data[key] = entry
+        return value
+
+    def _delete(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def _evict(self):
+        evicted = 0
+        while self.size > self.max_size and self._data:
+            _, (_, size, _) = self._data.popitem(last=False)
+            self.size -= size
+            evicted += 1
+        return evicted
@@ -10,6 +10,7 @@ import os
 import pytz
 import re
 import six
+import threading
 import time
 import urllib3
 import sentry_sdk
@@ -19,7 +20,7 @@ from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
 from six.moves.urllib.parse import urlparse
 
-from sentry import quotas
+from sentry import options, quotas
 from sentry.models import (
     Environment,
     Group,
@@ -32,7 +33,9 @@ from sentry.models import (
 )
 from sentry.net.http import connection_from_url
 from sentry.utils import metrics, json
+from sentry.utils.cache import cache
 from sentry.utils.dates import to_timestamp
+from sentry.utils.hashlib import md5_text
 from sentry.snuba.events import Columns
 from sentry.snuba.dataset import Dataset
 from sentry.utils.compat import map
@@ -241,6 +244,11 @@ _snuba_pool = connection_from_url(
 )
 _query_thread_pool = ThreadPoolExecutor(max_workers=10)
 
+# Identical queries that are currently sent to snuba by this process, see
+# ``_snuba_request``.
+_inflight_queries = {}
+_inflight_queries_lock = threading.Lock()
+
 
 epoch_naive = datetime(1970, 1, 1, tzinfo=None)
 
@@ -544,6 +552,100 @@ def raw_query(
     return bulk_raw_query([snuba_params], referrer=referrer)[0]
 
 
+SnubaResponse = namedtuple("SnubaResponse", ("status", "data"))
+
+
+class InflightQuery(object):
+    def __init__(self):
+        self.event = threading.Event()
+        self.response = None
+        self.error = None
+
+
+def get_query_cache_ttl(referrer):
+    """
+    Returns the number of seconds for which results of queries with the
+    given referrer are cached, ``0`` disables the cache.
+    """
+    return options.get("snuba.query-cache.referrer-ttls").get(referrer, 0)
+
+
+def get_query_cache_key(query_params, referrer, ttl=0):
+    """
+    Computes the cache key of prepared query parameters.
+
+    Queries are usually sent with a time window that ends now, so when
+    results are cached the window is quantized to the TTL. Queries that run
+    within the same TTL window then share the key, while the jitter of
+    ``quantize_time`` keeps the keys of different queries from expiring at
+    the same time.
+    """
+    params = {k: v for k, v in six.iteritems(query_params) if k not in ("from_date", "to_date")}
+    key_hash = md5_text(referrer, json.dumps(sorted(six.iteritems(params)))).hexdigest()
+
+    window = []
+    for k in ("from_date", "to_date"):
+        date = query_params.get(k)
+        if date and ttl:
+            date = quantize_time(
+                parse_datetime(date), int(key_hash[:8], 16), duration=min(ttl, 3600)
+            ).isoformat()
+        window.append(date)
+
+    return u"snuba:query:{}:{}".format(key_hash, md5_text(*window).hexdigest())
+
+
+def _snuba_request(query_params, body, headers):
+    """
+    Sends a prepared query to snuba.
+
+    Results of referrers with a TTL in ``snuba.query-cache.referrer-ttls``
+    are cached, and identical queries that are sent by several threads of
+    this process at the same time only reach snuba once.
+    """
+    referrer = headers.get("referer", "<unknown>")
+    if query_params.get("consistent"):
+        response = _snuba_pool.urlopen("POST", "/query", body=body, headers=headers)
+        return SnubaResponse(response.status, response.data)
+
+    ttl = get_query_cache_ttl(referrer)
+    key = get_query_cache_key(query_params, referrer, ttl)
+
+    if ttl:
+        data = cache.get(key)
+        if data is not None:
+            metrics.incr("snuba.client.query_cache.hit", tags={"referrer": referrer})
+            return SnubaResponse(200, data)
+        metrics.incr("snuba.client.query_cache.miss", tags={"referrer": referrer})
+
+    with _inflight_queries_lock:
+        inflight = _inflight_queries.get(key)
+        is_leader = inflight is None
+        if is_leader:
+            inflight = _inflight_queries[key] = InflightQuery()
+
+    if not is_leader:
+        metrics.incr("snuba.client.query_cache.coalesced", tags={"referrer": referrer})
+        inflight.event.wait()
+        if inflight.error is not None:
+            raise inflight.error
+        return inflight.response
+
+    try:
+        response = _snuba_pool.urlopen("POST", "/query", body=body, headers=headers)
+        inflight.response = SnubaResponse(response.status, response.data)
+        if ttl and response.status == 200:
+            cache.set(key, response.data, ttl)
+        return inflight.response
+    except Exception as error:
+        inflight.error = error
+        raise
+    finally:
+        with _inflight_queries_lock:
+            del _inflight_queries[key]
+        inflight.event.set()
+
+
 def bulk_raw_query(snuba_param_list, referrer=None):
     headers = {}
     if referrer:
@@ -563,11 +665,7 @@ def bulk_raw_query(snuba_param_list, referrer=None):
                     span.set_tag("referrer", referrer)
                     for param_key, param_data in six.iteritems(query_params):
                         span.set_data(param_key, param_data)
-                    return (
-                        _snuba_pool.urlopen("POST", "/query", body=body, headers=headers),
-                        forward,
-                        reverse,
-                    )
+                    return (_snuba_request(query_params, body, headers), forward, reverse)
         except urllib3.exceptions.HTTPError as err:
             raise SnubaError(err)
 
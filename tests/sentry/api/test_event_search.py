@@ -24,6 +24,8 @@ from sentry.api.event_search import (
     SearchKey,
     SearchValue,
     SearchVisitor,
+    filter_conditions_cache,
+    parsed_query_cache,
 )
 from sentry.testutils.cases import TestCase
 from sentry.testutils.helpers.datetime import before_now
@@ -1031,6 +1033,45 @@ class ParseBooleanSearchQueryTest(unittest.TestCase):
         )
 
 
+class SearchQueryCacheTest(unittest.TestCase):
+    def setUp(self):
+        parsed_query_cache.clear()
+        filter_conditions_cache.clear()
+
+    def test_parse_search_query(self):
+        query = "user.email:foo@example.com release:1.2.1 hello"
+        result = parse_search_query(query)
+        assert parsed_query_cache.get((SearchVisitor, query)) == tuple(result)
+
+        cached_result = parse_search_query(query)
+        assert cached_result == result
+        assert cached_result is not result
+
+    def test_parse_search_query_relative_time(self):
+        with freeze_time("2020-05-06T12:00:00"):
+            result = parse_search_query("timestamp:-24h")
+        assert len(parsed_query_cache) == 0
+
+        with freeze_time("2020-05-07T12:00:00"):
+            assert parse_search_query("timestamp:-24h") != result
+
+    def test_get_filter(self):
+        query = "user.email:foo@example.com release:1.2.1 fruit:apple hello"
+        params = {"project_id": [1, 2, 3], "start": None, "end": None}
+
+        _filter = get_filter(query, params)
+        assert len(filter_conditions_cache) == 1
+
+        _filter.conditions.append(["foo", "=", "bar"])
+        cached_filter = get_filter(query, params)
+        assert cached_filter.conditions == _filter.conditions[:-1]
+        assert cached_filter.project_ids == [1, 2, 3]
+
+    def test_get_filter_not_static(self):
+        get_filter("count():>1", {"project_id": [1, 2, 3]})
+        assert len(filter_conditions_cache) == 0
+
+
 class GetSnubaQueryArgsTest(TestCase):
     def test_simple(self):
         _filter = get_filter(
@@ -6,17 +6,20 @@ from unittest import TestCase as SimpleTestCase
 
 from sentry.api.paginator import (
     BadPaginationError,
+    KeysetPaginator,
     Paginator,
     DateTimePaginator,
     OffsetPaginator,
     SequencePaginator,
     GenericOffsetPaginator,
     CombinedQuerysetPaginator,
+    estimate_hits,
     reverse_bisect_left,
 )
 from sentry.models import User, Rule
 from sentry.incidents.models import AlertRule
 from sentry.testutils import TestCase, APITestCase
+from sentry.utils.compat import mock
 from sentry.utils.cursors import Cursor
 
 
@@ -77,6 +80,48 @@ class PaginatorTest(TestCase):
         result3 = paginator.get_result(limit=1, cursor=result2.prev)
         assert len(result3) == 0, (result3, list(result3))
 
+    def test_estimate_hits(self):
+        for i in range(3):
+            self.create_user("foo%d@example.com" % i)
+
+        queryset = User.objects.all()
+        assert estimate_hits(queryset) >= 0
+        assert estimate_hits(User.objects.none()) == 0
+
+        paginator = self.cls(queryset, "id", estimate_hits=True)
+        with mock.patch("sentry.api.paginator.estimate_hits", return_value=100):
+            assert paginator.count_hits(10) == 10
+            assert paginator.count_hits(1000) == 3
+
+
+class KeysetPaginatorTest(PaginatorTest):
+    cls = KeysetPaginator
+
+    def test_simple(self):
+        users = [self.create_user("foo%d@example.com" % i) for i in range(5)]
+        users.sort(key=lambda user: -user.id)
+
+        paginator = self.cls(User.objects.all(), "-id")
+        result1 = paginator.get_result(limit=2, cursor=None)
+        assert list(result1) == users[:2]
+        assert not result1.prev.has_results
+        assert result1.next.has_results
+
+        result2 = paginator.get_result(limit=2, cursor=result1.next)
+        assert list(result2) == users[2:4]
+        assert result2.prev.has_results
+
+        result3 = paginator.get_result(limit=2, cursor=result2.next)
+        assert list(result3) == users[4:]
+        assert not result3.next.has_results
+
+        result4 = paginator.get_result(limit=2, cursor=result3.prev)
+        assert list(result4) == users[2:4]
+
+        result5 = paginator.get_result(limit=2, cursor=result4.prev)
+        assert list(result5) == users[:2]
+        assert not result5.prev.has_results
+
 
 class OffsetPaginatorTest(TestCase):
     # offset paginator does not support dynamic limits on is_prev
@@ -606,3 +651,26 @@ class CombinedQuerysetPaginatorTest(APITestCase):
 
         result = paginator.get_result(limit=3, cursor=prev_cursor)
         assert list(result) == page1_results
+
+    def test_equal_keys(self):
+        Rule.objects.all().delete()
+
+        # More rows share the key than a single chunk of a queryset holds
+        date_added = timezone.now()
+        rules = [
+            Rule.objects.create(label="rule%d" % i, project=self.project, date_added=date_added)
+            for i in range(8)
+        ]
+
+        paginator = CombinedQuerysetPaginator(
+            querysets=[AlertRule.objects.all(), Rule.objects.all()], order_by="-date_added"
+        )
+
+        result = paginator.get_result(limit=2, cursor=None)
+        results = list(result)
+        while result.next.has_results:
+            result = paginator.get_result(limit=2, cursor=result.next)
+            assert len(result) > 0
+            results.extend(result)
+
+        assert [rule.id for rule in results] == sorted((rule.id for rule in rules), reverse=True)
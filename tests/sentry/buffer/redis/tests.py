@@ -3,6 +3,7 @@
 from __future__ import absolute_import
 
 import pickle
+import six
 from sentry.utils.compat import mock
 
 from datetime import datetime
@@ -10,6 +11,41 @@ from django.utils import timezone
 from sentry.buffer.redis import RedisBuffer
 from sentry.models import Group, Project
 from sentry.testutils import TestCase
+from sentry.utils import json
+
+
+def load_legacy_hash(values):
+    """
+    Decodes a buffer hash the way flushers did before extended JSON types
+    were added, which fails on any type they do not know.
+    """
+
+    def load_value(payload):
+        (type_, value) = payload
+        if type_ == "s":
+            return value
+        elif type_ == "d":
+            return datetime.fromtimestamp(float(value)).replace(tzinfo=timezone.utc)
+        elif type_ == "i":
+            return int(value)
+        elif type_ == "f":
+            return float(value)
+        else:
+            raise TypeError("invalid type: {}".format(type_))
+
+    if values["f"].startswith("{"):
+        filters = {k: load_value(v) for k, v in six.iteritems(json.loads(values["f"]))}
+    else:
+        filters = pickle.loads(values["f"])
+
+    extra = {}
+    for k, v in six.iteritems(values):
+        if k.startswith("e+"):
+            if v.startswith("["):
+                extra[k[2:]] = load_value(json.loads(v))
+            else:
+                extra[k[2:]] = pickle.loads(v)
+    return filters, extra
 
 
 class RedisBufferTest(TestCase):
@@ -51,7 +87,7 @@ class RedisBufferTest(TestCase):
         assert client.zrange("b:p", 0, -1) == []
 
     @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
-    @mock.patch("sentry.buffer.base.Buffer.process")
+    @mock.patch("sentry.buffer.base.Buffer.process", autospec=True)
     def test_process_does_bubble_up_json(self, process):
         client = self.buf.cluster.get_routing_client()
         client.hmset(
@@ -69,10 +105,10 @@ class RedisBufferTest(TestCase):
         extra = {"foo": "bar", "datetime": datetime(2017, 5, 3, 6, 6, 6, tzinfo=timezone.utc)}
         signal_only = None
         self.buf.process("foo")
-        process.assert_called_once_with(Group, columns, filters, extra, signal_only)
+        process.assert_called_once_with(self.buf, Group, columns, filters, extra, signal_only)
 
     @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
-    @mock.patch("sentry.buffer.base.Buffer.process")
+    @mock.patch("sentry.buffer.base.Buffer.process", autospec=True)
     def test_process_does_bubble_up_pickle(self, process):
         client = self.buf.cluster.get_routing_client()
         client.hmset(
@@ -89,7 +125,7 @@ class RedisBufferTest(TestCase):
         extra = {"foo": "bar"}
         signal_only = None
         self.buf.process("foo")
-        process.assert_called_once_with(Group, columns, filters, extra, signal_only)
+        process.assert_called_once_with(self.buf, Group, columns, filters, extra, signal_only)
 
     @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
     @mock.patch("sentry.buffer.redis.process_incr", mock.Mock())
@@ -103,9 +139,9 @@ class RedisBufferTest(TestCase):
         self.buf.incr(model, columns, filters, extra={"foo": "bar", "datetime": now})
         result = client.hgetall("foo")
         f = result.pop("f")
-        assert pickle.loads(f) == {"pk": 1, "datetime": now}
-        assert pickle.loads(result.pop("e+datetime")) == now
-        assert pickle.loads(result.pop("e+foo")) == "bar"
+        assert self.buf._load_values(json.loads(f)) == {"pk": 1, "datetime": now}
+        assert self.buf._load_value(json.loads(result.pop("e+datetime"))) == now
+        assert self.buf._load_value(json.loads(result.pop("e+foo"))) == "bar"
         assert result == {"i+times_seen": "1", "m": "mock.mock.Mock"}
 
         pending = client.zrange("b:p", 0, -1)
@@ -113,14 +149,91 @@ class RedisBufferTest(TestCase):
         self.buf.incr(model, columns, filters, extra={"foo": "baz", "datetime": now})
         result = client.hgetall("foo")
         f = result.pop("f")
-        assert pickle.loads(f) == {"pk": 1, "datetime": now}
-        assert pickle.loads(result.pop("e+datetime")) == now
-        assert pickle.loads(result.pop("e+foo")) == "baz"
+        assert self.buf._load_values(json.loads(f)) == {"pk": 1, "datetime": now}
+        assert self.buf._load_value(json.loads(result.pop("e+datetime"))) == now
+        assert self.buf._load_value(json.loads(result.pop("e+foo"))) == "baz"
         assert result == {"i+times_seen": "2", "m": "mock.mock.Mock"}
 
         pending = client.zrange("b:p", 0, -1)
         assert pending == ["foo"]
 
+    @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
+    @mock.patch("sentry.buffer.base.Buffer.process", autospec=True)
+    def test_incr_roundtrips_through_process(self, process):
+        now = datetime(2017, 5, 3, 6, 6, 6, tzinfo=timezone.utc)
+        extra = {
+            "last_seen": now,
+            "level": 40,
+            "data": {"last_received": 1493791566.123456, "type": "error"},
+            "message": None,
+        }
+        self.buf.incr(Group, {"times_seen": 1}, {"id": 1}, extra=extra)
+        self.buf.process("foo")
+        process.assert_called_once_with(self.buf, Group, {"times_seen": 1}, {"id": 1}, extra, None)
+
+    @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
+    def test_incr_is_readable_by_legacy_flushers(self):
+        now = datetime(2017, 5, 3, 6, 6, 6, tzinfo=timezone.utc)
+        client = self.buf.cluster.get_routing_client()
+        extra = {
+            "last_seen": now,
+            "level": 40,
+            "score": 1.5,
+            "active": True,
+            "data": {"last_received": 1493791566.123456, "type": "error"},
+            "message": None,
+        }
+        self.buf.incr(Group, {"times_seen": 1}, {"id": 1}, extra=extra)
+        assert load_legacy_hash(client.hgetall("foo")) == ({"id": 1}, extra)
+
+    @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
+    @mock.patch("sentry.buffer.base.Buffer.process", autospec=True)
+    def test_incr_writes_extended_json_types(self, process):
+        client = self.buf.cluster.get_routing_client()
+        extra = {"active": True, "data": {"type": "error"}, "message": None}
+        with self.options({"buffer.write-extended-json-types": True}):
+            self.buf.incr(Group, {"times_seen": 1}, {"id": 1}, extra=extra)
+
+        values = client.hgetall("foo")
+        assert json.loads(values["e+active"]) == ["b", "1"]
+        assert json.loads(values["e+data"])[0] == "j"
+        assert json.loads(values["e+message"]) == ["n", ""]
+
+        self.buf.process("foo")
+        process.assert_called_once_with(self.buf, Group, {"times_seen": 1}, {"id": 1}, extra, None)
+
+    @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
+    def test_incr_falls_back_to_pickle(self):
+        client = self.buf.cluster.get_routing_client()
+        self.buf.incr(Group, {"times_seen": 1}, {"id": 1}, extra={"score": set([1])})
+        assert pickle.loads(client.hget("foo", "e+score")) == set([1])
+
+    @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
+    def test_incr_coalesces_within_window(self):
+        self.buf.incr_coalesce_window = 60
+        client = self.buf.cluster.get_routing_client()
+
+        self.buf.incr(Group, {"times_seen": 1}, {"id": 1}, extra={"message": "a"})
+        self.buf.incr(Group, {"times_seen": 2}, {"id": 1}, extra={"message": "b"})
+        assert client.hgetall("foo") == {}
+
+        self.buf.flush_coalesced_incrs()
+        result = client.hgetall("foo")
+        assert result["i+times_seen"] == "3"
+        assert self.buf._load_value(json.loads(result["e+message"])) == "b"
+        assert client.zrange("b:p", 0, -1) == ["foo"]
+
+    def test_incr_coalesce_flushes_when_full(self):
+        self.buf.incr_coalesce_window = 60
+        self.buf.incr_coalesce_max_keys = 2
+        client = self.buf.cluster.get_routing_client()
+
+        self.buf.incr(Group, {"times_seen": 1}, {"id": 1})
+        assert client.zrange("b:p", 0, -1) == []
+        self.buf.incr(Group, {"times_seen": 1}, {"id": 2})
+        assert len(client.zrange("b:p", 0, -1)) == 2
+        assert self.buf._coalesced_incrs == {}
+
     @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
     @mock.patch("sentry.buffer.redis.process_incr")
     @mock.patch("sentry.buffer.redis.process_pending")
@@ -168,7 +281,7 @@ class RedisBufferTest(TestCase):
         assert len(process_pending.apply_async.mock_calls) == 2
 
     @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
-    @mock.patch("sentry.buffer.base.Buffer.process")
+    @mock.patch("sentry.buffer.base.Buffer.process", autospec=True)
     def test_process_uses_signal_only(self, process):
         client = self.buf.cluster.get_routing_client()
         client.hmset(
@@ -181,7 +294,52 @@ class RedisBufferTest(TestCase):
             },
         )
         self.buf.process("foo")
-        process.assert_called_once_with(mock.Mock, {"times_seen": 1}, {"pk": 1}, {}, True)
+        process.assert_called_once_with(self.buf, mock.Mock, {"times_seen": 1}, {"pk": 1}, {}, True)
+
+    def test_process_batch_updates_rows_in_bulk(self):
+        project = self.create_project()
+        groups = [self.create_group(project=project, times_seen=1) for _ in range(3)]
+        last_seen = timezone.now().replace(microsecond=0)
+        for i, group in enumerate(groups):
+            self.buf.incr(
+                Group, {"times_seen": i + 1}, {"id": group.id}, extra={"last_seen": last_seen}
+            )
+        keys = [self.buf._make_key(Group, {"id": group.id}) for group in groups]
+
+        with mock.patch("sentry.buffer.base.buffer_incr_complete") as signal, mock.patch(
+            "sentry.models.Group.objects.create_or_update"
+        ) as create_or_update:
+            self.buf.process(batch_keys=keys)
+
+        assert not create_or_update.called
+        assert signal.send_robust.call_count == 3
+        for i, group in enumerate(groups):
+            group.refresh_from_db()
+            assert group.times_seen == i + 2
+            assert group.last_seen == last_seen
+
+        client = self.buf.cluster.get_routing_client()
+        assert client.zrange("b:p", 0, -1) == []
+        assert not any(client.exists(key) for key in keys)
+
+    @mock.patch("sentry.buffer.base.Buffer.process", autospec=True)
+    def test_process_batch_creates_missing_rows(self, process):
+        project = self.create_project()
+        group = self.create_group(project=project)
+        self.buf.incr(Group, {"times_seen": 1}, {"id": group.id})
+        self.buf.incr(Group, {"times_seen": 1}, {"id": group.id + 1000})
+        keys = [
+            self.buf._make_key(Group, {"id": group.id}),
+            self.buf._make_key(Group, {"id": group.id + 1000}),
+        ]
+
+        self.buf.process(batch_keys=keys)
+
+        process.assert_called_once_with(
+            self.buf, Group, {"times_seen": 1}, {"id": group.id + 1000}, {}, None
+        )
+        group.refresh_from_db()
+        assert group.times_seen == 2
 
     """
     @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
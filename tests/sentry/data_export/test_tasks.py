@@ -1,7 +1,8 @@
 from __future__ import absolute_import
 
-from sentry.data_export.models import ExportedData
-from sentry.data_export.tasks import assemble_download
+from sentry.data_export.models import ExportedData, ExportedDataBlob
+from sentry.data_export.processors.issues_by_tag import IssuesByTagProcessor
+from sentry.data_export.tasks import assemble_download, export_chunk
 from sentry.models import File
 from sentry.testutils import TestCase, SnubaTestCase
 from sentry.utils.compat.mock import patch
@@ -49,6 +50,53 @@ class AssembleDownloadTest(TestCase, SnubaTestCase):
         assert raw1.startswith("bar,1,")
         assert raw2.startswith("bar2,2,")
 
+    @patch.object(IssuesByTagProcessor, "batch_size", 1)
+    def test_issue_by_tag_chunked(self):
+        de = ExportedData.objects.create(
+            user=self.user,
+            organization=self.org,
+            query_type=0,
+            query_info={"project": [self.project.id], "group": self.event.group_id, "key": "foo"},
+        )
+        with self.tasks():
+            assemble_download(de.id, concurrency=2)
+        de = ExportedData.objects.get(id=de.id)
+        assert de.date_finished is not None
+        assert de.file.blobs.count() == 2
+        assert not ExportedDataBlob.objects.filter(data_export=de).exists()
+
+        header, raw1, raw2 = de.file.getfile().read().strip().split("\r\n")
+        assert header == "value,times_seen,last_seen,first_seen"
+        raw1, raw2 = sorted([raw1, raw2])
+        assert raw1.startswith("bar,1,")
+        assert raw2.startswith("bar2,2,")
+
+    @patch.object(IssuesByTagProcessor, "batch_size", 1)
+    def test_issue_by_tag_resume(self):
+        de = ExportedData.objects.create(
+            user=self.user,
+            organization=self.org,
+            query_type=0,
+            query_info={"project": [self.project.id], "group": self.event.group_id, "key": "foo"},
+        )
+        # Only the first chunk gets stored, the following tasks get lost
+        with self.tasks(), patch("sentry.data_export.tasks.export_chunk.delay") as delay:
+            export_chunk(de.id, offset=0, limit=100, concurrency=1)
+            assert delay.call_count == 1
+        assert ExportedDataBlob.objects.filter(data_export=de).count() == 1
+        assert ExportedData.objects.get(id=de.id).date_finished is None
+
+        run_query = IssuesByTagProcessor.run_query
+        with self.tasks(), patch.object(
+            IssuesByTagProcessor, "run_query", autospec=True, side_effect=run_query
+        ) as mock_run_query:
+            assemble_download(de.id, concurrency=1)
+        assert [c[1]["offset"] for c in mock_run_query.call_args_list] == [1, 2]
+
+        de = ExportedData.objects.get(id=de.id)
+        assert de.date_finished is not None
+        assert len(de.file.getfile().read().strip().split("\r\n")) == 3
+
     @patch("sentry.data_export.models.ExportedData.email_failure")
     def test_issue_by_tag_errors(self, emailer):
         de1 = ExportedData.objects.create(
@@ -16,7 +16,7 @@ from sentry import nodestore
 from sentry.app import tsdb
 from sentry.constants import MAX_VERSION_LENGTH
 from sentry.eventstore.models import Event
-from sentry.event_manager import HashDiscarded, EventManager, EventUser
+from sentry.event_manager import HashDiscarded, EventManager, EventUser, save_error_events
 from sentry.grouping.utils import hash_from_values
 from sentry.models import (
     Activity,
@@ -1191,6 +1191,126 @@ class EventManagerTest(TestCase):
         )
 
 
+class SaveErrorEventsTest(TestCase):
+    def make_job(self, **kwargs):
+        manager = EventManager(make_event(**kwargs))
+        manager.normalize(project_id=self.project.id)
+        return {"data": manager.get_data(), "start_time": time()}
+
+    def save_batch(self, jobs):
+        return save_error_events(jobs, {self.project.id: self.project})
+
+    def test_groups_batch(self):
+        jobs = self.save_batch(
+            [
+                self.make_job(event_id="a" * 32, fingerprint=["one"]),
+                self.make_job(event_id="b" * 32, fingerprint=["one"]),
+                self.make_job(event_id="c" * 32, fingerprint=["two"]),
+            ]
+        )
+
+        assert [job["is_new"] for job in jobs] == [True, False, True]
+        assert jobs[0]["group"].id == jobs[1]["group"].id
+        assert jobs[0]["group"].id != jobs[2]["group"].id
+        assert jobs[0]["event"].group_id == jobs[0]["group"].id
+
+        short_ids = sorted(job["group"].short_id for job in (jobs[0], jobs[2]))
+        assert short_ids[1] == short_ids[0] + 1
+
+        for job in jobs:
+            grouphash = GroupHash.objects.get(project=self.project, hash=job["data"]["hashes"][0])
+            assert grouphash.group_id == job["group"].id
+            assert nodestore.get(job["event"].data.id) is not None
+
+    def test_matches_existing_group(self):
+        manager = EventManager(make_event(event_id="a" * 32, fingerprint=["one"]))
+        manager.normalize()
+        event = manager.save(self.project.id)
+
+        (job,) = self.save_batch([self.make_job(event_id="b" * 32, fingerprint=["one"])])
+
+        assert job["group"].id == event.group_id
+        assert not job["is_new"]
+        assert not job["is_regression"]
+
+    def test_drops_discarded_hashes(self):
+        manager = EventManager(make_event(event_id="a" * 32, fingerprint=["one"]))
+        manager.normalize()
+        event = manager.save(self.project.id)
+
+        group = event.group
+        tombstone = GroupTombstone.objects.create(
+            project_id=group.project_id,
+            level=group.level,
+            message=group.message,
+            culprit=group.culprit,
+            data=group.data,
+            previous_group_id=group.id,
+        )
+        GroupHash.objects.filter(group=group).update(group=None, group_tombstone_id=tombstone.id)
+
+        mock_track_outcome = mock.Mock()
+        with mock.patch("sentry.event_manager.track_outcome", mock_track_outcome):
+            (job,) = self.save_batch(
+                [
+                    self.make_job(event_id="b" * 32, fingerprint=["one"]),
+                    self.make_job(event_id="c" * 32, fingerprint=["two"]),
+                ]
+            )
+
+        assert job["event"].event_id == "c" * 32
+        assert job["is_new"]
+
+        outcomes = [call[1]["outcome"] for call in mock_track_outcome.call_args_list]
+        assert sorted(outcomes) == sorted([Outcome.FILTERED, Outcome.ACCEPTED])
+
+    def test_drops_jobs_of_deleted_groups(self):
+        manager = EventManager(make_event(event_id="a" * 32, fingerprint=["one"]))
+        manager.normalize()
+        manager.save(self.project.id)
+
+        # The group is deleted after its hashes have been looked up
+        mock_track_outcome = mock.Mock()
+        with mock.patch("sentry.event_manager.track_outcome", mock_track_outcome):
+            with mock.patch.object(Group.objects, "in_bulk", return_value={}):
+                (job,) = self.save_batch(
+                    [
+                        self.make_job(event_id="b" * 32, fingerprint=["one"]),
+                        self.make_job(event_id="c" * 32, fingerprint=["two"]),
+                    ]
+                )
+
+        assert job["event"].event_id == "c" * 32
+        assert job["is_new"]
+
+        outcomes = [call[1]["outcome"] for call in mock_track_outcome.call_args_list]
+        assert sorted(outcomes) == sorted([Outcome.FILTERED, Outcome.ACCEPTED])
+
+    def test_save_discards_event_of_deleted_group(self):
+        manager = EventManager(make_event(event_id="a" * 32, fingerprint=["one"]))
+        manager.normalize()
+        manager.save(self.project.id)
+
+        manager = EventManager(make_event(event_id="b" * 32, fingerprint=["one"]))
+        manager.normalize()
+        with mock.patch.object(Group.objects, "in_bulk", return_value={}):
+            with self.assertRaises(HashDiscarded):
+                manager.save(self.project.id)
+
+    def test_records_created_groups(self):
+        with mock.patch("sentry.models.group.metrics") as metrics:
+            self.save_batch(
+                [
+                    self.make_job(event_id="a" * 32, fingerprint=["one"]),
+                    self.make_job(event_id="b" * 32, fingerprint=["two"]),
+                ]
+            )
+
+        metrics.incr.assert_called_once_with(
+            "objects.created", amount=2, instance="sentry_groupedmessage", skip_internal=False
+        )
+
+
 class ReleaseIssueTest(TestCase):
     def setUp(self):
         self.project = self.create_project()
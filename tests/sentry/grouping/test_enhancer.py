@@ -4,7 +4,7 @@ from __future__ import absolute_import, print_function
 
 import six
 
-from sentry.grouping.enhancer import Enhancements
+from sentry.grouping.enhancer import Enhancements, _static_matches_cache
 
 
 def dump_obj(obj):
@@ -199,3 +199,53 @@ def test_package_matching():
     assert not bool(
         bundled_rule.get_matching_frame_actions({"package": "/usr/lib/linux-gate.so"}, "native")
     )
+
+
+def test_compiled_rules_match_like_rules():
+    enhancement = Enhancements.from_config_string(
+        """
+        family:native function:std::*                  -app
+        family:javascript path:**/node_modules/**      -group
+        app:no                                         -group
+        function:*foo* app:no                          +app
+    """
+    )
+    frames = [
+        {"function": "std::whatever", "in_app": True},
+        {"function": "main", "in_app": False},
+        {"function": "foobar", "in_app": False},
+        {"function": "std::whatever", "in_app": True},
+        {"abs_path": "http://example.com/node_modules/foo.js", "platform": "javascript"},
+    ]
+
+    expected = [
+        (rule, idx)
+        for rule in enhancement.rules
+        for idx, frame in enumerate(frames)
+        if rule.get_matching_frame_actions(frame, "native")
+    ]
+    compiled = enhancement.compiled_rules
+    _static_matches_cache.clear()
+    assert list(compiled.iter_matching_frames(frames, "native")) == expected
+    # The static matchers of both std frames are only evaluated once
+    assert len(_static_matches_cache) == 4
+
+    # app matchers see modifications made by earlier rules
+    enhancement.apply_modifications_to_frame(frames, "native")
+    assert [frame.get("in_app") for frame in frames] == [False, False, True, False, None]
+
+
+def test_compiled_rules_share_the_match_cache():
+    frame = {"function": "foo"}
+    matching = Enhancements.from_config_string("function:foo +app").compiled_rules
+    other = Enhancements.from_config_string("function:bar +app").compiled_rules
+
+    assert matching.get_static_matches(frame, "native") == frozenset([0])
+    assert other.get_static_matches(frame, "native") == frozenset()
+
+
+def test_loads_is_cached():
+    dumped = Enhancements.from_config_string("function:foo +app").dumps()
+    enhancement = Enhancements.loads(dumped)
+    assert Enhancements.loads(dumped) is enhancement
+    assert Enhancements.loads(dumped).compiled_rules is enhancement.compiled_rules
@@ -8,8 +8,9 @@ import pytest
 
 from sentry import eventstore
 from sentry.event_manager import EventManager
-from sentry.grouping.api import apply_server_fingerprinting
-from sentry.grouping.fingerprinting import FingerprintingRules
+from sentry.grouping.api import apply_server_fingerprinting, get_fingerprinting_config_for_project
+from sentry.grouping.fingerprinting import FingerprintingRules, _frame_matches_cache
+from sentry.utils.compat import mock
 
 
 def test_basic_parsing(insta_snapshot):
@@ -43,6 +44,68 @@ app:true                                        -> {{ default }}
     )
 
 
+def test_compiled_rules():
+    rules = FingerprintingRules.from_config_string(
+        """
+type:DatabaseUnavailable module:foo.*               -> database, foo
+type:DatabaseUnavailable                            -> database
+function:main app:yes                               -> main
+message:"*timed out*"                               -> timeout
+"""
+    )
+
+    def event(type, module, in_app=True):
+        frame = {"function": "main", "module": module, "in_app": in_app}
+        return {
+            "exception": {"values": [{"type": type, "stacktrace": {"frames": [frame]}}]},
+            "logentry": {"formatted": "Connection timed out"},
+        }
+
+    assert rules.get_fingerprint_values_for_event(event("DatabaseUnavailable", "foo.bar")) == [
+        "database",
+        "foo",
+    ]
+    assert rules.get_fingerprint_values_for_event(event("DatabaseUnavailable", "bar")) == [
+        "database"
+    ]
+    assert rules.get_fingerprint_values_for_event(event("ValueError", "foo.bar")) == ["main"]
+    assert rules.get_fingerprint_values_for_event(event("ValueError", "foo", False)) == ["timeout"]
+    assert rules.get_fingerprint_values_for_event({}) is None
+
+    # both type matchers are evaluated once
+    assert len(rules.compiled_rules.matchers) == 5
+
+
+def test_compiled_rules_share_frame_matches():
+    def event(function):
+        return {"exception": {"values": [{"stacktrace": {"frames": [{"function": function}]}}]}}
+
+    rules = FingerprintingRules.from_config_string("function:main -> main")
+    other = FingerprintingRules.from_config_string("function:main -> other")
+
+    _frame_matches_cache.clear()
+    assert rules.get_fingerprint_values_for_event(event("main")) == ["main"]
+    assert rules.get_fingerprint_values_for_event(event("foo")) is None
+    assert len(_frame_matches_cache) == 2
+
+    # Another config with the same matcher reuses the results
+    assert other.get_fingerprint_values_for_event(event("main")) == ["other"]
+    assert len(_frame_matches_cache) == 2
+
+
+def test_fingerprinting_config_for_project_is_cached():
+    project = mock.Mock()
+    project.get_option.return_value = "type:DatabaseUnavailable -> database"
+
+    config = get_fingerprinting_config_for_project(project)
+    assert get_fingerprinting_config_for_project(project) is config
+
+    project.get_option.return_value = "type:DatabaseUnavailable -> db"
+    changed = get_fingerprinting_config_for_project(project)
+    assert changed is not config
+    assert changed.rules[0].fingerprint == ["db"]
+
+
 _fixture_path = os.path.join(os.path.dirname(__file__), "fingerprint_inputs")
 
 
@@ -1,11 +1,14 @@
 from __future__ import absolute_import
 
+import msgpack
 import uuid
 import pytest
 import time
 
 from sentry.utils import json
+from sentry.ingest import ingest_consumer
 from sentry.ingest.ingest_consumer import (
+    IngestConsumerWorker,
     process_event,
     process_attachment_chunk,
     process_individual_attachment,
@@ -321,3 +324,36 @@ def test_individual_attachments_missing_chunks(default_project, factories, monke
     )
 
     assert not attachments
+
+
+@pytest.mark.django_db
+def test_packed_message_uses_worker_project_cache(
+    default_project, task_runner, preprocess_event, monkeypatch
+):
+    monkeypatch.setattr(ingest_consumer, "_worker_projects", {})
+
+    payload = get_normalized_event({"message": "hello world"}, default_project)
+    event_id = payload["event_id"]
+    start_time = time.time() - 3600
+
+    packed = msgpack.packb(
+        {
+            "type": "event",
+            "payload": json.dumps(payload),
+            "start_time": start_time,
+            "event_id": event_id,
+            "project_id": default_project.id,
+            "remote_addr": "127.0.0.1",
+        }
+    )
+    ingest_consumer._process_packed_message(packed)
+
+    (kwargs,) = preprocess_event
+    assert kwargs["project"] == default_project
+    assert kwargs["data"] == payload
+    assert default_project.id in ingest_consumer._worker_projects
+
+
+def test_unknown_pool_type():
+    with pytest.raises(ValueError):
+        IngestConsumerWorker(concurrency=1, pool_type="fibers")
@@ -14,6 +14,7 @@ from requests.exceptions import RequestException
 from sentry import http, options
 from sentry.lang.javascript.processor import (
     JavaScriptStacktraceProcessor,
+    _sourcemap_cache,
     discover_sourcemap,
     fetch_sourcemap,
     fetch_file,
@@ -574,6 +575,23 @@ class FetchSourcemapTest(TestCase):
         with pytest.raises(UnparseableSourcemap):
             fetch_sourcemap("http://example.com")
 
+    def test_local_cache(self):
+        _sourcemap_cache.clear()
+        smap_view = fetch_sourcemap(base64_sourcemap)
+        # disabled by default
+        assert fetch_sourcemap(base64_sourcemap) is not smap_view
+
+        with self.options({"sourcemaps.local-cache-size": 1024 * 1024}):
+            smap_view = fetch_sourcemap(base64_sourcemap)
+            assert fetch_sourcemap(base64_sourcemap) is smap_view
+            assert fetch_sourcemap(base64_sourcemap.rstrip("=")) is smap_view
+            assert len(_sourcemap_cache) == 1
+
+        with self.options({"sourcemaps.local-cache-size": 1}):
+            # sourcemaps larger than the budget are not kept
+            assert fetch_sourcemap(base64_sourcemap) is not smap_view
+            assert len(_sourcemap_cache) == 0
+
 
 class TrimLineTest(unittest.TestCase):
     long_line = "The public is more familiar with bad design than good design. It is, in effect, conditioned to prefer bad design, because that is what it lives with. The new becomes threatening, the old reassuring."
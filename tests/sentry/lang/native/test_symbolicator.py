@@ -1,10 +1,20 @@
 from __future__ import absolute_import
 
 import pytest
+import threading
 
-from sentry.lang.native.symbolicator import get_sources_for_project
-from sentry.testutils.helpers import Feature
-from sentry.utils.compat import map
+from six.moves import BaseHTTPServer, socketserver
+
+from sentry.cache import default_cache
+from sentry.lang.native.symbolicator import (
+    Symbolicator,
+    SymbolicatorSession,
+    get_sources_for_project,
+)
+from sentry.tasks.store import RetrySymbolication
+from sentry.testutils.helpers import Feature, override_options
+from sentry.utils import json
+from sentry.utils.compat import map, mock
 
 
 CUSTOM_SOURCE_CONFIG = """
@@ -103,3 +113,100 @@ def test_sources_custom_disabled(default_project):
 
     source_ids = map(lambda s: s["id"], sources)
     assert source_ids == ["sentry:project"]
+
+
+class StubSymbolicatorServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class StubSymbolicatorHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """
+    Answers every new task with a pending response and completes it on the
+    first poll.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+        self.server.connections.append(self.client_address)
+
+    def respond(self, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.respond({"status": "pending", "request_id": "req", "retry_after": 1})
+
+    def do_GET(self):
+        self.respond({"status": "completed", "stacktraces": [], "modules": []})
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def symbolicator_url():
+    server = StubSymbolicatorServer(("127.0.0.1", 0), StubSymbolicatorHandler)
+    server.connections = []
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    yield "http://127.0.0.1:%d" % server.server_port, server.connections
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_session_reuses_connections(symbolicator_url):
+    url, connections = symbolicator_url
+
+    for event_id in ("a", "b"):
+        with SymbolicatorSession(url=url, project_id="1", event_id=event_id, timeout=0) as sess:
+            assert sess.symbolicate_stacktraces(stacktraces=[], modules=[])["status"] == "pending"
+            assert sess.query_task("req")["status"] == "completed"
+
+    assert len(connections) == 1
+
+
+@pytest.mark.django_db
+def test_process_payload_polls(default_project, symbolicator_url):
+    url, _ = symbolicator_url
+
+    with override_options({"symbolicator.options": {"url": url}}):
+        symbolicator = Symbolicator(project=default_project, event_id="a" * 32)
+
+    with pytest.raises(RetrySymbolication):
+        symbolicator.process_payload(stacktraces=[], modules=[])
+
+    # Older workers expect the plain request id under the task id key
+    assert default_cache.get(symbolicator.task_id_cache_key) == "req"
+
+    with mock.patch("sentry.lang.native.symbolicator.metrics") as metrics:
+        assert symbolicator.process_payload(stacktraces=[], modules=[])["status"] == "completed"
+
+    metrics.timing.assert_any_call("events.symbolicator.response.completed.polls", 1)
+    assert default_cache.get(symbolicator.task_id_cache_key) is None
+    assert default_cache.get(symbolicator.task_stats_cache_key) is None
+
+
+@pytest.mark.django_db
+def test_process_payload_polls_task_of_older_worker(default_project, symbolicator_url):
+    url, _ = symbolicator_url
+
+    with override_options({"symbolicator.options": {"url": url}}):
+        symbolicator = Symbolicator(project=default_project, event_id="b" * 32)
+
+    default_cache.set(symbolicator.task_id_cache_key, "req", 60)
+
+    with mock.patch("sentry.lang.native.symbolicator.metrics") as metrics:
+        assert symbolicator.process_payload(stacktraces=[], modules=[])["status"] == "completed"
+
+    timings = [call[0][0] for call in metrics.timing.call_args_list]
+    assert "events.symbolicator.response.completed.polls" not in timings
@@ -1,10 +1,13 @@
 from __future__ import absolute_import
 
 import os
+import shutil
+import tempfile
+import time
 
 from django.core.files.base import ContentFile
 
-from sentry.models import File, FileBlob
+from sentry.models import File, FileBlob, FileCache
 from sentry.testutils import TestCase
 from sentry.utils.compat import map
 
@@ -84,3 +87,72 @@ class FileTest(TestCase):
 
         f = file.getfile(prefetch=True)
         assert f.read() == random_data
+
+
+class FileCacheTest(TestCase):
+    def setUp(self):
+        self.cache_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_path)
+
+    def create_cached_file(self, contents):
+        file = File.objects.create(name="test.bin", type="default", size=len(contents))
+        file.putfile(ContentFile(contents))
+        return file
+
+    def test_deduplicates_by_checksum(self):
+        file = self.create_cached_file(b"foo")
+        other = self.create_cached_file(b"foo")
+        cache = FileCache(self.cache_path)
+
+        path, hit = cache.get("1", "a", file)
+        assert not hit
+        with open(path, "rb") as f:
+            assert f.read() == b"foo"
+
+        assert cache.get("1", "a", file) == (path, True)
+
+        other_path, hit = cache.get("2", "b", other)
+        assert not hit
+        assert os.stat(other_path).st_ino == os.stat(path).st_ino
+
+    def test_evicts_least_recently_used(self):
+        old = self.create_cached_file(b"a" * 10)
+        new = self.create_cached_file(b"b" * 10)
+        cache = FileCache(self.cache_path, max_size=15)
+
+        old_path, _ = cache.get("1", "old", old)
+        new_path, _ = cache.get("1", "new", new)
+        past = time.time() - 60
+        os.utime(old_path, (past, past))
+
+        cache.clear_old_entries()
+        assert not os.path.exists(old_path)
+        assert os.path.exists(new_path)
+
+    def test_keeps_downloads_in_progress(self):
+        cache = FileCache(self.cache_path, max_size=1)
+        os.makedirs(os.path.join(self.cache_path, FileCache.blob_folder))
+        download = os.path.join(self.cache_path, FileCache.blob_folder, "tmpabc123")
+        with open(download, "wb") as f:
+            f.write(b"a" * 10)
+        past = time.time() - 60 * 60 * 24 * 2
+        os.utime(download, (past, past))
+
+        cache.clear_old_entries()
+        assert os.path.exists(download)
+
+    def test_keeps_locked_blobs(self):
+        file = self.create_cached_file(b"foo")
+        cache = FileCache(self.cache_path, max_size=1)
+        path, _ = cache.get("1", "a", file)
+        blob_path = os.path.join(self.cache_path, FileCache.blob_folder, file.checksum)
+
+        with cache._lock(blob_path):
+            cache.clear_old_entries()
+            assert os.path.exists(path)
+            assert os.path.exists(blob_path + ".lock")
+
+        cache.clear_old_entries()
+        assert not os.path.exists(path)
+        assert not os.path.exists(blob_path)
+        assert not os.path.exists(blob_path + ".lock")
@@ -1,5 +1,7 @@
 from __future__ import absolute_import
 
+from datetime import timedelta
+
 from sentry.testutils import TestCase
 from sentry.api.fields.actor import Actor
 from sentry.models import ProjectOwnership, User, Team
@@ -79,6 +81,24 @@ class ProjectOwnershipTestCase(TestCase):
             ([Actor(self.team.id, Team), Actor(self.user.id, User)], [rule_a, rule_b]),
         )
 
+    def test_get_compiled_rules(self):
+        rule_a = Rule(Matcher("path", "*.py"), [Owner("team", self.team.slug)])
+        rule_b = Rule(Matcher("path", "src/*"), [Owner("user", self.user.email)])
+
+        ownership = ProjectOwnership.objects.create(
+            project_id=self.project.id, schema=dump_schema([rule_a]), fallthrough=True
+        )
+        compiled = ownership.get_compiled_rules()
+        assert compiled.rules == [rule_a]
+        assert ProjectOwnership.objects.get(id=ownership.id).get_compiled_rules() is compiled
+
+        ownership.schema = dump_schema([rule_a, rule_b])
+        ownership.last_updated = ownership.last_updated + timedelta(seconds=1)
+        ownership.save()
+        assert ownership.get_compiled_rules().rules == [rule_a, rule_b]
+
+        assert ProjectOwnership(project_id=self.project.id).get_compiled_rules().rules == []
+
 
 class ResolveActorsTestCase(TestCase):
     def test_no_actors(self):
@@ -1,12 +1,83 @@
 from __future__ import absolute_import
 
 import pytest
+import struct
+import zlib
 
 from sentry.nodestore.bigtable.backend import BigtableNodeStorage
 from sentry.testutils import TestCase
+from sentry.utils import json
 from sentry.utils.compat import mock
 
 
+class FakeCell(object):
+    def __init__(self, value, timestamp=None):
+        self.value = value
+        self.timestamp = timestamp
+
+
+class FakeRow(object):
+    """
+    Records the cells written by ``encode_row`` and serves them back to
+    ``decode_row`` like a row read from Bigtable.
+    """
+
+    def __init__(self, columns=None):
+        self.cells = {BigtableNodeStorage.column_family: columns or {}}
+
+    def delete(self):
+        self.cells[BigtableNodeStorage.column_family] = {}
+
+    def set_cell(self, column_family, column, value, timestamp=None):
+        self.cells[column_family][column] = [FakeCell(value, timestamp)]
+
+
+def write_row(ns, data):
+    row = FakeRow()
+    with mock.patch.object(BigtableNodeStorage, "connection", mock.Mock()) as connection:
+        connection.row.return_value = row
+        ns.encode_row("node_id", data)
+    return row
+
+
+DATA = {"event_id": "a" * 32, "platform": "python", "message": "hello world" * 100}
+
+
+@pytest.mark.parametrize("writer", [False, True, "zlib", "zstd"])
+@pytest.mark.parametrize("reader", [False, True, "zlib", "zstd"])
+def test_decode_rows_of_any_codec(writer, reader):
+    row = write_row(BigtableNodeStorage(compression=writer), DATA)
+    assert BigtableNodeStorage(compression=reader).decode_row(row) == DATA
+
+
+@pytest.mark.parametrize("reader", [False, True, "zlib", "zstd"])
+def test_decode_legacy_rows(reader):
+    ns = BigtableNodeStorage(compression=reader)
+    value = json.dumps(DATA).encode("utf-8")
+
+    # Rows written without compression have no flags column
+    assert ns.decode_row(FakeRow({ns.data_column: [FakeCell(value)]})) == DATA
+
+    # Compressed rows set the zlib flag
+    row = FakeRow(
+        {
+            ns.flags_column: [FakeCell(struct.pack("B", ns._FLAG_COMPRESSED))],
+            ns.data_column: [FakeCell(zlib.compress(value))],
+        }
+    )
+    assert ns.decode_row(row) == DATA
+
+
+def test_encode_row_flags():
+    plain = write_row(BigtableNodeStorage(), DATA).cells[BigtableNodeStorage.column_family]
+    assert BigtableNodeStorage.flags_column not in plain
+
+    for compression in ("zlib", "zstd"):
+        ns = BigtableNodeStorage(compression=compression)
+        columns = write_row(ns, DATA).cells[ns.column_family]
+        assert struct.unpack("B", columns[ns.flags_column][0].value)[0] == ns.codec.flag
+
+
 @pytest.mark.skip(reason="Bigtable is not available in CI")
 class BigtableNodeStorageTest(TestCase):
     def setUp(self):
@@ -34,6 +105,16 @@ class BigtableNodeStorageTest(TestCase):
         self.ns.set(node_id, data)
         assert self.ns.get(node_id) == data
 
+    def test_get_multi_chunked(self):
+        nodes = [("node_%d" % i, {"foo": i}) for i in range(5)]
+        for n in nodes:
+            self.ns.set(n[0], n[1])
+
+        self.ns._clear_cache()
+        with mock.patch.object(self.ns, "get_multi_chunk_size", 2):
+            result = self.ns.get_multi([n[0] for n in nodes] + ["missing"])
+        assert result == dict(nodes, missing=None)
+
     def test_delete(self):
         node_id = "d2502ebbd7df41ceba8d3275595cac33"
         data = {"foo": "bar"}
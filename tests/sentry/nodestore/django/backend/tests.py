@@ -32,6 +32,17 @@ class DjangoNodeStorageTest(TestCase):
         )
         assert result == dict((n.id, n.data) for n in nodes)
 
+    def test_get_multi_chunked(self):
+        nodes = [Node.objects.create(id="%032x" % i, data={"foo": i}) for i in range(5)]
+
+        with mock.patch.object(self.ns, "get_multi_chunk_size", 2), mock.patch.object(
+            Node.objects, "filter", wraps=Node.objects.filter
+        ) as mock_filter:
+            result = self.ns.get_multi([n.id for n in nodes] + [nodes[0].id, "missing"])
+            assert mock_filter.call_count == 3
+
+        assert result == dict((n.id, n.data) for n in nodes)
+
     def test_set(self):
         self.ns.set("d2502ebbd7df41ceba8d3275595cac33", {"foo": "bar"})
         assert Node.objects.get(id="d2502ebbd7df41ceba8d3275595cac33").data == {"foo": "bar"}
@@ -131,3 +142,42 @@ class DjangoNodeStorageTest(TestCase):
             self.ns.get("node_4")
             self.ns.get("node_4")
             assert mock_get.call_count == 2
+
+    def test_local_cache(self):
+        node_1 = ("a" * 32, {"foo": "a"})
+        node_2 = ("b" * 32, {"foo": "b"})
+
+        for node_id, data in [node_1, node_2]:
+            Node.objects.create(id=node_id, data=data)
+
+        self.ns._clear_cache()
+        with self.options({"nodedata.local-cache-size": 1024 * 1024}):
+            assert self.ns.get(node_1[0]) == node_1[1]
+            assert self.ns.get_multi([node_2[0]]) == {node_2[0]: node_2[1]}
+
+            # Served from the local tier without touching the shared cache
+            with mock.patch.object(Node.objects, "get") as mock_get, mock.patch.object(
+                self.ns.cache, "get_many"
+            ) as mock_get_many:
+                assert self.ns.get(node_1[0]) == node_1[1]
+                assert self.ns.get_multi([node_1[0], node_2[0]]) == {
+                    node_1[0]: node_1[1],
+                    node_2[0]: node_2[1],
+                }
+                assert mock_get.call_count == 0
+                assert mock_get_many.call_count == 0
+
+            # Cached values can't be mutated by callers
+            self.ns.get(node_1[0])["foo"] = "mutated"
+            assert self.ns.get(node_1[0]) == node_1[1]
+
+            # Deletion and writes invalidate the local tier
+            self.ns.delete(node_1[0])
+            assert self.ns.get(node_1[0]) is None
+            self.ns.set(node_2[0], {"foo": "c"})
+            with mock.patch.object(Node.objects, "get") as mock_get:
+                assert self.ns.get(node_2[0]) == {"foo": "c"}
+                assert mock_get.call_count == 0
+            self.ns.delete_multi([node_2[0]])
+            assert self.ns.get_multi([node_2[0]]) == {}
+        self.ns._clear_cache()
@@ -0,0 +1,50 @@
+from __future__ import absolute_import
+
+import pytest
+
+from sentry.nodestore.codecs import ZlibCodec, ZstdCodec, get_codec, train_dictionary
+from sentry.utils import json
+from sentry.utils.samples import load_data
+
+
+def get_samples(platform):
+    data = load_data(platform)
+    return [
+        json.dumps(dict(data, event_id="%032x" % i, message="message %d" % i)).encode("utf-8")
+        for i in range(100)
+    ]
+
+
+@pytest.mark.parametrize("codec", [ZlibCodec(), ZstdCodec()])
+def test_roundtrip(codec):
+    for value in get_samples("python")[:3]:
+        encoded = codec.encode(value)
+        assert len(encoded) < len(value)
+        assert codec.decode(encoded) == value
+
+
+def test_zstd_dictionaries():
+    samples = get_samples("python")
+    dictionary = train_dictionary(samples[1:], dict_size=4096)
+    codec = ZstdCodec(dictionaries={"python": dictionary})
+
+    value = samples[0]
+    with_dictionary = codec.encode(value, platform="python")
+    without_dictionary = codec.encode(value, platform="javascript")
+    assert len(with_dictionary) < len(without_dictionary)
+    assert codec.decode(with_dictionary) == value
+    assert codec.decode(without_dictionary) == value
+
+    # Rows written with a dictionary need it configured to be decoded
+    with pytest.raises(ValueError):
+        ZstdCodec().decode(with_dictionary)
+    assert ZstdCodec().decode(without_dictionary) == value
+
+
+def test_get_codec():
+    codec = get_codec("zstd", level=5)
+    assert isinstance(codec, ZstdCodec)
+    assert codec.level == 5
+
+    with pytest.raises(ValueError):
+        get_codec("lz4")
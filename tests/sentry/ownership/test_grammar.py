@@ -1,6 +1,14 @@
 from __future__ import absolute_import
 
-from sentry.ownership.grammar import Rule, Matcher, Owner, parse_rules, dump_schema, load_schema
+from sentry.ownership.grammar import (
+    CompiledRules,
+    Rule,
+    Matcher,
+    Owner,
+    parse_rules,
+    dump_schema,
+    load_schema,
+)
 
 fixture_data = """
 # cool stuff comment
@@ -117,3 +125,50 @@ def test_matcher_test_tags():
     assert Matcher("tags.foo", "foo_value").test(data)
     assert Matcher("tags.bar", "barval").test(data)
     assert not Matcher("tags.barz", "barval").test(data)
+
+
+def test_compiled_rules():
+    rules = parse_rules(fixture_data) + parse_rules(
+        """
+src/sentry/api/*                                    #api
+src/sentry/api/endpoints/project_details.py         #projects
+SRC\\sentry\\*                                       #windows
+url:HTTP://GOOGLE.COM/search                        #search
+tags.foo:ba*                                        #wildcard
+"""
+    )
+    compiled = CompiledRules(rules)
+
+    data = {
+        "exception": {
+            "values": [
+                {
+                    "stacktrace": {
+                        "frames": [
+                            {"filename": "src/sentry/api/endpoints/project_details.py"},
+                            {"abs_path": "/usr/local/src/app.js"},
+                            {"filename": "src/sentry/api/endpoints/project_details.py"},
+                        ]
+                    }
+                }
+            ]
+        },
+        "request": {"url": "http://google.com/search"},
+        "tags": [["foo", "bar"], ["bar", "foo"]],
+    }
+    expected = [rule for rule in rules if rule.test(data)]
+    assert [rule.owners[0].identifier for rule in expected] == [
+        "frontend",
+        "backend",
+        "david@sentry.io",
+        "tagperson@sentry.io",
+        "api",
+        "projects",
+        "windows",
+        "search",
+        "wildcard",
+    ]
+    assert compiled.get_matching_rules(data) == expected
+
+    assert compiled.get_matching_rules({}) == []
+    assert CompiledRules([]).get_matching_rules(data) == []
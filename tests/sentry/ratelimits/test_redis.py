@@ -2,8 +2,9 @@
 
 from __future__ import absolute_import
 
-from sentry.ratelimits.redis import RedisRateLimiter
+from sentry.ratelimits.redis import RedisGCRARateLimiter, RedisRateLimiter
 from sentry.testutils import TestCase
+from sentry.utils.compat import mock
 
 
 class RedisRateLimiterTest(TestCase):
@@ -17,3 +18,64 @@ class RedisRateLimiterTest(TestCase):
     def test_simple_key(self):
         assert not self.backend.is_limited("foo", 1)
         assert self.backend.is_limited("foo", 1)
+
+
+class RedisGCRARateLimiterTest(TestCase):
+    def setUp(self):
+        self.backend = RedisGCRARateLimiter()
+
+    def test_project_key(self):
+        assert not self.backend.is_limited("foo", 1, self.project)
+        assert self.backend.is_limited("foo", 1, self.project)
+        assert not self.backend.is_limited("foo", 1)
+
+    @mock.patch("sentry.ratelimits.redis.time")
+    def test_sliding_window(self, time):
+        time.return_value = 1000.0
+        assert not self.backend.is_limited("foo", 2, window=10)
+        assert not self.backend.is_limited("foo", 2, window=10)
+        assert self.backend.is_limited("foo", 2, window=10)
+
+        # Half a window later, only a single request is allowed again.
+        time.return_value = 1005.0
+        assert not self.backend.is_limited("foo", 2, window=10)
+        assert self.backend.is_limited("foo", 2, window=10)
+
+    @mock.patch("sentry.ratelimits.redis.time")
+    def test_negative_cache(self, time):
+        time.return_value = 1000.0
+        assert not self.backend.is_limited("foo", 1, window=10)
+        assert self.backend.is_limited("foo", 1, window=10)
+
+        with mock.patch.object(self.backend.cluster, "execute_commands") as execute_commands:
+            assert self.backend.is_limited("foo", 1, window=10)
+            assert not execute_commands.called
+
+        time.return_value = 1010.0
+        assert not self.backend.is_limited("foo", 1, window=10)
+
+    @mock.patch("sentry.ratelimits.redis.time")
+    def test_negative_cache_is_per_limit_and_window(self, time):
+        time.return_value = 1000.0
+        assert not self.backend.is_limited("foo", 1, window=10)
+        assert self.backend.is_limited("foo", 1, window=10)
+
+        # The same key with a longer window accepts more requests
+        assert not self.backend.is_limited("foo", 60, window=60)
+
+        # ... and with a higher limit it is accepted again earlier
+        time.return_value = 1005.0
+        assert self.backend.is_limited("foo", 1, window=10)
+        assert not self.backend.is_limited("foo", 3, window=10)
+
+    def test_is_limited_many(self):
+        assert self.backend.is_limited_many([("foo", 1), ("bar", 2), ("foo", 1)]) == [
+            False,
+            False,
+            True,
+        ]
+        assert self.backend.is_limited_many([("foo", 1), ("bar", 2), ("baz", 0)]) == [
+            True,
+            False,
+            True,
+        ]
@@ -5,10 +5,12 @@ from __future__ import absolute_import
 from datetime import timedelta
 from django.utils import timezone
 
+from sentry import tsdb
 from sentry.models import GroupRuleStatus, Rule, GroupStatus
 from sentry.mail.actions import ActionTargetType
 from sentry.testutils import TestCase
 from sentry.rules.processor import RuleProcessor
+from sentry.utils.compat import mock
 
 
 class RuleProcessorTest(TestCase):
@@ -82,3 +84,65 @@ class RuleProcessorTest(TestCase):
         )
         results = list(rp.apply())
         assert len(results) == 0
+
+    def test_apply_batch(self):
+        frequency_data = [
+            {
+                "id": "sentry.rules.conditions.event_frequency.EventFrequencyCondition",
+                "interval": "1h",
+                "value": "1",
+            },
+            {
+                "id": "sentry.rules.conditions.event_frequency.EventUniqueUserFrequencyCondition",
+                "interval": "1h",
+                "value": "10",
+            },
+        ]
+        action_data = self.rule.data["actions"][0]
+        frequency_rule = Rule.objects.create(
+            project=self.project, data={"conditions": frequency_data[:1], "actions": [action_data]}
+        )
+        users_rule = Rule.objects.create(
+            project=self.project,
+            data={"conditions": frequency_data, "action_match": "any", "actions": [action_data]},
+        )
+
+        other_event = self.store_event(data={"fingerprint": ["other"]}, project_id=self.project.id)
+        # storing the events counted them once
+        tsdb.incr(tsdb.models.group, self.event.group_id, count=2)
+
+        processors = [
+            RuleProcessor(
+                event,
+                is_new=False,
+                is_regression=False,
+                is_new_group_environment=False,
+                has_reappeared=False,
+            )
+            for event in (self.event, other_event)
+        ]
+
+        with mock.patch.object(
+            Rule, "get_for_project", wraps=Rule.get_for_project
+        ) as get_for_project, mock.patch.object(
+            tsdb, "get_sums", wraps=tsdb.get_sums
+        ) as get_sums, mock.patch.object(
+            tsdb, "get_distinct_counts_totals", wraps=tsdb.get_distinct_counts_totals
+        ) as get_distinct_counts_totals:
+            results = [list(r) for r in RuleProcessor.apply_batch(processors)]
+
+        assert get_for_project.call_count == 1
+        # one query per condition type for both events and rules
+        assert get_sums.call_count == 1
+        assert sorted(get_sums.call_args[1]["keys"]) == sorted(
+            [self.event.group_id, other_event.group_id]
+        )
+        assert get_distinct_counts_totals.call_count == 1
+
+        triggered = [
+            sorted(f.rule.id for _, futures in result for f in futures) for result in results
+        ]
+        assert triggered == [
+            sorted([self.rule.id, frequency_rule.id, users_rule.id]),
+            [self.rule.id],
+        ]
@@ -0,0 +1,52 @@
+from __future__ import absolute_import
+
+from sentry.stacktraces.processing import (
+    StacktraceProcessor,
+    _frame_cache,
+    find_stacktraces_in_data,
+    get_stacktrace_processing_task,
+)
+from sentry.testutils import TestCase
+from sentry.testutils.helpers import override_options
+from sentry.utils.cache import cache
+
+
+class FunctionProcessor(StacktraceProcessor):
+    def handles_frame(self, frame, stacktrace_info):
+        return True
+
+    def preprocess_frame(self, processable_frame):
+        processable_frame.set_cache_key_from_values([processable_frame["function"]])
+
+
+class FrameCacheTest(TestCase):
+    def setUp(self):
+        _frame_cache.clear()
+        self.addCleanup(_frame_cache.clear)
+        self.data = {
+            "project": self.project.id,
+            "stacktrace": {"frames": [{"function": "foo"}, {"function": "foo"}]},
+        }
+
+    def get_processable_frames(self):
+        infos = find_stacktraces_in_data(self.data)
+        processors = [FunctionProcessor(self.data, infos, self.project)]
+        return list(get_stacktrace_processing_task(infos, processors).iter_processable_frames())
+
+    def test_identical_frames(self):
+        frames = self.get_processable_frames()
+        assert frames[0].cache_key == frames[1].cache_key
+        assert frames[0].set_cache_value("bar")
+
+        assert [f.cache_value for f in self.get_processable_frames()] == ["bar", "bar"]
+
+    def test_local_cache(self):
+        with override_options({"stacktraces.local-cache-size": 10}):
+            frame = self.get_processable_frames()[0]
+            frame.set_cache_value("bar")
+            cache.delete(frame.cache_key)
+
+            assert [f.cache_value for f in self.get_processable_frames()] == ["bar", "bar"]
+
+        # Without a local cache, the value is gone
+        assert [f.cache_value for f in self.get_processable_frames()] == [None, None]
@@ -2,6 +2,7 @@ from __future__ import absolute_import
 
 import os
 import io
+import zipfile
 from hashlib import sha1
 
 from django.core.files.base import ContentFile
@@ -19,6 +20,7 @@ from sentry.tasks.assemble import (
 )
 from sentry.models import FileBlob, FileBlobOwner, ReleaseFile
 from sentry.models.debugfile import ProjectDebugFile
+from sentry.utils import json
 
 
 class BaseAssembleTest(TestCase):
@@ -214,6 +216,55 @@ class AssembleArtifactsTest(BaseAssembleTest):
         assert release_file
         assert release_file.file.headers == {"Sourcemap": "index.js.map"}
 
+    def test_artifacts_sourcemap_reference(self):
+        bundle = io.BytesIO()
+        with zipfile.ZipFile(bundle, "w") as zf:
+            zf.writestr(
+                "manifest.json",
+                json.dumps(
+                    {
+                        "org": self.organization.slug,
+                        "release": self.release.version,
+                        "files": {
+                            "app.min.js": {"url": "~/app.min.js"},
+                            "app.min.js.map": {"url": "~/app.min.js.map"},
+                            "vendor.js": {"url": "~/vendor.js"},
+                            "inline.js": {"url": "~/inline.js"},
+                            "app.css": {"url": "~/app.css"},
+                        },
+                    }
+                ),
+            )
+            zf.writestr("app.min.js", "function a(){}\n//# sourceMappingURL=app.min.js.map\n")
+            zf.writestr("app.min.js.map", '{"version":3,"sources":[],"mappings":""}')
+            zf.writestr("vendor.js", "function b(){}\n")
+            zf.writestr(
+                "inline.js",
+                "function c(){}\n//# sourceMappingURL=data:application/json;base64,e30=\n",
+            )
+            zf.writestr("app.css", "a{}\n/*# sourceMappingURL=app.css.map */\n")
+        bundle_file = bundle.getvalue()
+        blob1 = FileBlob.from_file(ContentFile(bundle_file))
+
+        assemble_artifacts(
+            org_id=self.organization.id,
+            version=self.release.version,
+            checksum=sha1(bundle_file).hexdigest(),
+            chunks=[blob1.checksum],
+        )
+
+        headers = {
+            release_file.name: release_file.file.headers
+            for release_file in ReleaseFile.objects.filter(release=self.release)
+        }
+        assert headers == {
+            "~/app.min.js": {"Sourcemap": "app.min.js.map"},
+            "~/app.min.js.map": {},
+            "~/vendor.js": {},
+            "~/inline.js": {},
+            "~/app.css": {},
+        }
+
     def test_artifacts_invalid_org(self):
         bundle_file = self.create_artifact_bundle(org="invalid")
         blob1 = FileBlob.from_file(ContentFile(bundle_file))
@@ -0,0 +1,111 @@
+from __future__ import absolute_import
+
+import pytz
+
+from datetime import datetime, timedelta
+
+from sentry.testutils import TestCase
+from sentry.tsdb.base import TSDBModel, ONE_MINUTE, ONE_HOUR, ONE_DAY
+from sentry.tsdb.buffered import BufferedTSDB
+from sentry.utils.compat import mock
+
+
+class BufferedTSDBTest(TestCase):
+    def setUp(self):
+        self.db = BufferedTSDB(
+            backend="sentry.tsdb.redis.RedisTSDB",
+            flush_interval=60,
+            max_pending=10,
+            rollups=(
+                # time in seconds, samples to keep
+                (10, 30),  # 5 minutes at 10 seconds
+                (ONE_MINUTE, 120),  # 2 hours at 1 minute
+                (ONE_HOUR, 24),  # 1 days at 1 hour
+                (ONE_DAY, 30),  # 30 days at 1 day
+            ),
+            vnodes=64,
+            enable_frequency_sketches=True,
+            hosts={i - 6: {"db": i} for i in range(6, 9)},
+        )
+        self.now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+
+    def tearDown(self):
+        self.db.flush_pending()
+        with self.db.backend.cluster.all() as client:
+            client.flushdb()
+
+    def test_bucket_size(self):
+        assert self.db.bucket_size == 10
+
+    def test_incr_multi(self):
+        for _ in range(100):
+            self.db.incr_multi(
+                [(TSDBModel.project, 1), (TSDBModel.group, 2)],
+                timestamp=self.now,
+                environment_id=1,
+            )
+        self.db.incr(TSDBModel.group, 2, timestamp=self.now, count=5)
+
+        assert self.db.get_sums(TSDBModel.group, [2], self.now, self.now) == {2: 0}
+
+        with mock.patch.object(
+            self.db.backend, "incr_multi", wraps=self.db.backend.incr_multi
+        ) as incr_multi:
+            self.db.flush_pending()
+
+        # one write per environment
+        assert incr_multi.call_count == 2
+        assert self.db.get_sums(TSDBModel.project, [1], self.now, self.now) == {1: 100}
+        assert self.db.get_sums(TSDBModel.group, [2], self.now, self.now) == {2: 105}
+        assert self.db.get_sums(TSDBModel.group, [2], self.now, self.now, environment_id=1) == {
+            2: 100
+        }
+
+    def test_record_multi(self):
+        for value in ("foo", "bar", "foo"):
+            self.db.record_multi(
+                [(TSDBModel.users_affected_by_group, 1, [value])], timestamp=self.now
+            )
+        self.db.flush_pending()
+
+        assert self.db.get_distinct_counts_totals(
+            TSDBModel.users_affected_by_group, [1], self.now, self.now
+        ) == {1: 2}
+
+    def test_record_frequency_multi(self):
+        for _ in range(3):
+            self.db.record_frequency_multi(
+                [(TSDBModel.frequent_environments_by_group, {1: {"production": 1, "staging": 2}})],
+                timestamp=self.now,
+            )
+        self.db.flush_pending()
+
+        assert self.db.get_frequency_totals(
+            TSDBModel.frequent_environments_by_group, {1: ["production", "staging"]}, self.now
+        ) == {1: {"production": 3.0, "staging": 6.0}}
+
+    def test_max_pending(self):
+        with mock.patch.object(self.db, "flush_pending") as flush_pending:
+            self.db.incr_multi([(TSDBModel.group, i) for i in range(9)], timestamp=self.now)
+            assert not flush_pending.called
+            self.db.incr_multi([(TSDBModel.group, i) for i in range(9)], timestamp=self.now)
+            assert not flush_pending.called
+            self.db.incr(TSDBModel.group, 9, timestamp=self.now)
+            assert flush_pending.call_count == 1
+
+    def test_separate_buckets(self):
+        self.db.incr(TSDBModel.group, 1, timestamp=self.now - timedelta(hours=1))
+        self.db.incr(TSDBModel.group, 1, timestamp=self.now)
+        self.db.flush_pending()
+
+        results = self.db.get_range(
+            TSDBModel.group, [1], self.now - timedelta(hours=1), self.now, rollup=ONE_HOUR
+        )
+        assert [count for _, count in results[1]] == [1, 1]
+
+    def test_merge_flushes_pending(self):
+        self.db.incr(TSDBModel.group, 1, timestamp=self.now)
+        self.db.incr(TSDBModel.group, 2, timestamp=self.now, count=2)
+        self.db.merge(TSDBModel.group, 1, [2], timestamp=self.now)
+
+        assert self.db.get_sums(TSDBModel.group, [1, 2], self.now, self.now) == {1: 3, 2: 0}
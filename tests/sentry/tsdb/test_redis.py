@@ -178,6 +178,46 @@ class RedisTSDBTest(TestCase):
         results = self.db.get_sums(TSDBModel.project, [1, 2], dts[0], dts[-1], environment_id=1)
         assert results == {1: 0, 2: 0}
 
+    def test_get_range_multi(self):
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(hours=4)
+        dts = [now + timedelta(hours=i) for i in range(4)]
+
+        self.db.incr(TSDBModel.project, 1, dts[0])
+        self.db.incr(TSDBModel.project, 2, dts[1], count=2, environment_id=1)
+        self.db.incr(TSDBModel.group, 3, dts[2], count=3)
+        self.db.incr(TSDBModel.group, 4, dts[3], environment_id=2)
+
+        requests = {
+            "projects": {
+                "model": TSDBModel.project,
+                "keys": [1, 2],
+                "start": dts[0],
+                "end": dts[-1],
+            },
+            "projects_environment": {
+                "model": TSDBModel.project,
+                "keys": [1, 2],
+                "start": dts[0],
+                "end": dts[-1],
+                "environment_ids": [1],
+            },
+            "groups": {
+                "model": TSDBModel.group,
+                "keys": [3, 4],
+                "start": dts[0],
+                "end": dts[-1],
+                "rollup": ONE_MINUTE,
+            },
+            "empty": {"model": TSDBModel.group, "keys": [], "start": dts[0], "end": dts[-1]},
+        }
+
+        results = self.db.get_range_multi(requests)
+        assert results == {name: self.db.get_range(**request) for name, request in requests.items()}
+        assert results["empty"] == {}
+        assert sum(count for _, count in results["projects"][2]) == 2
+        assert sum(count for _, count in results["projects_environment"][1]) == 0
+        assert sum(count for _, count in results["groups"][3]) == 3
+
     def test_count_distinct(self):
         now = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(hours=4)
         dts = [now + timedelta(hours=i) for i in range(4)]
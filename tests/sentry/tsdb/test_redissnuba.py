@@ -1,19 +1,28 @@
 from __future__ import absolute_import
 
+from sentry.utils.compat import mock
+
+from datetime import datetime, timedelta
+
 from sentry.tsdb.base import TSDBModel
 from sentry.tsdb.snuba import SnubaTSDB
-from sentry.tsdb.redissnuba import selector_func, method_specifications, READ
+from sentry.tsdb.redissnuba import RedisSnubaTSDB, selector_func, method_specifications, READ
 
 
-def get_callargs(model):
+def get_callargs(method, model):
     """
     Represents for all possible ways that a model could be passed to ``selector_func`` through the callargs
     """
+    if method == "get_range_multi":
+        requests = {"name": {"model": model}}
+    else:
+        requests = [(model, "data")]
+
     return {
         "model": model,
         "models": [model],
         "items": [(model, "key", ["values"])],
-        "requests": [(model, "data")],
+        "requests": requests,
     }
 
 
@@ -27,12 +36,37 @@ def test_redissnuba_connects_to_correct_backend():
 
     for method in methods:
         for model in should_resolve_to_redis:
-            assert "redis" == selector_func(method, get_callargs(model))
+            assert "redis" == selector_func(method, get_callargs(method, model))
 
         for model in should_resolve_to_snuba:
             read_or_write, _ = method_specifications.get(method)
 
             if read_or_write == READ:
-                assert "snuba" == selector_func(method, get_callargs(model))
+                assert "snuba" == selector_func(method, get_callargs(method, model))
             else:
-                assert "dummy" == selector_func(method, get_callargs(model))
+                assert "dummy" == selector_func(method, get_callargs(method, model))
+
+
+def test_redissnuba_get_range_multi_splits_backends():
+    tsdb = RedisSnubaTSDB()
+    end = datetime(2020, 1, 1)
+    start = end - timedelta(hours=1)
+    requests = {
+        "redis": {
+            "model": TSDBModel.project_total_received,
+            "keys": [1],
+            "start": start,
+            "end": end,
+        },
+        "snuba": {"model": TSDBModel.project, "keys": [1], "start": start, "end": end},
+    }
+
+    with mock.patch.object(
+        tsdb.backends["redis"], "get_range_multi", return_value={"redis": {1: []}}
+    ) as redis_get_range_multi, mock.patch.object(
+        tsdb.backends["snuba"], "get_range_multi", return_value={"snuba": {1: []}}
+    ) as snuba_get_range_multi:
+        assert tsdb.get_range_multi(requests) == {"redis": {1: []}, "snuba": {1: []}}
+
+    redis_get_range_multi.assert_called_once_with({"redis": requests["redis"]})
+    snuba_get_range_multi.assert_called_once_with({"snuba": requests["snuba"]})
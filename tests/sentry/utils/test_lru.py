@@ -0,0 +1,66 @@
+from __future__ import absolute_import
+
+from sentry.utils.compat import mock
+from sentry.utils.lru import LRUCache
+
+
+def test_get_set():
+    cache = LRUCache(max_size=10)
+    assert cache.get("a") is None
+    assert cache.set("a", b"1234") == 0
+    assert cache.get("a") == b"1234"
+    assert cache.get_many(["a", "b"]) == {"a": b"1234"}
+    assert cache.size == 4
+
+    cache.set("a", b"12")
+    assert cache.size == 2
+    assert len(cache) == 1
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(max_size=10)
+    cache.set_many({"a": b"1234", "b": b"1234"})
+
+    # Reading "a" makes "b" the least recently used entry
+    assert cache.get("a") == b"1234"
+    assert cache.set("c", b"1234") == 1
+    assert cache.get("b") is None
+    assert cache.get_many(["a", "c"]) == {"a": b"1234", "c": b"1234"}
+    assert cache.size == 8
+
+    # Values larger than the budget are never stored
+    assert cache.set("d", b"x" * 11) == 0
+    assert cache.get("d") is None
+    assert cache.size == 8
+
+
+def test_configure():
+    cache = LRUCache(max_size=10)
+    cache.set_many({"a": b"1234", "b": b"1234"})
+    assert cache.configure(max_size=5) == 1
+    assert len(cache) == 1
+    assert cache.size == 4
+
+
+def test_ttl():
+    cache = LRUCache(max_size=10, ttl=60)
+    with mock.patch("sentry.utils.lru.time", return_value=1000):
+        cache.set("a", b"1234")
+    with mock.patch("sentry.utils.lru.time", return_value=1059):
+        assert cache.get("a") == b"1234"
+    with mock.patch("sentry.utils.lru.time", return_value=1060):
+        assert cache.get("a") is None
+    assert cache.size == 0
+
+
+def test_delete():
+    cache = LRUCache(max_size=10)
+    cache.set_many({"a": b"1", "b": b"2", "c": b"3"})
+    cache.delete("a")
+    cache.delete_many(["b", "x"])
+    assert cache.get_many(["a", "b", "c"]) == {"c": b"3"}
+    assert cache.size == 1
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.size == 0
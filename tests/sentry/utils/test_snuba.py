@@ -1,5 +1,7 @@
 from __future__ import absolute_import
 
+import threading
+
 from datetime import datetime, timedelta
 from django.utils import timezone
 
@@ -8,8 +10,11 @@ import pytz
 
 from sentry.models import GroupRelease, Release
 from sentry.testutils import TestCase
+from sentry.utils.compat import mock
 from sentry.utils.snuba import (
     _prepare_query_params,
+    _snuba_request,
+    get_query_cache_key,
     get_snuba_translators,
     get_json_type,
     get_snuba_column_name,
@@ -280,3 +285,102 @@ class QuantizeTimeTest(TestCase):
                 break
 
         assert i != j
+
+
+class QueryCacheTest(TestCase):
+    def setUp(self):
+        self.now = datetime(2020, 5, 6, 12, 0, 0)
+        self.headers = {"referer": "test"}
+
+    def get_query_params(self, start, end):
+        return {
+            "dataset": "events",
+            "from_date": start.isoformat(),
+            "to_date": end.isoformat(),
+            "project": [1],
+            "aggregations": [["count()", "", "count"]],
+        }
+
+    def test_cache_key(self):
+        query_params = self.get_query_params(self.now - timedelta(hours=1), self.now)
+        later_query_params = self.get_query_params(
+            self.now - timedelta(hours=1, seconds=-1), self.now + timedelta(seconds=1)
+        )
+
+        assert get_query_cache_key(query_params, "test") != get_query_cache_key(
+            later_query_params, "test"
+        )
+        assert get_query_cache_key(query_params, "test") != get_query_cache_key(
+            query_params, "other"
+        )
+
+        keys = set(
+            get_query_cache_key(
+                self.get_query_params(
+                    self.now - timedelta(hours=1, seconds=-i), self.now + timedelta(seconds=i)
+                ),
+                "test",
+                ttl=60,
+            )
+            for i in range(120)
+        )
+        # The window changes once or twice within two minutes, depending on the jitter
+        assert 2 <= len(keys) <= 3
+
+    @mock.patch("sentry.utils.snuba._snuba_pool")
+    def test_cache(self, pool):
+        pool.urlopen.return_value = mock.Mock(status=200, data=b'{"data": []}')
+        query_params = self.get_query_params(self.now - timedelta(hours=1), self.now)
+
+        assert _snuba_request(query_params, "{}", self.headers) == (200, b'{"data": []}')
+        assert _snuba_request(query_params, "{}", self.headers) == (200, b'{"data": []}')
+        assert pool.urlopen.call_count == 2
+
+        with self.options({"snuba.query-cache.referrer-ttls": {"test": 60}}):
+            assert _snuba_request(query_params, "{}", self.headers) == (200, b'{"data": []}')
+            assert _snuba_request(query_params, "{}", self.headers) == (200, b'{"data": []}')
+            assert _snuba_request(dict(query_params, consistent=True), "{}", self.headers) == (
+                200,
+                b'{"data": []}',
+            )
+            assert pool.urlopen.call_count == 4
+
+            pool.urlopen.return_value = mock.Mock(status=500, data=b"{}")
+            other_query_params = dict(query_params, project=[2])
+            assert _snuba_request(other_query_params, "{}", self.headers) == (500, b"{}")
+            assert _snuba_request(other_query_params, "{}", self.headers) == (500, b"{}")
+            assert pool.urlopen.call_count == 6
+
+    @mock.patch("sentry.utils.snuba._snuba_pool")
+    def test_coalesce_inflight_queries(self, pool):
+        query_params = self.get_query_params(self.now - timedelta(hours=1), self.now)
+        started = threading.Event()
+        coalesced = threading.Event()
+
+        def urlopen(*args, **kwargs):
+            started.set()
+            coalesced.wait(5)
+            return mock.Mock(status=200, data=b'{"data": []}')
+
+        def incr(key, *args, **kwargs):
+            if key == "snuba.client.query_cache.coalesced":
+                coalesced.set()
+
+        pool.urlopen.side_effect = urlopen
+        results = []
+
+        def run():
+            results.append(_snuba_request(query_params, "{}", self.headers))
+
+        with mock.patch("sentry.utils.snuba.metrics.incr", side_effect=incr):
+            leader = threading.Thread(target=run)
+            leader.start()
+            started.wait(5)
+            follower = threading.Thread(target=run)
+            follower.start()
+            leader.join()
+            follower.join()
+
+        assert coalesced.is_set()
+        assert pool.urlopen.call_count == 1
+        assert results == [(200, b'{"data": []}')] * 2